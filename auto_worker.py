@@ -8,18 +8,21 @@ Usage:
   1. Lance d'abord: python market_analyzer.py (dans un terminal)
   2. Puis: python auto_worker.py (dans un autre terminal)
 
-Le worker lit active_targets.json et snipe les opportunités.
+Le worker reçoit les cibles poussées par le scanner (target_bus.py,
+active_targets.json au démarrage) et snipe les opportunités.
 """
 
-import requests
-import json
 import time
 import random
 import os
 
+from ea_client import OK, TOKEN_EXPIRED, RATE_LIMIT, NETWORK_ERROR, Auction, classify, decode_auctions, get_client, load_session
+from records import Target
+from target_bus import TargetSubscriber
+from trade_journal import get_journal
+
 SESSION_FILE = "active_session.json"
 TARGETS_FILE = "active_targets.json"
-PURCHASES_LOG = "purchases_log.json"
 
 # =============================================================================
 # PARAMÈTRES ANTI-BAN
@@ -29,17 +32,15 @@ REQUEST_DELAY_MAX = 6.0       # Délai maximum entre requêtes
 POST_BUY_PAUSE_MIN = 15.0     # Pause minimum après achat
 POST_BUY_PAUSE_MAX = 45.0     # Pause maximum après achat
 MAX_BUYS_PER_HOUR = 8         # Maximum d'achats par heure
-TARGETS_REFRESH_INTERVAL = 10 # Recharger targets toutes les X secondes
 
 
 class AutoWorker:
     """Worker autonome qui snipe les cibles du Brain."""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.api_url = None
-        self.targets = []
-        self.last_targets_load = 0
+        self.client = None
+        self.bus = TargetSubscriber(TARGETS_FILE)
+        self.targets = self.bus.targets()
         self.purchases_this_hour = 0
         self.hour_start = time.time()
         self.total_spent = 0
@@ -52,42 +53,17 @@ class AutoWorker:
         if not os.path.exists(SESSION_FILE):
             raise SystemExit("[ERREUR] Pas de session. Lance: python auth_capture.py")
             
-        with open(SESSION_FILE, 'r') as f:
-            data = json.load(f)
-        
-        self.api_url = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com"
-        
-        self.session.headers.update({
-            "User-Agent": data.get("user_agent", "Mozilla/5.0"),
-            "X-UT-SID": data.get("x-ut-sid"),
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-        })
+        data = load_session(SESSION_FILE)
+        self.client = get_client(data)
         
         print(f"[SESSION] Token: {data.get('x-ut-sid', '')[:20]}...")
         
     def refresh_targets(self):
-        """Recharge les cibles depuis le fichier généré par Brain."""
-        # Ne pas recharger trop souvent
-        if time.time() - self.last_targets_load < TARGETS_REFRESH_INTERVAL:
-            return
-            
-        if not os.path.exists(TARGETS_FILE):
-            return
-        
-        try:
-            with open(TARGETS_FILE, 'r') as f:
-                data = json.load(f)
-            
-            self.targets = data.get("targets", [])
-            self.last_targets_load = time.time()
-            
-            updated_at = data.get("updated_at", "?")
-            print(f"[REFRESH] {len(self.targets)} cibles chargées (màj: {updated_at})")
-            
-        except (json.JSONDecodeError, IOError):
-            # Fichier en cours d'écriture par Brain
-            pass
+        """Applique les cibles poussées par le scanner (non bloquant)."""
+        if self.bus.poll():
+            print(f"[REFRESH] {len(self.bus.targets())} cibles reçues (màj: {self.bus.generated_at or '?'})")
+        # Filtre aussi les cibles expirées depuis le dernier push
+        self.targets = self.bus.targets()
     
     def check_hour_limit(self):
         """Vérifie et reset le compteur horaire."""
@@ -98,135 +74,115 @@ class AutoWorker:
             
         return self.purchases_this_hour < MAX_BUYS_PER_HOUR
     
-    def search_market(self, target: dict) -> list:
+    def search_market(self, target: Target) -> list:
         """
         Recherche les items sur le marché pour une cible.
         Retourne la liste des auctions trouvées.
         """
-        url = f"{self.api_url}/ut/game/fc26/transfermarket"
-        
         params = {
             "num": 21,
-            "type": target["type"],
-            "maxb": target["max_buy"],
+            "type": target.type,
+            "maxb": target.max_buy_price,
             "_": int(time.time() * 1000)  # Cache buster
         }
         
-        if target["type"] == "player":
-            params["maskedDefId"] = target["id"]
-        elif target["type"] == "training":
-            params["cat"] = target.get("cat", "playStyle")
-            params["definitionId"] = target["id"]
+        if target.type == "player":
+            params["maskedDefId"] = target.player_id
+        elif target.type == "training":
+            params["cat"] = target.cat or "playStyle"
+            params["definitionId"] = target.player_id
         
-        try:
-            resp = self.session.get(url, params=params, timeout=10)
-            
-            if resp.status_code == 200:
-                return resp.json().get("auctionInfo", [])
-            elif resp.status_code == 429:
-                print("[429] Rate Limit - Pause 20s")
-                time.sleep(20)
-            elif resp.status_code == 401:
-                print("[401] Token expiré - Relance auth_capture.py")
-                exit(1)
-            else:
-                print(f"[WARN] Status {resp.status_code}")
-                
-        except requests.exceptions.RequestException as e:
-            print(f"[ERREUR] {e}")
+        resp = self.client.get("transfermarket", params=params, timeout=10)
+        status = classify(resp)
+        
+        if status == OK:
+            try:
+                return decode_auctions(resp)
+            except ValueError:  # 200 non JSON (page Cloudflare / maintenance)
+                return []
+        elif status == RATE_LIMIT:
+            print("[429] Rate Limit - Pause 20s")
+            time.sleep(20)
+        elif status == TOKEN_EXPIRED:
+            print("[401] Token expiré - Relance auth_capture.py")
+            exit(1)
+        elif status != NETWORK_ERROR:
+            print(f"[WARN] Status {resp.status_code}")
         
         return []
     
-    def execute_buy(self, item: dict, target: dict) -> bool:
+    def execute_buy(self, item: Auction, target: Target) -> bool:
         """
         Exécute l'achat d'un item.
         Retourne True si succès.
         """
-        trade_id = item["tradeId"]
-        price = item["buyNowPrice"]
+        trade_id = item.trade_id
+        price = item.buy_now
         
-        url = f"{self.api_url}/ut/game/fc26/trade/{trade_id}/bid"
         payload = {"bid": price}
         
-        try:
-            start = time.time()
-            resp = self.session.put(url, json=payload, timeout=10)
-            latency = int((time.time() - start) * 1000)
+        start = time.time()
+        resp = self.client.put(f"trade/{trade_id}/bid", data=payload, timeout=10)
+        latency = int((time.time() - start) * 1000)
+        status = classify(resp)
+        
+        if status == OK:
+            self.purchases_this_hour += 1
+            self.total_purchases += 1
+            self.total_spent += price
             
-            if resp.status_code == 200:
-                self.purchases_this_hour += 1
-                self.total_purchases += 1
-                self.total_spent += price
-                
-                print(f"\033[92m[$$$] ACHAT OK!\033[0m {target['name']} @ {price} CR (latency: {latency}ms)")
-                print(f"     Profit attendu: +{target.get('expected_profit', '?')} CR")
-                print(f"     Total session: {self.total_purchases} achats, {self.total_spent} CR dépensés")
-                
-                # Log l'achat
-                self.log_purchase(target, item, price)
-                
-                # Notification sonore
-                print('\a')
-                
-                return True
-            else:
-                print(f"[FAIL] Achat échoué: {resp.status_code} - {resp.text[:100]}")
-                
-        except requests.exceptions.RequestException as e:
-            print(f"[ERREUR] Buy failed: {e}")
+            print(f"\033[92m[$$$] ACHAT OK!\033[0m {target.player_name} @ {price} CR (latency: {latency}ms)")
+            print(f"     Profit attendu: +{target.expected_profit} CR")
+            print(f"     Total session: {self.total_purchases} achats, {self.total_spent} CR dépensés")
+            
+            # Log l'achat
+            self.log_purchase(target, item, price)
+            
+            # Notification sonore
+            print('\a')
+            
+            return True
+        elif status != NETWORK_ERROR:
+            print(f"[FAIL] Achat échoué: {resp.status_code} - {resp.text[:100]}")
         
         return False
     
-    def log_purchase(self, target: dict, item: dict, price: int):
-        """Enregistre l'achat dans un fichier log."""
-        log_entry = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "name": target["name"],
-            "trade_id": item["tradeId"],
-            "price": price,
-            "market_price": target.get("market_price"),
-            "expected_profit": target.get("expected_profit")
-        }
-        
-        # Charger log existant
-        logs = []
-        if os.path.exists(PURCHASES_LOG):
-            try:
-                with open(PURCHASES_LOG, 'r') as f:
-                    logs = json.load(f)
-            except:
-                pass
-        
-        logs.append(log_entry)
-        
-        with open(PURCHASES_LOG, 'w') as f:
-            json.dump(logs, f, indent=2)
+    def log_purchase(self, target: Target, item: Auction, price: int):
+        """Enregistre l'achat dans le journal des trades."""
+        get_journal().record(
+            "auto_worker",
+            player_name=target.player_name,
+            trade_id=item.trade_id,
+            price=price,
+            expected_profit=target.expected_profit,
+            expected_sell=target.target_sell_price,
+        )
     
-    def snipe_target(self, target: dict):
+    def snipe_target(self, target: Target):
         """
         Cherche et achète la meilleure opportunité pour une cible.
         """
         items = self.search_market(target)
         
         if not items:
-            print(f"[SCAN] {target['name']} < {target['max_buy']} : Rien trouvé")
+            print(f"[SCAN] {target.player_name} < {target.max_buy_price} : Rien trouvé")
             return
         
         # Trier par prix croissant
-        items.sort(key=lambda x: x.get('buyNowPrice', 999999))
+        items.sort(key=lambda x: x.buy_now or 999999)
         
         # Filtrer les BIN disponibles
-        buyable = [i for i in items if i.get('buyNowPrice', 0) > 0]
+        buyable = [i for i in items if i.buy_now > 0]
         
         if not buyable:
-            print(f"[SCAN] {target['name']} : {len(items)} items mais pas de BIN")
+            print(f"[SCAN] {target.player_name} : {len(items)} items mais pas de BIN")
             return
         
         # Prendre le moins cher
         best = buyable[0]
-        price = best['buyNowPrice']
+        price = best.buy_now
         
-        print(f"[!!!] TROUVÉ: {target['name']} @ {price} CR (max: {target['max_buy']})")
+        print(f"[!!!] TROUVÉ: {target.player_name} @ {price} CR (max: {target.max_buy_price})")
         
         # Exécuter l'achat
         if self.execute_buy(best, target):
@@ -265,7 +221,7 @@ class AutoWorker:
                 
                 if not self.targets:
                     print("[WAIT] Aucune cible. En attente du Brain...")
-                    time.sleep(5)
+                    self.bus.wait(5)  # Réveil immédiat si des cibles arrivent
                     continue
                 
                 # Vérifier limite horaire
@@ -288,6 +244,7 @@ class AutoWorker:
             except KeyboardInterrupt:
                 print("\n[STOP] Arrêt demandé.")
                 print(f"[STATS] Total: {self.total_purchases} achats, {self.total_spent} CR")
+                self.bus.close()
                 break
             except Exception as e:
                 print(f"[ERREUR] {e}")
@@ -0,0 +1,269 @@
+"""Parse-time benchmark of futbin_parser on a saved Futbin page.
+
+futbin_feed and futbin_pricer only ever parse live pages, so nothing tracked
+what a parse costs or noticed when it changed. This script parses the
+fixture page (fixtures/futbin_cheapest_by_rating.html) with each backend:
+
+- futbin_parser with lxml and with html.parser: median ms per page
+- the BeautifulSoup code the scrapers used before (reported for comparison)
+
+and checks that every backend extracts the same prices as the BeautifulSoup
+code (pricer columns, feed sections, feed text fallback). The fixture is a
+synthetic page shaped like Futbin's (scripts, navigation, one PC and one
+console column per rating); --write-fixture regenerates it from a seed.
+
+    python bench_futbin_parser.py                    # compare to bench_baseline.json
+    python bench_futbin_parser.py --repeat 50
+    python bench_futbin_parser.py --update-baseline  # store the current numbers
+
+Exits with status 1 when the backends disagree or a timing regresses past
+the tolerance.
+"""
+
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+import futbin_parser
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(REPO_DIR, "bench_baseline.json")
+BASELINE_KEY = "futbin_parser"
+FIXTURE_FILE = os.path.join(REPO_DIR, "fixtures", "futbin_cheapest_by_rating.html")
+METRICS = ("lxml_ms", "html_parser_ms")
+SLACK_MS = 1.0
+MIN_RATING = 83   # Bornes de futbin_pricer
+MAX_RATING = 92
+
+NAMES = ["Silva", "Müller", "Kane", "Rodríguez", "Kimmich", "Saka", "Martínez", "Dias",
+         "Bernardo", "Rice", "Pedri", "Gündoğan", "Barella", "Hakimi", "Mbappé", "Son",
+         "Valverde", "Rüdiger", "Lautaro", "Theo", "Davies", "Foden", "Bruno", "Kvaratskhelia"]
+
+
+# =============================================================================
+# FIXTURE
+# =============================================================================
+
+def _format_price(price: int, rng: random.Random) -> str:
+    """Futbin writes '950', '1,250', '1.2K' or '12.5K'."""
+    if price >= 1_000_000:
+        return f"{price / 1_000_000:.2f}M"
+    if price >= 10_000 or rng.random() < 0.5:
+        return f"{price / 1000:.1f}K" if price >= 1000 else str(price)
+    return f"{price:,}"
+
+
+def make_fixture(seed: int = 42, players_per_column: int = 12) -> str:
+    rng = random.Random(seed)
+    parts = ["<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">",
+             "<title>Cheapest Players by Rating - FUTBIN</title>"]
+    # Scripts et styles volumineux comme sur la vraie page (ignorés par get_text)
+    for i in range(40):
+        parts.append(f"<script>window.__fb{i}={{id:{i},ratings:[83,84,85],"
+                     + "x".join(str(rng.randint(0, 10 ** 6)) for _ in range(300)) + "};</script>")
+    parts.append("<style>" + "".join(f".c{i}{{margin:{i}px}}" for i in range(2000)) + "</style></head><body>")
+    parts.append("<nav class=\"main-nav\"><ul>")
+    for i in range(600):
+        parts.append(f"<li><a href=\"/26/players?page={i}\">Players {i}</a></li>")
+    parts.append("</ul></nav><div class=\"stc-cheapest-wrapper\"><h1>Cheapest by Rating</h1>")
+
+    for rating in range(81, 97):
+        base = 400 * 1.45 ** (rating - 81)
+        for platform, css, label in (("console", "hide-not-console", "psxbox"), ("pc", "hide-not-pc", "pc")):
+            parts.append(f"<div class=\"stc-player-column {css}\">{rating} Rated"
+                         f"<div class=\"stc-rating\">{rating}</div><!-- {platform} -->")
+            for _ in range(players_per_column):
+                price = int(base * rng.uniform(0.95, 1.6) / 50) * 50
+                name = rng.choice(NAMES)
+                parts.append(
+                    f"<a class=\"stc-player\" href=\"/26/player/{rng.randint(1000, 99999)}\">"
+                    f"<img src=\"/img/{rng.randint(1, 999)}.png\" alt=\"\">"
+                    f"<span class=\"stc-name\">{name} &amp; co</span>"
+                    f"<span class=\"platform-label\">{label}</span>"
+                    f"<div class=\"platform-price-wrapper-small\">{_format_price(price, rng)}</div></a>"
+                )
+            parts.append("</div>")
+    parts.append("</div><footer>")
+    for i in range(200):
+        parts.append(f"<p>FUTBIN {i} &copy; 2025 - all prices are estimates</p>")
+    parts.append("</footer></body></html>")
+    return "".join(parts)
+
+
+# =============================================================================
+# ANCIEN CODE (BeautifulSoup), référence des résultats
+# =============================================================================
+
+def legacy_columns(html: str) -> Dict[int, int]:
+    """futbin_pricer.run_pricer before futbin_parser."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    columns = soup.select('.stc-player-column.hide-not-pc') or soup.select('.stc-player-column')
+    prices_by_rating = {}
+    for col in columns:
+        rating_div = col.select_one('.stc-rating')
+        if not rating_div:
+            continue
+        try:
+            rating = int(''.join(filter(str.isdigit, rating_div.get_text(strip=True))))
+        except ValueError:
+            continue
+        if not (MIN_RATING <= rating <= MAX_RATING):
+            continue
+        prices = [futbin_parser.parse_price(p.get_text(strip=True))
+                  for p in col.select('.platform-price-wrapper-small')]
+        prices = [p for p in prices if p > 0]
+        if prices and (rating not in prices_by_rating or min(prices) < prices_by_rating[rating]):
+            prices_by_rating[rating] = min(prices)
+    return prices_by_rating
+
+
+def legacy_sections(html: str) -> Dict[int, int]:
+    """futbin_feed.scrape_futbin_prices (API page) before futbin_parser."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    mapping = {}
+    for rating in range(81, 97):
+        rated_header = soup.find(string=re.compile(f"^{rating}\\s*Rated", re.IGNORECASE))
+        if not rated_header:
+            continue
+        prices = re.findall(r'(?:psxbox|pc)([0-9.,]+[KMkm]?)', rated_header.find_parent().get_text())
+        prices = [p for p in map(futbin_parser.parse_price, prices) if p > 0]
+        if prices:
+            mapping[rating] = min(prices)
+    return mapping
+
+
+def legacy_text(html: str) -> Dict[int, int]:
+    """futbin_feed.scrape_futbin_prices (main page fallback) before futbin_parser."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    mapping = {}
+    for rating in range(81, 97):
+        pattern = re.compile(f'{rating}.*?([0-9.,]+[KMkm]?)', re.DOTALL)
+        matches = pattern.findall(soup.get_text())
+        prices = [p for p in map(futbin_parser.parse_price, matches[:10]) if 100 < p < 10000000]
+        if prices:
+            mapping[rating] = min(prices)
+    return mapping
+
+
+# =============================================================================
+# MESURE
+# =============================================================================
+
+def extract(page: futbin_parser.FutbinPage) -> Dict[str, Dict[int, int]]:
+    return {
+        "columns": futbin_parser.cheapest_by_column(page, MIN_RATING, MAX_RATING),
+        "sections": futbin_parser.cheapest_by_section(page),
+        "text": futbin_parser.cheapest_in_text(page),
+    }
+
+
+def time_ms(fn: Callable[[], object], repeat: int) -> float:
+    """Median wall time of fn() in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def run(html: str, repeat: int) -> Dict[str, object]:
+    backends = ["html.parser"] + (["lxml"] if futbin_parser.etree is not None else [])
+    results: Dict[str, object] = {"page_kib": round(len(html.encode()) / 1024, 1)}
+    outputs = {}
+    for backend in backends:
+        metric = backend.replace(".", "_") + "_ms"
+        # Parse + les trois extractions: tout ce que font les scrapers sur une page
+        results[metric] = time_ms(lambda: extract(futbin_parser.parse(html, backend)), repeat)
+        outputs[backend] = extract(futbin_parser.parse(html, backend))
+
+    try:
+        reference = {"columns": legacy_columns(html), "sections": legacy_sections(html), "text": legacy_text(html)}
+    except ImportError:  # bs4 absent: pas de référence
+        reference = None
+    if reference is not None:
+        legacy = lambda: (legacy_columns(html), legacy_sections(html), legacy_text(html))
+        results["beautifulsoup_ms"] = time_ms(legacy, max(1, repeat // 10))
+        outputs["beautifulsoup"] = reference
+
+    expected = next(iter(outputs.values()))
+    results["mismatches"] = [name for name, output in outputs.items() if output != expected]
+    results["ratings"] = {kind: len(prices) for kind, prices in expected.items()}
+    return results
+
+
+def compare(results: Dict[str, object], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    regressions = []
+    for metric in METRICS:
+        current, base = results.get(metric), baseline.get(metric)
+        if current is None or base is None:
+            continue
+        if current > base * (1 + tolerance) and current - base > SLACK_MS:
+            regressions.append(f"{BASELINE_KEY}.{metric}: {current} (baseline {base})")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="futbin_parser parse-time benchmark on a fixture page")
+    parser.add_argument("--fixture", default=FIXTURE_FILE)
+    parser.add_argument("--repeat", type=int, default=20, help="parses per backend (median reported)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Relative slack before a regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--write-fixture", action="store_true", help="Regenerate the fixture and exit")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.write_fixture:
+        os.makedirs(os.path.dirname(args.fixture), exist_ok=True)
+        with open(args.fixture, "w", encoding="utf-8") as f:
+            f.write(make_fixture(args.seed))
+        print(f"[FIXTURE] {args.fixture}")
+        sys.exit(0)
+
+    with open(args.fixture, encoding="utf-8") as f:
+        html = f.read()
+    results = run(html, args.repeat)
+
+    print(f"Page: {results['page_kib']} KiB | notes extraites: {results['ratings']}")
+    for metric in ("lxml_ms", "html_parser_ms", "beautifulsoup_ms"):
+        if metric in results:
+            print(f"  {metric:<18} {results[metric]:>9.3f} ms/page")
+
+    if results["mismatches"]:
+        print(f"\n[ERREUR] Prix différents selon le backend: {', '.join(results['mismatches'])}")
+        sys.exit(1)
+
+    measured = {metric: results[metric] for metric in METRICS if metric in results}
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline[BASELINE_KEY] = measured
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n[BASELINE] {BASELINE_KEY} enregistré -> {args.baseline}")
+        sys.exit(0)
+
+    if BASELINE_KEY not in baseline:
+        print(f"\n[BASELINE] {BASELINE_KEY} absent de {args.baseline} - lance avec --update-baseline")
+        sys.exit(0)
+    regressions = compare(measured, baseline[BASELINE_KEY], args.tolerance)
+    if regressions:
+        print("\n[REGRESSION]")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\n[OK] Aucune régression")
@@ -0,0 +1,377 @@
+"""Scan-to-bid latency benchmark of every sniper against the local mock market.
+
+Nothing measured how long a bot takes between receiving a transfermarket
+page and sending trade/{id}/bid, which is what decides who wins a listing.
+This harness starts mock_market.py, points the bots at it through
+EA_BASE_URL and runs their real loops for a fixed number of result pages:
+
+- a probe wrapped around the HTTP layer (requests.Session for the
+  ea_client / smart_worker bots, api_request for the Discord bot) stamps
+  the end of every transfermarket response and the start of the next request
+- decision latency = response received -> bid sent (wall clock, pages with a bid)
+- CPU per page = process time from a response to the bot's next request
+- allocations per page = tracemalloc peak over the same window (second run)
+
+Anti-ban sleeps are skipped: each bot module gets a virtual clock whose
+sleep() (and asyncio.sleep() for the Discord bot) only moves time.time()
+forward, so hourly limits still roll over.
+
+    python bench_latency.py                      # compare to bench_baseline.json
+    python bench_latency.py --bots fodder_sniper,turbo_sniper --pages 500
+    python bench_latency.py --update-baseline    # store the current numbers
+
+Exits with status 1 when a metric regresses past the tolerance.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import random
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+import mock_market
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(REPO_DIR, "bench_baseline.json")
+DATA_FILES = ("snipe_filters.json", "fodder_targets.json")
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "cpu_us", "alloc_kib")
+# Écart absolu toléré par métrique (bruit de mesure à ces échelles)
+SLACK = {"p50_ms": 0.1, "p95_ms": 0.2, "p99_ms": 0.3, "cpu_us": 50, "alloc_kib": 16}
+
+_BID_PATH = re.compile(r"/trade/\d+/bid$")
+
+
+class PageBudgetExhausted(BaseException):
+    """Stops a bot loop once its pages are done (not caught by `except Exception`)."""
+
+
+class VirtualClock:
+    """Stand-in for a bot module's `time`: sleep() advances a virtual offset."""
+
+    def __init__(self):
+        self.offset = 0.0
+
+    def sleep(self, seconds):
+        self.offset += max(0.0, seconds)
+
+    def time(self):
+        return time.time() + self.offset
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class VirtualAsyncio:
+    """Same for a module's `asyncio`: sleep() yields once and moves the clock."""
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+
+    async def sleep(self, seconds, result=None):
+        self.clock.sleep(seconds)
+        return await asyncio.sleep(0, result)
+
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+
+def _percentile(sorted_values: list, q: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class LatencyProbe:
+    def __init__(self, base_url: str, pages: int, trace_alloc: bool = False):
+        self.base_url = base_url
+        self.budget = pages
+        self.trace_alloc = trace_alloc
+        self.pages = 0
+        self.pending = None       # (perf_counter, process_time, mémoire) de la dernière page reçue
+        self.decisions: List[float] = []
+        self.cpu: List[float] = []
+        self.allocs: List[int] = []
+
+    def before(self, method: str, url: str):
+        if not url.startswith(self.base_url):
+            return
+        now, cpu = time.perf_counter(), time.process_time()
+        if self.pending is not None:
+            received, cpu_received, memory = self.pending
+            self.pending = None
+            self.cpu.append(cpu - cpu_received)
+            if self.trace_alloc:
+                self.allocs.append(tracemalloc.get_traced_memory()[1] - memory)
+            if method.upper() == "PUT" and _BID_PATH.search(url.split("?")[0]):
+                self.decisions.append(now - received)
+        if url.split("?")[0].endswith("/transfermarket"):
+            if self.pages >= self.budget:
+                raise PageBudgetExhausted()
+            self.pages += 1
+
+    def after(self, method: str, url: str, ok: bool):
+        if not ok or not url.split("?")[0].endswith("/transfermarket"):
+            return
+        memory = 0
+        if self.trace_alloc:
+            tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+        self.pending = (time.perf_counter(), time.process_time(), memory)
+
+    @contextlib.contextmanager
+    def patch_requests(self):
+        original = requests.Session.request
+        probe = self
+
+        def request(session, method, url, *args, **kwargs):
+            method = (kwargs.get("headers") or {}).get("X-HTTP-Method-Override", method)
+            probe.before(method, url)
+            resp = original(session, method, url, *args, **kwargs)
+            probe.after(method, url, resp.status_code == 200)
+            return resp
+
+        requests.Session.request = request
+        try:
+            yield
+        finally:
+            requests.Session.request = original
+
+    def summary(self) -> dict:
+        decisions = sorted(self.decisions)
+        ms = lambda q: round(_percentile(decisions, q) * 1000, 3) if decisions else None
+        return {
+            "pages": self.pages,
+            "bids": len(decisions),
+            "p50_ms": ms(0.50),
+            "p95_ms": ms(0.95),
+            "p99_ms": ms(0.99),
+            "cpu_us": round(sum(self.cpu) / len(self.cpu) * 1e6, 1) if self.cpu else None,
+        }
+
+
+# =============================================================================
+# DRIVERS (une boucle réelle par bot, arrêtée par PageBudgetExhausted)
+# =============================================================================
+
+def _with_clock(module):
+    module.time = VirtualClock()
+    return module
+
+
+def run_snipe_worker(probe, mock):
+    import snipe_worker
+    _with_clock(snipe_worker)
+    with probe.patch_requests():
+        snipe_worker.AggressiveSniper().run()
+
+
+def run_fodder_sniper(probe, mock):
+    import fodder_sniper
+    _with_clock(fodder_sniper)
+    with probe.patch_requests():
+        fodder_sniper.FodderSniper(target_rating=83).run(max_cycles=10 ** 9)
+
+
+def run_night_trader(probe, mock):
+    import night_trader
+    _with_clock(night_trader)
+    with probe.patch_requests():
+        night_trader.NightTrader().run(hours=10 ** 6)
+
+
+def run_hard_sniper(probe, mock):
+    import hard_sniper
+    _with_clock(hard_sniper)
+    with probe.patch_requests():
+        hard_sniper.main()
+
+
+def run_turbo_sniper(probe, mock):
+    import turbo_sniper
+    _with_clock(turbo_sniper)
+    turbo_sniper.DISCORD_ENABLED = False
+    with probe.patch_requests():
+        turbo_sniper.main()
+
+
+def run_smart_worker(probe, mock):
+    os.environ["TARGET_PLAYER_ID"] = str(mock.market.players[0]["assetId"])
+    import smart_worker
+    _with_clock(smart_worker)
+    with probe.patch_requests():
+        smart_worker.main()
+
+
+def run_discord_bot(probe, mock):
+    import discord_bot  # discord.py + aiohttp
+    _with_clock(discord_bot)
+    discord_bot.asyncio = VirtualAsyncio(discord_bot.time)
+    original = discord_bot.api_request
+
+    async def api_request(method, endpoint, json_data=None, params=None):
+        url = f"{discord_bot.BASE_URL}/{endpoint}"
+        probe.before(method, url)
+        data = await original(method, endpoint, json_data=json_data, params=params)
+        probe.after(method, url, "error" not in data)
+        return data
+
+    async def loop():
+        try:
+            while True:
+                await discord_bot.sniper_loop.coro()
+        finally:
+            # File post-achat et session aiohttp liées à cette boucle asyncio (une par passe)
+            await discord_bot.stop_post_buy_worker()
+            await discord_bot.close_http_session()
+
+    discord_bot.api_request = api_request
+    discord_bot.ea_session = {"x-ut-sid": "bench", "user_agent": "bench"}
+    discord_bot.config["running"] = True
+    try:
+        asyncio.run(loop())
+    finally:
+        discord_bot.api_request = original
+
+
+BOTS: Dict[str, Callable] = {
+    "snipe_worker": run_snipe_worker,
+    "fodder_sniper": run_fodder_sniper,
+    "night_trader": run_night_trader,
+    "hard_sniper": run_hard_sniper,
+    "turbo_sniper": run_turbo_sniper,
+    "smart_worker": run_smart_worker,
+    "discord_bot": run_discord_bot,
+}
+
+
+def run_bot(name: str, mock: mock_market.MockServer, pages: int, seed: int,
+            trace_alloc: bool = False) -> LatencyProbe:
+    """One bot run on a fresh order book (same seed for every bot)."""
+    mock.market = mock_market.MockMarket(seed=seed)
+    random.seed(seed)
+    probe = LatencyProbe(mock.base_url, pages, trace_alloc)
+    if trace_alloc:
+        tracemalloc.start()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            BOTS[name](probe, mock)
+    except PageBudgetExhausted:
+        pass
+    finally:
+        if trace_alloc:
+            tracemalloc.stop()
+    return probe
+
+
+def benchmark(names: List[str], pages: int, seed: int, latency: Optional[str]) -> Dict[str, dict]:
+    workdir = tempfile.mkdtemp(prefix="bench_latency_")
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(REPO_DIR, name), workdir)
+    with open(os.path.join(workdir, "active_session.json"), "w") as f:
+        json.dump({"x-ut-sid": "bench-session", "user_agent": "bench"}, f)
+
+    mock = mock_market.serve(seed=seed, latency=latency)
+    # Lu à l'import par ea_client, smart_worker et discord_bot
+    os.environ["EA_BASE_URL"] = mock.base_url
+    os.environ["GATEWAY_URL"] = "http://127.0.0.1:9"   # Télémétrie: échec immédiat, hors mesure
+    os.environ["TRADE_JOURNAL_DB"] = os.path.join(workdir, "trade_journal.db")
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+
+    results = {}
+    try:
+        for name in names:
+            try:
+                result = run_bot(name, mock, pages, seed).summary()
+                allocs = run_bot(name, mock, pages, seed, trace_alloc=True).allocs
+                result["alloc_kib"] = round(sum(allocs) / len(allocs) / 1024, 1) if allocs else None
+            except ImportError as e:
+                result = {"skipped": f"missing dependency: {e.name}"}
+            results[name] = result
+    finally:
+        os.chdir(previous_dir)
+        mock.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Regressions: metric above baseline * (1 + tolerance) and beyond its absolute slack."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name) or {}
+        for metric in METRICS:
+            current, base = result.get(metric), reference.get(metric)
+            if current is None or base is None:
+                continue
+            if current > base * (1 + tolerance) and current - base > SLACK[metric]:
+                regressions.append(f"{name}.{metric}: {current} (baseline {base})")
+    return regressions
+
+
+def print_report(results: Dict[str, dict]):
+    print(f"{'bot':<15} {'pages':>6} {'bids':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'cpu/page µs':>12} {'alloc/page KiB':>15}")
+    fmt = lambda v: "-" if v is None else str(v)
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:<15} {r['skipped']}")
+            continue
+        print(f"{name:<15} {r['pages']:>6} {r['bids']:>5} {fmt(r['p50_ms']):>8} {fmt(r['p95_ms']):>8} "
+              f"{fmt(r['p99_ms']):>8} {fmt(r['cpu_us']):>12} {fmt(r['alloc_kib']):>15}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan-to-bid latency benchmark against mock_market.py")
+    parser.add_argument("--bots", default=",".join(BOTS), help="Comma-separated subset of: " + ", ".join(BOTS))
+    parser.add_argument("--pages", type=int, default=300, help="transfermarket pages per bot")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", help="Mock network latency (see mock_market.parse_latency)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Relative slack before a regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.bots.split(",") if n.strip()]
+    unknown = [n for n in names if n not in BOTS]
+    if unknown:
+        parser.error(f"unknown bots: {', '.join(unknown)}")
+
+    results = benchmark(names, args.pages, args.seed, args.latency)
+    print_report(results)
+
+    measured = {name: r for name, r in results.items() if "skipped" not in r}
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(measured)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n[BASELINE] {len(measured)} bots enregistrés -> {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"\n[BASELINE] {args.baseline} absent - lance avec --update-baseline")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        regressions = compare(measured, json.load(f), args.tolerance)
+    if regressions:
+        print("\n[REGRESSION]")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\n[OK] Aucune régression")
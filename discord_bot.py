@@ -11,29 +11,29 @@ import asyncio
 import aiohttp
 import time
 import re
+from collections import namedtuple
 from datetime import datetime
 import os
 
+from ea_client import loads, parse_auctions
+from filter_engine import match_page
+from notifier import ERROR, SUCCESS, WARNING, Notifier
+from price_service import get_price_service
+
 # ==================== CONFIG ====================
 DISCORD_BOT_TOKEN = ""  # À remplir avec ton token bot Discord
 DISCORD_CHANNEL_ID = None  # Canal où envoyer les notifs (auto-détecté)
 
-BASE_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
+# Hôte EA FC26; EA_BASE_URL permet de viser un autre hôte (ex: mock_market.py)
+BASE_URL = os.environ.get("EA_BASE_URL", "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26")
 
 # Config par défaut
 config = {
     "running": False,
     "target_rating": 83,
     "scan_delay": 2.0,
-    "price_ranges": {
-        83: {"min": 700, "max": 900, "sell": 1000},
-        84: {"min": 800, "max": 1100, "sell": 1200},
-        85: {"min": 2200, "max": 2800, "sell": 3000},
-        86: {"min": 4500, "max": 5500, "sell": 6000},
-        87: {"min": 7500, "max": 9000, "sell": 10000},
-        88: {"min": 11000, "max": 13500, "sell": 15000},
-    }
 }
+# Plages d'achat/vente par note: price_service.py (plages manuelles puis Futbin, !prix, rechargées à chaud)
 
 # Stats session
 stats = {
@@ -48,10 +48,52 @@ stats = {
 # Session EA
 ea_session = None
 
+# Pool HTTP EA: une seule session aiohttp pour toute la vie du bot
+HTTP_LIMIT_PER_HOST = 4       # Connexions simultanées max vers EA
+HTTP_KEEPALIVE = 60           # Secondes avant fermeture d'une connexion inactive
+DNS_CACHE_TTL = 300           # Résolution DNS gardée 5 min
+SEARCH_TIMEOUT = aiohttp.ClientTimeout(total=5, sock_connect=2)
+ACTION_TIMEOUT = aiohttp.ClientTimeout(total=3, sock_connect=2)
+
+http_session = None
+
+# Compteurs de réutilisation (TraceConfig)
+http_stats = {
+    "requests": 0,
+    "connections_created": 0,
+    "connections_reused": 0,
+    "dns_lookups": 0,
+    "dns_cache_hits": 0,
+}
+
+# Post-achat (notification, pile de transfert, mise en vente) hors de la boucle de scan
+POST_BUY_QUEUE_SIZE = 50      # Au-delà, la boucle de scan attend le consommateur
+POST_BUY_DRAIN_TIMEOUT = 15   # Secondes laissées aux achats en attente à l'arrêt
+
+PostBuy = namedtuple("PostBuy", ["player_name", "rating", "item_id", "buy_price",
+                                 "sell_price", "profit", "quality"])
+
+post_buy_queue = None
+post_buy_task = None
+
+# Notifications du canal: file + résumés envoyés par le thread du notifier
+NOTIFY_SEND_TIMEOUT = 10      # Secondes max pour un channel.send
+
+channel_notifier = None
+
 # ==================== DISCORD BOT ====================
+class SniperBot(commands.Bot):
+    async def close(self):
+        await stop_post_buy_worker()
+        if channel_notifier is not None:
+            # Le dernier envoi passe par cette boucle: ne pas la bloquer pendant la vidange
+            await asyncio.to_thread(channel_notifier.close)
+        await close_http_session()
+        await super().close()
+
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = SniperBot(command_prefix="!", intents=intents)
 
 # ==================== EA API FUNCTIONS ====================
 def load_session():
@@ -73,6 +115,44 @@ def get_headers():
         "Content-Type": "application/json"
     }
 
+def make_trace_config():
+    """Compte requêtes, connexions ouvertes/réutilisées et résolutions DNS"""
+    def counter(key):
+        async def on_event(session, context, params):
+            http_stats[key] += 1
+        return on_event
+    
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(counter("requests"))
+    trace.on_connection_create_end.append(counter("connections_created"))
+    trace.on_connection_reuseconn.append(counter("connections_reused"))
+    trace.on_dns_resolvehost_end.append(counter("dns_lookups"))
+    trace.on_dns_cache_hit.append(counter("dns_cache_hits"))
+    return trace
+
+async def get_http_session():
+    """Session partagée (créée dans on_ready, recréée si elle a été fermée)"""
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        http_session = aiohttp.ClientSession(connector=connector, trace_configs=[make_trace_config()])
+    return http_session
+
+async def close_http_session():
+    global http_session
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+    http_session = None
+
+def http_reuse_rate():
+    """Part des requêtes servies par une connexion déjà ouverte (%)"""
+    total = http_stats["connections_created"] + http_stats["connections_reused"]
+    return round(http_stats["connections_reused"] / total * 100, 1) if total else 0.0
+
 async def api_request(method, endpoint, json_data=None, params=None):
     """Requête async vers l'API EA"""
     headers = get_headers()
@@ -82,28 +162,28 @@ async def api_request(method, endpoint, json_data=None, params=None):
     url = f"{BASE_URL}/{endpoint}"
     
     try:
-        async with aiohttp.ClientSession() as session:
-            if method == "GET":
-                async with session.get(url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                    if resp.status == 401:
-                        return {"error": "TOKEN_EXPIRED"}
-                    if resp.status == 429:
-                        return {"error": "RATE_LIMIT"}
-                    if resp.status == 200:
-                        return await resp.json()
-                    return {"error": f"HTTP_{resp.status}"}
-            elif method == "PUT":
-                async with session.put(url, headers=headers, json=json_data, timeout=aiohttp.ClientTimeout(total=3)) as resp:
-                    if resp.status == 200:
-                        return {"success": True}
-                    elif resp.status == 461:
-                        return {"error": "ALREADY_SOLD"}
-                    return {"error": f"HTTP_{resp.status}"}
-            elif method == "POST":
-                async with session.post(url, headers=headers, json=json_data, timeout=aiohttp.ClientTimeout(total=3)) as resp:
-                    if resp.status == 200:
-                        return {"success": True}
-                    return {"error": f"HTTP_{resp.status}"}
+        session = await get_http_session()
+        if method == "GET":
+            async with session.get(url, headers=headers, params=params, timeout=SEARCH_TIMEOUT) as resp:
+                if resp.status == 401:
+                    return {"error": "TOKEN_EXPIRED"}
+                if resp.status == 429:
+                    return {"error": "RATE_LIMIT"}
+                if resp.status == 200:
+                    return await resp.json(loads=loads)
+                return {"error": f"HTTP_{resp.status}"}
+        elif method == "PUT":
+            async with session.put(url, headers=headers, json=json_data, timeout=ACTION_TIMEOUT) as resp:
+                if resp.status == 200:
+                    return {"success": True}
+                elif resp.status == 461:
+                    return {"error": "ALREADY_SOLD"}
+                return {"error": f"HTTP_{resp.status}"}
+        elif method == "POST":
+            async with session.post(url, headers=headers, json=json_data, timeout=ACTION_TIMEOUT) as resp:
+                if resp.status == 200:
+                    return {"success": True}
+                return {"error": f"HTTP_{resp.status}"}
     except asyncio.TimeoutError:
         return {"error": "TIMEOUT"}
     except Exception as e:
@@ -135,7 +215,7 @@ async def search_market(rating, max_price):
     data = await api_request("GET", "transfermarket", params=params)
     if "error" in data:
         return data
-    return data.get("auctionInfo", [])
+    return parse_auctions(data)
 
 async def buy_player(trade_id, price):
     return await api_request("PUT", f"trade/{trade_id}/bid", json_data={"bid": price})
@@ -170,6 +250,98 @@ def format_time(seconds):
     else:
         return f"{int(seconds/3600)}h {int((seconds%3600)/60)}m"
 
+# ==================== NOTIFICATIONS ====================
+class ChannelNotifier(Notifier):
+    """Notifier vers le canal du bot: channel.send planifié sur la boucle du bot"""
+    loop = None
+
+    def deliver(self, payload):
+        channel = bot.get_channel(DISCORD_CHANNEL_ID) if DISCORD_CHANNEL_ID else None
+        if channel is None or self.loop is None or self.loop.is_closed():
+            return False, 0.0
+        embeds = [discord.Embed.from_dict(embed) for embed in payload.get("embeds", ())]
+        future = asyncio.run_coroutine_threadsafe(
+            channel.send(content=payload.get("content"), embeds=embeds), self.loop
+        )
+        try:
+            future.result(timeout=NOTIFY_SEND_TIMEOUT)
+        except discord.RateLimited as e:
+            # discord.py attend lui-même les 429 courts; au-delà, nouvel essai plus tard
+            return False, e.retry_after
+        except Exception as e:
+            future.cancel()
+            print(f"⚠️ Notification Discord: {e}")
+            return False, 0.0
+        return True, 0.0
+
+def get_channel_notifier():
+    """Notifier du canal (créé une fois, lié à la boucle asyncio courante)"""
+    global channel_notifier
+    if channel_notifier is None:
+        channel_notifier = ChannelNotifier(footer="FC Sniper")
+    channel_notifier.loop = asyncio.get_running_loop()
+    return channel_notifier
+
+def notify_channel(message, color=SUCCESS, urgent=False):
+    """Met une notification en file; n'attend jamais l'API Discord"""
+    get_channel_notifier().notify(description=message, color=color, urgent=urgent)
+
+# ==================== POST-ACHAT ====================
+async def process_purchase(job):
+    """Notifie puis met en vente une carte achetée"""
+    notify_channel(
+        f"{job.quality} **SNIPE!** {job.player_name} ({job.rating})\n"
+        f"💰 Acheté: {job.buy_price} CR\n"
+        f"📈 Profit: +{job.profit} CR\n"
+        f"📊 Session: {stats['total_buys']} achats | +{stats['total_profit']} CR"
+    )
+    
+    # Mettre en vente
+    await asyncio.sleep(0.5)
+    await send_to_tradepile(job.item_id)
+    await list_for_sale(job.item_id, job.sell_price)
+    print(f"📤 {job.player_name} mis en vente à {job.sell_price} CR")
+    await asyncio.sleep(2)
+
+async def post_buy_worker():
+    """Consommateur unique de la file post-achat (les actions EA restent séquentielles)"""
+    while True:
+        job = await post_buy_queue.get()
+        try:
+            await process_purchase(job)
+        except Exception as e:
+            print(f"⚠️ Post-achat {job.player_name}: {e}")
+        finally:
+            post_buy_queue.task_done()
+
+def ensure_post_buy_worker():
+    """Démarre le consommateur sur la boucle courante (une fois)"""
+    global post_buy_queue, post_buy_task
+    loop = asyncio.get_running_loop()
+    if post_buy_task is None or post_buy_task.done() or post_buy_task.get_loop() is not loop:
+        post_buy_queue = asyncio.Queue(maxsize=POST_BUY_QUEUE_SIZE)
+        post_buy_task = loop.create_task(post_buy_worker())
+
+async def enqueue_post_buy(job):
+    ensure_post_buy_worker()
+    await post_buy_queue.put(job)
+
+async def stop_post_buy_worker():
+    """Laisse la file se vider (borné) puis arrête le consommateur"""
+    global post_buy_task
+    if post_buy_task is None or post_buy_task.done():
+        post_buy_task = None
+        return
+    try:
+        await asyncio.wait_for(post_buy_queue.join(), timeout=POST_BUY_DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"⚠️ {post_buy_queue.qsize()} post-achat(s) abandonné(s) à l'arrêt")
+    post_buy_task.cancel()
+    post_buy_task = None
+
+def post_buy_pending():
+    return post_buy_queue.qsize() if post_buy_queue is not None else 0
+
 # ==================== SNIPER TASK ====================
 @tasks.loop(seconds=2.0)
 async def sniper_loop():
@@ -177,14 +349,14 @@ async def sniper_loop():
         return
     
     rating = config["target_rating"]
-    price_config = config["price_ranges"].get(rating)
+    ref = get_price_service().get(rating, manual=True)
     
-    if not price_config:
+    if ref is None:
         return
     
-    min_buy = price_config["min"]
-    max_buy = price_config["max"]
-    sell_price = price_config["sell"]
+    min_buy = ref.buy_min
+    max_buy = ref.buy_max
+    sell_price = ref.sell_price
     
     stats["scans"] += 1
     
@@ -201,16 +373,13 @@ async def sniper_loop():
         if error == "TOKEN_EXPIRED":
             print("❌ TOKEN EXPIRÉ!")
             config["running"] = False
-            channel = bot.get_channel(DISCORD_CHANNEL_ID)
-            if channel:
-                await channel.send("🚨 **Token expiré!** Utilise `!token` pour en uploader un nouveau.")
+            notify_channel("🚨 **Token expiré!** Utilise `!token` pour en uploader un nouveau.",
+                           color=ERROR, urgent=True)
             return
         elif error == "RATE_LIMIT":
             print("⚠️ Rate limit - Pause 60s...")
             stats["errors"] += 1
-            channel = bot.get_channel(DISCORD_CHANNEL_ID)
-            if channel:
-                await channel.send("⚠️ Rate limit - Pause 60s...")
+            notify_channel("⚠️ Rate limit - Pause 60s...", color=WARNING)
             await asyncio.sleep(60)
             return
         else:
@@ -221,50 +390,36 @@ async def sniper_loop():
     if len(auctions) > 0:
         print(f"🔍 Scan #{stats['scans']}: {len(auctions)} joueurs trouvés (max {max_buy} CR)")
     
-    # Trier par prix
-    auctions = sorted(auctions, key=lambda x: x.get("buyNowPrice", 999999))
+    # Note exacte et plage de prix, meilleur profit (= moins cher) d'abord
+    snipe_filter = {
+        "name": f"Note {rating}",
+        "params": {"minr": rating, "maxr": rating, "minb": min_buy, "maxb": max_buy},
+        "expected_min_value": sell_price,
+    }
     
-    for auction in auctions:
-        buy_price = auction.get("buyNowPrice", 0)
-        player_data = auction.get("itemData", {})
-        actual_rating = player_data.get("rating", 0)
+    for match in match_page(auctions, snipe_filter):
+        auction = match.auction
+        buy_price = match.price
+        trade_id = auction.trade_id
+        item_id = auction.item_id
+        player_name = auction.name or "?"
+        
+        print(f"💰 Tentative achat: {player_name} ({rating}) à {buy_price} CR...")
         
-        if actual_rating != rating:
-            continue
+        result = await buy_player(trade_id, buy_price)
         
-        if buy_price > 0 and min_buy <= buy_price <= max_buy:
-            trade_id = auction["tradeId"]
-            item_id = player_data["id"]
-            player_name = get_player_name(player_data)
+        if result.get("success"):
+            profit = match.profit
+            stats["total_buys"] += 1
+            stats["total_profit"] += profit
             
-            print(f"💰 Tentative achat: {player_name} ({rating}) à {buy_price} CR...")
+            quality = "🔥" if buy_price <= min_buy + 50 else "✅"
             
-            result = await buy_player(trade_id, buy_price)
+            print(f"{quality} SNIPE RÉUSSI! {player_name} | {buy_price} CR | +{profit} CR")
             
-            if result.get("success"):
-                profit = int(sell_price * 0.95 - buy_price)
-                stats["total_buys"] += 1
-                stats["total_profit"] += profit
-                
-                quality = "🔥" if buy_price <= min_buy + 50 else "✅"
-                
-                print(f"{quality} SNIPE RÉUSSI! {player_name} | {buy_price} CR | +{profit} CR")
-                
-                channel = bot.get_channel(DISCORD_CHANNEL_ID)
-                if channel:
-                    await channel.send(
-                        f"{quality} **SNIPE!** {player_name} ({rating})\n"
-                        f"💰 Acheté: {buy_price} CR\n"
-                        f"📈 Profit: +{profit} CR\n"
-                        f"📊 Session: {stats['total_buys']} achats | +{stats['total_profit']} CR"
-                    )
-                
-                # Mettre en vente
-                await asyncio.sleep(0.5)
-                await send_to_tradepile(item_id)
-                await list_for_sale(item_id, sell_price)
-                print(f"📤 {player_name} mis en vente à {sell_price} CR")
-                await asyncio.sleep(2)
+            # Notification et mise en vente par le consommateur: le scan suivant n'attend pas
+            await enqueue_post_buy(PostBuy(player_name, rating, item_id, buy_price,
+                                           sell_price, profit, quality))
 
 @sniper_loop.before_loop
 async def before_sniper():
@@ -275,6 +430,9 @@ async def before_sniper():
 async def on_ready():
     print(f"✅ Bot connecté: {bot.user}")
     load_session()
+    await get_http_session()
+    ensure_post_buy_worker()
+    get_channel_notifier()
 
 @bot.command(name="start")
 async def start_sniper(ctx, rating: int = 83):
@@ -286,8 +444,9 @@ async def start_sniper(ctx, rating: int = 83):
         await ctx.send("❌ Aucun token EA! Utilise `!token` pour en uploader un.")
         return
     
-    if rating not in config["price_ranges"]:
-        await ctx.send(f"❌ Note {rating} non configurée. Notes dispo: {list(config['price_ranges'].keys())}")
+    prices = get_price_service().current()
+    if prices.get(rating, manual=True) is None:
+        await ctx.send(f"❌ Note {rating} non configurée. Notes dispo: {prices.ratings()}")
         return
     
     config["target_rating"] = rating
@@ -301,7 +460,7 @@ async def start_sniper(ctx, rating: int = 83):
     stats["start_time"] = time.time()
     stats["initial_coins"] = await get_coins() or 0
     
-    price = config["price_ranges"][rating]
+    price = prices.get(rating, manual=True)
     
     if not sniper_loop.is_running():
         sniper_loop.change_interval(seconds=config["scan_delay"])
@@ -310,8 +469,8 @@ async def start_sniper(ctx, rating: int = 83):
     await ctx.send(
         f"🚀 **Sniper démarré!**\n"
         f"🎯 Note: {rating}\n"
-        f"💵 Plage: {price['min']} - {price['max']} CR\n"
-        f"📤 Vente: {price['sell']} CR\n"
+        f"💵 Plage: {price.buy_min} - {price.buy_max} CR\n"
+        f"📤 Vente: {price.sell_price} CR ({price.source})\n"
         f"💰 Solde: {format_coins(stats['initial_coins'])} CR\n"
         f"⚡ Délai: {config['scan_delay']}s"
     )
@@ -359,7 +518,15 @@ async def status(ctx):
     if tradepile:
         selling = sum(1 for i in tradepile if i.get("tradeState") == "active")
         sold = sum(1 for i in tradepile if i.get("tradeState") == "closed")
-        msg += f"📦 Pile: {selling} en vente | {sold} vendus | {len(tradepile)} total"
+        msg += f"📦 Pile: {selling} en vente | {sold} vendus | {len(tradepile)} total\n"
+    
+    msg += f"📬 Post-achat: {post_buy_pending()} en attente\n"
+    notif = get_channel_notifier().stats()
+    msg += (f"🔔 Notifs: {notif['sent']} envoyées en {notif['messages']} messages | "
+            f"{notif['queued']} en attente | {notif['dropped'] + notif['failed']} perdues\n")
+    msg += (f"🔌 HTTP: {http_stats['requests']} requêtes | "
+            f"{http_stats['connections_created']} connexions ouvertes | "
+            f"{http_stats['connections_reused']} réutilisées ({http_reuse_rate()}%)")
     
     await ctx.send(msg)
 
@@ -400,7 +567,8 @@ async def show_pile(ctx):
 @bot.command(name="prix")
 async def set_price(ctx, rating: int, min_buy: int, max_buy: int, sell: int):
     """Modifie les prix pour une note: !prix 83 700 900 1000"""
-    config["price_ranges"][rating] = {"min": min_buy, "max": max_buy, "sell": sell}
+    # Prioritaire sur les prix Futbin tant que le bot tourne
+    get_price_service().set_override(rating, buy_min=min_buy, buy_max=max_buy, sell_price=sell)
     profit_min = int(sell * 0.95 - max_buy)
     profit_max = int(sell * 0.95 - min_buy)
     await ctx.send(f"✅ Note {rating}: {min_buy}-{max_buy} CR → Vente {sell} CR (Profit: +{profit_min} à +{profit_max})")
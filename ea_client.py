@@ -0,0 +1,229 @@
+"""Shared EA transfer-market client with a persistent keep-alive pool.
+
+Every bot used to call bare requests.get/put/post, rebuilding the headers
+dict on each call and potentially paying a fresh TCP+TLS handshake between
+spotting a listing and sending the bid. This module owns one pooled
+requests.Session per EA token, with headers built once, and the uniform
+status classification (401/429/461/478) the scripts used to copy-paste.
+
+Usage:
+    client = get_client(load_session())
+    resp = client.get("transfermarket", params=params, timeout=10)
+    status = classify(resp)
+    auctions = decode_auctions(resp)   # [Auction], orjson when installed
+
+Search results are decoded straight into slotted Auction records holding
+only the fields the bots read, instead of walking nested dicts with .get
+chains on the hot path between a response and the bid.
+"""
+
+import json
+import os
+import socket
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+try:
+    import orjson
+except ImportError:  # Optionnel: repli sur le module json standard
+    orjson = None
+
+SESSION_FILE = "active_session.json"
+# Default FC26 host; override with EA_BASE_URL (e.g. to point at a local mock).
+EA_BASE_URL = os.environ.get(
+    "EA_BASE_URL",
+    "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26",
+)
+DEFAULT_TIMEOUT = float(os.environ.get("EA_TIMEOUT", 10))
+POOL_SIZE = int(os.environ.get("EA_POOL_SIZE", 4))
+# Pages transfermarket brutes enregistrées pour le rejeu (market_analyzer.py)
+MARKET_RECORD_FILE = os.environ.get("MARKET_RECORD_FILE")
+
+# ========== STATUTS NORMALISÉS ==========
+OK = "OK"
+TOKEN_EXPIRED = "TOKEN_EXPIRED"   # 401
+RATE_LIMIT = "RATE_LIMIT"         # 429
+ALREADY_SOLD = "ALREADY_SOLD"     # 461 (outbid / déjà vendu / pile pleine)
+INVALID_TRADE = "INVALID_TRADE"   # 478
+NETWORK_ERROR = "NETWORK_ERROR"   # Pas de réponse (timeout compris)
+
+_STATUS_BY_CODE = {
+    200: OK,
+    401: TOKEN_EXPIRED,
+    429: RATE_LIMIT,
+    461: ALREADY_SOLD,
+    478: INVALID_TRADE,
+}
+
+
+def classify(resp) -> str:
+    """Maps an EA response (or None after a network failure) to a status string."""
+    if resp is None:
+        return NETWORK_ERROR
+    return _STATUS_BY_CODE.get(resp.status_code, f"HTTP_{resp.status_code}")
+
+
+def load_session(path: str = SESSION_FILE) -> Dict[str, str]:
+    """Loads the session file written by auth_manager_v2.py."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def loads(content):
+    """Decodes a JSON body (bytes or str), with orjson when it is installed.
+
+    Raises ValueError on malformed input, like resp.json().
+    """
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+class Auction:
+    """One auctionInfo entry, reduced to the fields the bots actually read."""
+
+    __slots__ = ("trade_id", "buy_now", "current_bid", "starting_bid", "expires", "trade_state",
+                 "item_id", "asset_id", "rating", "rareflag", "league_id", "position",
+                 "first_name", "last_name")
+
+    def __init__(self, auction: dict):
+        item = auction.get("itemData") or {}
+        self.trade_id = auction.get("tradeId")
+        self.buy_now = auction.get("buyNowPrice") or 0
+        self.current_bid = auction.get("currentBid") or 0
+        self.starting_bid = auction.get("startingBid") or 0
+        self.expires = auction.get("expires") or 0
+        self.trade_state = auction.get("tradeState")
+        self.item_id = item.get("id")
+        self.asset_id = item.get("assetId") or item.get("resourceId") or 0
+        self.rating = item.get("rating") or 0
+        self.rareflag = item.get("rareflag") or 0
+        self.league_id = item.get("leagueId") or 0
+        self.position = item.get("preferredPosition") or ""
+        self.first_name = item.get("firstName") or ""
+        self.last_name = item.get("lastName") or ""
+
+    @property
+    def name(self) -> str:
+        if self.first_name and self.last_name:
+            return f"{self.first_name} {self.last_name}"
+        return self.last_name or self.first_name
+
+    def __repr__(self):
+        return f"<Auction {self.trade_id} {self.asset_id} ({self.rating}) @ {self.buy_now}>"
+
+
+def parse_auctions(data: dict) -> List[Auction]:
+    """auctionInfo of an already decoded response body."""
+    return [Auction(auction) for auction in data.get("auctionInfo") or ()]
+
+
+def decode_auctions(resp) -> List[Auction]:
+    """auctionInfo of a transfermarket/tradepile response as Auction records.
+
+    With MARKET_RECORD_FILE set, transfermarket bodies are also appended,
+    untouched, to the market_analyzer page recording.
+    """
+    content = resp.content
+    if MARKET_RECORD_FILE and urlsplit(resp.url or "").path.endswith("/transfermarket"):
+        import market_analyzer
+        market_analyzer.get_recorder(MARKET_RECORD_FILE).record(content)
+    return parse_auctions(loads(content))
+
+
+def build_headers(session: Dict[str, str]) -> Dict[str, str]:
+    return {
+        "X-UT-SID": session["x-ut-sid"],
+        "User-Agent": session.get("user_agent") or "Mozilla/5.0",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive on pooled sockets.
+
+    urllib3 already sets TCP_NODELAY; SO_KEEPALIVE stops idle pooled
+    connections from being silently dropped by NATs between two scans.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+class EAClient:
+    """Pooled client for the EA Web App API (one instance per token)."""
+
+    def __init__(self, session: Dict[str, str], base_url: str = EA_BASE_URL,
+                 timeout: float = DEFAULT_TIMEOUT, pool_size: int = POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.http = requests.Session()
+        adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        # Headers construits une seule fois, réutilisés par chaque requête
+        self.http.headers.update(build_headers(session))
+
+    def set_token(self, sid: str):
+        """Swaps the X-UT-SID without dropping pooled connections."""
+        self.http.headers["X-UT-SID"] = sid
+
+    def request(self, method: str, endpoint: str, params=None, data=None,
+                timeout: Optional[float] = None, headers=None):
+        """Sends a request and returns the response, or None on network error."""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        try:
+            return self.http.request(
+                method,
+                url,
+                params=params,
+                json=data,
+                headers=headers,
+                timeout=timeout or self.timeout,
+            )
+        except requests.exceptions.Timeout:
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"[NET] Erreur requête {method} {endpoint}: {e}")
+            return None
+
+    def get(self, endpoint: str, params=None, timeout: Optional[float] = None):
+        return self.request("GET", endpoint, params=params, timeout=timeout)
+
+    def put(self, endpoint: str, data=None, params=None, timeout: Optional[float] = None):
+        return self.request("PUT", endpoint, params=params, data=data, timeout=timeout)
+
+    def post(self, endpoint: str, data=None, params=None, timeout: Optional[float] = None):
+        return self.request("POST", endpoint, params=params, data=data, timeout=timeout)
+
+    def call(self, method: str, endpoint: str, **kwargs):
+        """Like request() but returns (status, response)."""
+        resp = self.request(method, endpoint, **kwargs)
+        return classify(resp), resp
+
+    def close(self):
+        self.http.close()
+
+
+_clients: Dict[str, EAClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(session: Dict[str, str], base_url: str = EA_BASE_URL) -> EAClient:
+    """Returns the process-wide client for this session token (created once)."""
+    key = f"{base_url}|{session['x-ut-sid']}"
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = EAClient(session, base_url=base_url)
+                _clients[key] = client
+    return client
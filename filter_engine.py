@@ -0,0 +1,122 @@
+"""Compiled snipe filters evaluated against a whole auctionInfo page.
+
+snipe_filters.json entries used to be sent only as query params, and each
+script re-checked results by hand (rareflag, rating, price band) because
+EA does not always honour the filters. compile_filter() turns a filter
+(league, positions, rating range, rareflag, level, price band, expected
+value) into a single predicate; FilterEngine.evaluate() tests each
+ea_client.Auction record against every active filter in one pass,
+returning the matches ranked by expected profit.
+"""
+
+from collections import namedtuple
+from typing import Iterable, List
+
+from ea_client import Auction
+
+TAX_RATE = 0.05  # Taxe EA sur la revente
+
+# Bornes de note des niveaux EA (paramètre "lev")
+LEVEL_RATINGS = {
+    "bronze": (0, 64),
+    "silver": (65, 74),
+    "gold": (75, 99),
+}
+
+Match = namedtuple("Match", ["profit", "price", "filter", "auction"])
+
+
+class CompiledFilter:
+    __slots__ = ("name", "config", "expected_value", "predicate", "source")
+
+    def __init__(self, config: dict, predicate, source: str):
+        self.name = config.get("name", "?")
+        self.config = config
+        self.expected_value = config.get("expected_min_value")
+        self.predicate = predicate
+        self.source = source
+
+    def profit(self, price: int) -> int:
+        if not self.expected_value:
+            return 0
+        return int(self.expected_value * (1 - TAX_RATE) - price)
+
+    def __repr__(self):
+        return f"<CompiledFilter {self.name}: {self.source}>"
+
+
+def compile_filter(config: dict) -> CompiledFilter:
+    """Builds one predicate(price, rating, rareflag, league, position).
+
+    Only the checks the filter actually sets end up in the predicate. Filter
+    values are bound as constants of the generated function, never pasted
+    into its source.
+    """
+    params = config.get("params", {})
+    env = {}
+    conditions = ["price > 0"]
+
+    def bind(name, value):
+        env[name] = value
+        return name
+
+    if params.get("minb"):
+        conditions.append(f"price >= {bind('minb', int(params['minb']))}")
+    if params.get("maxb"):
+        conditions.append(f"price <= {bind('maxb', int(params['maxb']))}")
+
+    min_rating, max_rating = LEVEL_RATINGS.get(str(params.get("lev", "")).lower(), (None, None))
+    if params.get("minr"):
+        min_rating = max(min_rating or 0, int(params["minr"]))
+    if params.get("maxr"):
+        max_rating = min(max_rating or 99, int(params["maxr"]))
+    if min_rating is not None and min_rating == max_rating:
+        conditions.append(f"rating == {bind('rating_eq', min_rating)}")
+    else:
+        if min_rating:
+            conditions.append(f"rating >= {bind('minr', min_rating)}")
+        if max_rating is not None:
+            conditions.append(f"rating <= {bind('maxr', max_rating)}")
+
+    if params.get("raretype") not in (None, ""):
+        conditions.append(f"rareflag == {bind('rareflag_eq', int(params['raretype']))}")
+    if params.get("leag"):
+        conditions.append(f"league == {bind('league_eq', int(params['leag']))}")
+    if params.get("pos"):
+        positions = frozenset(p.strip().upper() for p in str(params["pos"]).split(",") if p.strip())
+        conditions.append(f"position in {bind('positions', positions)}")
+
+    if config.get("expected_min_value") and config.get("min_profit") is not None:
+        net = bind("net_value", config["expected_min_value"] * (1 - TAX_RATE))
+        conditions.append(f"int({net} - price) >= {bind('min_profit', config['min_profit'])}")
+
+    source = " and ".join(conditions)
+    predicate = eval(f"lambda price, rating, rareflag, league, position: {source}", env)
+    return CompiledFilter(config, predicate, source)
+
+
+class FilterEngine:
+    def __init__(self, configs: Iterable[dict]):
+        self.filters: List[CompiledFilter] = [
+            compile_filter(c) for c in configs if c.get("active", True)
+        ]
+
+    def evaluate(self, auctions: List[Auction]) -> List[Match]:
+        """Every (auction, filter) match of the page, best expected profit first.
+
+        Filters without an expected value rank by price (cheapest first).
+        """
+        matches = []
+        filters = self.filters
+        for auction in auctions:
+            price = auction.buy_now
+            for f in filters:
+                if f.predicate(price, auction.rating, auction.rareflag, auction.league_id, auction.position):
+                    matches.append(Match(f.profit(price), price, f, auction))
+        matches.sort(key=lambda m: (-m.profit, m.price))
+        return matches
+
+
+def match_page(auctions: List[Auction], config: dict) -> List[Match]:
+    """One-off evaluation against a single filter definition."""
+    return FilterEngine([config]).evaluate(auctions)
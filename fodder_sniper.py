@@ -17,21 +17,21 @@ EXEMPLE 85 Gold Rare:
 =============================================================================
 """
 
-import requests
 import json
 import time
 import random
-import os
-from datetime import datetime
+
+from ea_client import OK, TOKEN_EXPIRED, RATE_LIMIT, ALREADY_SOLD, classify, decode_auctions, get_client
+from filter_engine import FilterEngine
+from price_service import get_price_service
+from records import Opportunity, TradeResult
+from trade_journal import get_journal
 
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 
 SESSION_FILE = "active_session.json"
-SNIPE_LOG_FILE = "snipe_log.json"
-
-EA_BASE_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
 
 # Timing anti-ban (MODE ÉQUILIBRÉ)
 # Un joueur actif mais pas robot : ~4-6 recherches/minute
@@ -50,57 +50,7 @@ JITTER_PROBABILITY = 0.20  # 20% de chance de pause longue aléatoire
 JITTER_MIN = 5.0           # Pause jitter min
 JITTER_MAX = 20.0          # Pause jitter max
 
-# Stratégies de snipe par note - PRIX DE RÉFÉRENCE (sera écrasé par Futbin)
-# Ces prix sont des fallbacks si fodder_targets.json n'existe pas
-SNIPE_CONFIGS = {
-    83: {"max_buy": 1100, "sell_target": 1500, "min_profit": 200},
-    84: {"max_buy": 1900, "sell_target": 2500, "min_profit": 300},
-    85: {"max_buy": 3400, "sell_target": 4200, "min_profit": 400},
-    86: {"max_buy": 7800, "sell_target": 9000, "min_profit": 600},
-    87: {"max_buy": 11500, "sell_target": 13500, "min_profit": 1000},
-    88: {"max_buy": 16500, "sell_target": 19000, "min_profit": 1200},
-    89: {"max_buy": 22000, "sell_target": 26000, "min_profit": 2000},
-    90: {"max_buy": 29000, "sell_target": 34000, "min_profit": 2500},
-}
-
-FODDER_TARGETS_FILE = "fodder_targets.json"
-
-TAX_RATE = 0.05
-
-
-def load_futbin_prices():
-    """Charge les prix Futbin si disponibles"""
-    if not os.path.exists(FODDER_TARGETS_FILE):
-        print(f"[!] {FODDER_TARGETS_FILE} non trouvé - utilisation prix par défaut")
-        return None
-    
-    try:
-        with open(FODDER_TARGETS_FILE, 'r') as f:
-            data = json.load(f)
-        
-        targets = data.get('targets', [])
-        if not targets:
-            return None
-        
-        # Convertir en dictionnaire par rating
-        prices = {}
-        for t in targets:
-            rating = t.get('rating')
-            if rating:
-                prices[rating] = {
-                    'max_buy': t.get('max_buy'),
-                    'sell_target': t.get('market_price'),
-                    'min_profit': t.get('estimated_profit', 200),
-                }
-        
-        source = data.get('source', 'unknown')
-        generated = data.get('generated_at', 'unknown')
-        print(f"[FUTBIN] Prix chargés: {len(prices)} notes (source: {source}, màj: {generated[:16]})")
-        
-        return prices
-    except Exception as e:
-        print(f"[!] Erreur chargement Futbin: {e}")
-        return None
+# Prix de référence par note (Futbin, sinon valeurs par défaut): price_service.py
 
 
 class FodderSniper:
@@ -108,16 +58,13 @@ class FodderSniper:
     
     def __init__(self, target_rating=85):
         self.session = self.load_session()
+        self.client = get_client(self.session)
         self.target_rating = target_rating
         
-        # Charger prix Futbin ou utiliser fallback
-        futbin_prices = load_futbin_prices()
-        if futbin_prices and target_rating in futbin_prices:
-            self.config = futbin_prices[target_rating]
-            print(f"[CONFIG] Note {target_rating}: Prix Futbin")
-        else:
-            self.config = SNIPE_CONFIGS.get(target_rating, SNIPE_CONFIGS[85])
-            print(f"[CONFIG] Note {target_rating}: Prix fallback")
+        # Prix Futbin fusionnés avec les valeurs par défaut, rechargés à chaud
+        self.prices = get_price_service()
+        self.price_version = None
+        self.apply_prices()
         
         # Stats
         self.buys_this_hour = 0
@@ -127,12 +74,38 @@ class FodderSniper:
         self.total_buys = 0
         self.total_listed = 0
         self.total_profit_potential = 0
-        self.snipe_log = []
+        self.journal = get_journal()
     
     def load_session(self):
         with open(SESSION_FILE, 'r') as f:
             return json.load(f)
     
+    def apply_prices(self):
+        """(Re)construit la config et le filtre quand la table de prix a changé"""
+        table = self.prices.current()
+        if table.version == self.price_version:
+            return
+        ref = table.get(self.target_rating) or table.get(85)
+        self.config = {
+            'max_buy': ref.buy_max,
+            'sell_target': ref.sell_price,
+            'min_profit': ref.min_profit,
+        }
+        
+        # Vérification locale (l'API EA ne respecte pas toujours les filtres)
+        self.engine = FilterEngine([{
+            'name': f"Fodder {self.target_rating}",
+            'params': {'raretype': '1', 'minr': self.target_rating, 'maxr': self.target_rating,
+                       'maxb': self.config['max_buy']},
+            'expected_min_value': self.config['sell_target'],
+            'min_profit': self.config['min_profit'],
+        }])
+        
+        label = "Nouveaux prix" if self.price_version is not None else "Prix"
+        print(f"[CONFIG] Note {self.target_rating}: {label} {ref.source} "
+              f"(achat < {ref.buy_max} CR, revente {ref.sell_price} CR)")
+        self.price_version = table.version
+    
     def check_limits(self):
         """Vérifie les limites horaires"""
         now = time.time()
@@ -161,29 +134,10 @@ class FodderSniper:
         return base
     
     def api_request(self, method, endpoint, params=None, data=None):
-        """Requête API EA"""
-        url = f"{EA_BASE_URL}/{endpoint}"
-        headers = {
-            "X-UT-SID": self.session['x-ut-sid'],
-            "User-Agent": self.session.get('user_agent', 'Mozilla/5.0'),
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-        }
-        
-        try:
-            if method == "GET":
-                resp = requests.get(url, params=params, headers=headers, timeout=15)
-            elif method == "POST":
-                resp = requests.post(url, params=params, json=data, headers=headers, timeout=15)
-            elif method == "PUT":
-                resp = requests.put(url, params=params, json=data, headers=headers, timeout=15)
-            else:
-                return None
-            
-            return resp
-        except Exception as e:
-            print(f"[!] Erreur requête: {e}")
+        """Requête API EA (connexion keep-alive partagée)"""
+        if method not in ("GET", "POST", "PUT"):
             return None
+        return self.client.request(method, endpoint, params=params, data=data, timeout=15)
     
     def search_snipes(self):
         """Cherche des opportunités de snipe"""
@@ -200,69 +154,54 @@ class FodderSniper:
         resp = self.api_request("GET", "transfermarket", params=params)
         self.scans_this_hour += 1  # Compteur anti-ban
         
-        if not resp:
+        if resp is None:
             return []
         
-        if resp.status_code == 401:
+        status = classify(resp)
+        if status == TOKEN_EXPIRED:
             print("[!] Token expiré - relance l'auth")
             return None
-        elif resp.status_code == 429:
+        elif status == RATE_LIMIT:
             print("[!] ⚠️ RATE LIMIT DÉTECTÉ - pause 2 minutes")
             time.sleep(120)  # 2 min au lieu de 1
             return []
-        elif resp.status_code != 200:
+        elif status != OK:
             print(f"[!] Erreur API: {resp.status_code}")
             return []
         
-        data = resp.json()
-        auctions = data.get('auctionInfo', [])
+        try:
+            auctions = decode_auctions(resp)
+        except ValueError:  # 200 non JSON (page Cloudflare / maintenance)
+            return []
         
-        # Filtrer les bonnes affaires
+        # Gold Rare, note exacte, prix et profit min: déjà triés par profit décroissant
         snipes = []
-        for a in auctions:
-            item = a.get('itemData', {})
-            rareflag = item.get('rareflag', 0)
-            rating = item.get('rating', 0)
-            
-            if rareflag != 1:  # Gold Rare only
-                continue
-            
-            # IMPORTANT: Vérifier le rating car l'API EA ne respecte pas toujours les filtres
-            if rating != self.target_rating:
-                continue
-            
-            buy_now = a.get('buyNowPrice', 0)
-            if buy_now <= 0 or buy_now > self.config['max_buy']:
-                continue
-            
-            # Calculer profit potentiel
-            sell_price = self.config['sell_target']
-            profit = int(sell_price * (1 - TAX_RATE) - buy_now)
-            
-            if profit >= self.config['min_profit']:
-                snipes.append({
-                    'trade_id': a.get('tradeId'),
-                    'asset_id': item.get('assetId'),
-                    'name': item.get('lastName', 'Unknown'),
-                    'rating': item.get('rating', 0),
-                    'buy_now': buy_now,
-                    'sell_target': sell_price,
-                    'profit': profit,
-                    'expires': a.get('expires', 0),
-                })
-        
-        # Trier par profit décroissant
-        return sorted(snipes, key=lambda x: x['profit'], reverse=True)
+        for match in self.engine.evaluate(auctions):
+            a = match.auction
+            snipes.append(Opportunity(
+                trade_id=a.trade_id,
+                buy_now=match.price,
+                sell_price=self.config['sell_target'],
+                profit=match.profit,
+                name=a.last_name or 'Unknown',
+                rating=a.rating,
+                asset_id=a.asset_id,
+                item_id=a.item_id,
+                expires=a.expires,
+                source='fodder_sniper',
+            ))
+        return snipes
     
     def buy_card(self, trade_id, price):
         """Achète une carte"""
         data = {"bid": price}
         resp = self.api_request("PUT", f"trade/{trade_id}/bid", data=data)
+        status = classify(resp)
         
-        if not resp:
-            return False, "Erreur réseau", None
+        if resp is None:
+            return TradeResult(False, status, trade_id, price, message="Erreur réseau")
         
-        if resp.status_code == 200:
+        if status == OK:
             # Récupérer l'ID de la carte achetée
             try:
                 result = resp.json()
@@ -270,19 +209,19 @@ class FodderSniper:
                 item_id = result.get('itemData', [{}])[0].get('id') if result.get('itemData') else None
             except:
                 item_id = None
-            return True, "Achat réussi", item_id
-        elif resp.status_code == 461:
-            return False, "Carte déjà vendue", None
-        elif resp.status_code == 401:
-            return False, "Token expiré", None
+            return TradeResult(True, status, trade_id, price, item_id, "Achat réussi")
+        elif status == ALREADY_SOLD:
+            return TradeResult(False, status, trade_id, price, message="Carte déjà vendue")
+        elif status == TOKEN_EXPIRED:
+            return TradeResult(False, status, trade_id, price, message="Token expiré")
         else:
-            return False, f"Erreur {resp.status_code}", None
+            return TradeResult(False, status, trade_id, price, message=f"Erreur {resp.status_code}")
     
     def get_trade_pile(self):
         """Récupère les cartes dans la pile de transfert (achetées, non listées)"""
         resp = self.api_request("GET", "tradepile")
         
-        if not resp or resp.status_code != 200:
+        if classify(resp) != OK:
             return []
         
         try:
@@ -295,7 +234,7 @@ class FodderSniper:
         """Récupère les cartes non assignées (viennent d'être achetées)"""
         resp = self.api_request("GET", "purchased/items")
         
-        if not resp or resp.status_code != 200:
+        if classify(resp) != OK:
             return []
         
         try:
@@ -308,10 +247,7 @@ class FodderSniper:
         """Déplace une carte vers la pile de transfert"""
         data = {"itemData": [{"id": item_id, "pile": "trade"}]}
         resp = self.api_request("PUT", "item", data=data)
-        
-        if resp and resp.status_code == 200:
-            return True
-        return False
+        return classify(resp) == OK
     
     def list_card_for_sale(self, item_id, start_price, buy_now_price, duration=3600):
         """Liste une carte en vente
@@ -333,14 +269,15 @@ class FodderSniper:
         
         resp = self.api_request("POST", "auctionhouse", data=data)
         
-        if not resp:
+        if resp is None:
             return False, "Erreur réseau"
         
-        if resp.status_code == 200:
+        status = classify(resp)
+        if status == OK:
             return True, "Carte listée en vente"
-        elif resp.status_code == 461:
+        elif status == ALREADY_SOLD:
             return False, "Pile de vente pleine"
-        elif resp.status_code == 401:
+        elif status == TOKEN_EXPIRED:
             return False, "Token expiré"
         else:
             return False, f"Erreur {resp.status_code}"
@@ -399,25 +336,23 @@ class FodderSniper:
         
         return listed_count
     
-    def log_snipe(self, snipe, success, message):
-        """Log un snipe"""
-        entry = {
-            'timestamp': datetime.now().isoformat(),
-            'name': snipe['name'],
-            'rating': snipe['rating'],
-            'price': snipe['buy_now'],
-            'profit_target': snipe['profit'],
-            'success': success,
-            'message': message,
-        }
-        self.snipe_log.append(entry)
-        
-        # Sauvegarder
-        with open(SNIPE_LOG_FILE, 'w') as f:
-            json.dump(self.snipe_log[-100:], f, indent=2)  # Garder 100 derniers
+    def log_snipe(self, snipe, result):
+        """Log un snipe (ajout dans le journal, sans réécriture)"""
+        self.journal.record(
+            "fodder_sniper",
+            success=result.success,
+            player_name=snipe.name,
+            rating=snipe.rating,
+            trade_id=snipe.trade_id,
+            price=snipe.buy_now,
+            expected_profit=snipe.profit,
+            message=result.message,
+        )
     
     def run_cycle(self):
         """Exécute un cycle de snipe"""
+        self.apply_prices()
+        
         can_buy, reason = self.check_limits()
         if not can_buy:
             print(f"[LIMIT] {reason}")
@@ -435,18 +370,18 @@ class FodderSniper:
         
         # Essayer d'acheter la meilleure
         for snipe in snipes[:3]:  # Max 3 tentatives
-            print(f"  → {snipe['name']} ({snipe['rating']}) @ {snipe['buy_now']} CR "
-                  f"(profit: +{snipe['profit']} CR)")
+            print(f"  → {snipe.name} ({snipe.rating}) @ {snipe.buy_now} CR "
+                  f"(profit: +{snipe.profit} CR)")
             
-            success, message, item_id = self.buy_card(snipe['trade_id'], snipe['buy_now'])
+            result = self.buy_card(snipe.trade_id, snipe.buy_now)
             
-            if success:
-                print(f"  ✅ ACHETÉ: {snipe['name']} @ {snipe['buy_now']} CR")
+            if result:
+                print(f"  ✅ ACHETÉ: {snipe.name} @ {snipe.buy_now} CR")
                 self.buys_this_hour += 1
-                self.spent_this_hour += snipe['buy_now']
+                self.spent_this_hour += snipe.buy_now
                 self.total_buys += 1
-                self.total_profit_potential += snipe['profit']
-                self.log_snipe(snipe, True, message)
+                self.total_profit_potential += snipe.profit
+                self.log_snipe(snipe, result)
                 
                 # Pause après achat
                 pause = random.uniform(POST_BUY_PAUSE_MIN, POST_BUY_PAUSE_MAX)
@@ -462,10 +397,10 @@ class FodderSniper:
                 
                 return True
             else:
-                print(f"  ❌ {message}")
-                self.log_snipe(snipe, False, message)
+                print(f"  ❌ {result.message}")
+                self.log_snipe(snipe, result)
                 
-                if "Token expiré" in message:
+                if result.status == TOKEN_EXPIRED:
                     return None
         
         return True
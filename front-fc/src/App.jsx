@@ -15,46 +15,82 @@ const TARGET_PLAYERS = [
   { id: 3, name: 'J. Bellingham', rating: 88, buyPrice: 450000, profit: 15500, volatility: 'Low' },
 ];
 
-const generateLog = (counter) => {
-  const actions = [
-    { type: 'INFO', msg: '[TLS-Fingerprint] JA3 signature matched: 771,4865-4866... (iOS 17)' },
-    { type: 'SUCCESS', msg: '[SNIPE] 200 OK | POST /ut/game/fc26/transfermarket | 42ms' },
-    { type: 'WARN', msg: '[Heuristic] Mouse movement entropy too low. Injecting noise.' },
-    { type: 'INFO', msg: '[Proxy] Rotating IP due to HTTP 429.' },
-    { type: 'ERROR', msg: '[Auth] Token refresh failed for W-04. Kill switch.' },
-    { type: 'INFO', msg: '[Market] Parsing 50 items. Found 2 targets.' },
-  ];
-  const randomAction = actions[Math.floor(Math.random() * actions.length)];
-  return { id: counter, time: new Date().toLocaleTimeString('fr-FR'), ...randomAction };
-};
+const GATEWAY_URL = import.meta.env.VITE_GATEWAY_URL || 'http://localhost:8000';
+const MAX_LOGS = 16;
+const MAX_POINTS = 20;
+const ACTIVE_WINDOW_S = 30;
+
+const tradeToLog = (t) => ({
+  id: `${t.worker_id}-${t.trade_id}-${t.ts}`,
+  time: new Date((t.ts || Date.now() / 1000) * 1000).toLocaleTimeString('fr-FR'),
+  type: t.result === 'SUCCESS' || t.result === 'DRY_RUN' ? 'SUCCESS' : t.result === 'OUTBID' ? 'WARN' : 'ERROR',
+  msg: `[${t.action || 'BID'}] ${t.worker_id} | trade ${t.trade_id} @ ${t.price} CR -> ${t.result}${t.latency_ms != null ? ` | ${t.latency_ms}ms` : ''}`,
+});
+
+const toWorkers = (workers) => Object.entries(workers).map(([id, w]) => ({
+  id,
+  status: Date.now() / 1000 - w.last_seen < ACTIVE_WINDOW_S ? 'active' : 'cooldown',
+  spm: w.scans_per_min,
+  proxy: `${Math.round(w.scans_per_min)} scans/min`,
+  type: `${w.trades} bids | ${w.dropped + w.failed} perdus`,
+  rtt: w.last_latency_ms ?? 0,
+}));
 
 export default function App() {
   const [isRunning, setIsRunning] = useState(false);
   const [logs, setLogs] = useState([]);
   const [marketData, setMarketData] = useState([]);
   const [workers, setWorkers] = useState(INITIAL_WORKERS);
-  const [stats, setStats] = useState({ totalProfit: 1245000, rpm: 0, activeProxies: 12 });
+  const [stats, setStats] = useState({ totalProfit: 0, rpm: 0, activeProxies: 0 });
+  const [connected, setConnected] = useState(false);
+  const liveWorkers = useRef({});
+  const chartPlayer = useRef(null);
   const logEndRef = useRef(null);
 
+  // Flux SSE du gateway: snapshot initial puis deltas coalescés (plus de polling)
   useEffect(() => {
-    let interval;
-    if (isRunning) {
-      interval = setInterval(() => {
-        setMarketData(prev => {
-          const lastPrice = prev.length > 0 ? prev[prev.length - 1].price : 1500000;
-          const newPrice = Math.floor(lastPrice + (Math.random() - 0.5) * 5000);
-          return [...prev.slice(-19), { time: new Date().toLocaleTimeString(), price: newPrice }];
-        });
-        setLogs(prev => [...prev.slice(-15), generateLog(Date.now())]);
-        setWorkers(prev => prev.map(w => w.status === 'banned' ? w : { ...w, rtt: Math.max(10, w.rtt + Math.floor(Math.random() * 20) - 10) }));
-        setStats(prev => ({
-          ...prev,
-          totalProfit: prev.totalProfit + (Math.random() > 0.8 ? 1500 : 0),
-          rpm: Math.floor(Math.random() * 2000) + 3000
-        }));
-      }, 800);
-    }
-    return () => clearInterval(interval);
+    if (!isRunning) return undefined;
+    const source = new EventSource(`${GATEWAY_URL}/stream`);
+
+    const applyWorkers = (delta) => {
+      liveWorkers.current = { ...liveWorkers.current, ...delta };
+      const list = toWorkers(liveWorkers.current);
+      setWorkers(list);
+      setStats(prev => ({
+        ...prev,
+        rpm: Math.round(list.reduce((sum, w) => sum + w.spm, 0)),
+        activeProxies: list.filter(w => w.status === 'active').length,
+      }));
+    };
+
+    source.onopen = () => setConnected(true);
+    source.onerror = () => setConnected(false);
+    source.addEventListener('snapshot', (e) => {
+      const data = JSON.parse(e.data);
+      liveWorkers.current = {};
+      applyWorkers(data.live.workers);
+      setStats(prev => ({ ...prev, totalProfit: data.profit_estimate || 0 }));
+    });
+    source.addEventListener('stats', (e) => applyWorkers(JSON.parse(e.data).workers));
+    source.addEventListener('trades', (e) => {
+      const { trades } = JSON.parse(e.data);
+      setLogs(prev => [...prev, ...trades.map(tradeToLog)].slice(-MAX_LOGS));
+    });
+    source.addEventListener('prices', (e) => {
+      const prices = JSON.parse(e.data);
+      if (chartPlayer.current === null) chartPlayer.current = Object.keys(prices)[0];
+      const point = prices[chartPlayer.current];
+      if (!point) return;
+      setMarketData(prev => [...prev, {
+        time: new Date(point.ts * 1000).toLocaleTimeString(),
+        price: point.min,
+      }].slice(-MAX_POINTS));
+    });
+
+    return () => {
+      source.close();
+      setConnected(false);
+    };
   }, [isRunning]);
 
   useEffect(() => { logEndRef.current?.scrollIntoView({ behavior: "smooth" }); }, [logs]);
@@ -81,8 +117,8 @@ export default function App() {
             {isRunning ? <><Pause size={16} /> ARRÊT D'URGENCE</> : <><Play size={16} /> INITIALISER LE CLUSTER</>}
           </button>
           <div style={{ display: 'flex', alignItems: 'center', gap: 8, fontSize: 12, fontFamily: 'monospace', color: '#64748b', backgroundColor: '#0f172a', padding: '4px 12px', borderRadius: 4, border: '1px solid #1e293b' }}>
-            <div style={{ width: 8, height: 8, backgroundColor: '#10b981', borderRadius: '50%', animation: 'pulse 2s infinite' }}></div>
-            SOCKET: CONNECTED
+            <div style={{ width: 8, height: 8, backgroundColor: connected ? '#10b981' : '#ef4444', borderRadius: '50%', animation: 'pulse 2s infinite' }}></div>
+            STREAM: {connected ? 'CONNECTED' : 'OFFLINE'}
           </div>
         </div>
       </header>
@@ -93,8 +129,8 @@ export default function App() {
         <div style={{ gridColumn: 'span 12', display: 'grid', gridTemplateColumns: 'repeat(4, 1fr)', gap: 16, marginBottom: 8 }}>
           {[
             { title: 'Profit Net (24h)', value: `${stats.totalProfit.toLocaleString()} CR`, sub: '+12.4% vs target', color: '#10b981', Icon: Activity },
-            { title: 'Requêtes / Min', value: stats.rpm, sub: 'Load Balancing: Optimal', color: '#3b82f6', Icon: Zap },
-            { title: 'Proxies Rotatifs', value: stats.activeProxies, sub: '3 Blacklisted', color: '#a855f7', Icon: Globe },
+            { title: 'Scans / Min', value: stats.rpm, sub: 'Tous workers (60s)', color: '#3b82f6', Icon: Zap },
+            { title: 'Workers Actifs', value: stats.activeProxies, sub: `Vus < ${ACTIVE_WINDOW_S}s`, color: '#a855f7', Icon: Globe },
             { title: 'OpSec Status', value: 'LOW RISK', sub: 'TLS Fingerprint: Clean', color: '#10b981', Icon: ShieldAlert },
           ].map((card, i) => (
             <div key={i} style={{ backgroundColor: '#0f172a', border: '1px solid #1e293b', padding: 16, borderRadius: 8, display: 'flex', alignItems: 'center', justifyContent: 'space-between' }}>
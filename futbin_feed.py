@@ -4,17 +4,17 @@
 =============================================================================
 Récupère les prix "Cheapest by Rating" de Futbin pour calibrer le bot.
 
-Méthode: requête directe sur l'API/page Futbin + parsing BeautifulSoup
+Méthode: requête directe sur l'API/page Futbin + parsing futbin_parser
 Génère fodder_targets.json consommé par le sniper.
 =============================================================================
 """
 
 import requests
-from bs4 import BeautifulSoup
-import json
-import re
 from datetime import datetime
 
+from futbin_parser import cheapest_by_section, cheapest_in_text, parse
+from target_bus import write_atomic
+
 # Configuration
 FUTBIN_URL = "https://www.futbin.com/stc/cheapest"
 FUTBIN_API_URL = "https://www.futbin.com/home-tab/cheapest-by-rating"
@@ -32,18 +32,6 @@ HEADERS = {
 }
 
 
-def parse_price(price_str):
-    """Convertit un prix Futbin (ex: '2.5K', '1.2M', '850') en entier"""
-    price_str = price_str.strip().upper()
-    
-    if 'M' in price_str:
-        return int(float(price_str.replace('M', '').replace(',', '.')) * 1000000)
-    elif 'K' in price_str:
-        return int(float(price_str.replace('K', '').replace(',', '.')) * 1000)
-    else:
-        return int(float(price_str.replace(',', '')))
-
-
 def scrape_futbin_prices():
     """Scrape les prix depuis Futbin"""
     print("\n" + "=" * 60)
@@ -58,34 +46,10 @@ def scrape_futbin_prices():
         resp = requests.get(FUTBIN_API_URL, headers=HEADERS, timeout=15)
         
         if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            
-            # Chercher les prix par rating
-            for rating in range(81, 97):
-                # Pattern: "XX Rated Players"
-                rated_header = soup.find(string=re.compile(f"^{rating}\\s*Rated", re.IGNORECASE))
-                
-                if not rated_header:
-                    continue
-                
-                # Chercher les prix dans la section
-                parent = rated_header.find_parent()
-                if parent:
-                    # Chercher tous les prix (format psxboxXXX ou pcXXX)
-                    text = parent.get_text()
-                    prices = re.findall(r'(?:psxbox|pc)([0-9.,]+[KMkm]?)', text)
-                    
-                    if prices:
-                        int_prices = []
-                        for p in prices:
-                            try:
-                                int_prices.append(parse_price(p))
-                            except:
-                                pass
-                        
-                        if int_prices:
-                            mapping[rating] = min(int_prices)
-                            print(f"  Note {rating}: {mapping[rating]:,} CR")
+            # Une seule passe: prix psxbox/pc de chaque section "XX Rated"
+            mapping = cheapest_by_section(parse(resp.text))
+            for rating, price in mapping.items():
+                print(f"  Note {rating}: {price:,} CR")
             
             if mapping:
                 print(f"\n[✓] {len(mapping)} notes extraites depuis Futbin")
@@ -100,25 +64,8 @@ def scrape_futbin_prices():
         resp = requests.get(FUTBIN_URL, headers=HEADERS, timeout=15)
         
         if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            
-            # Chercher les prix dans le HTML
-            for rating in range(81, 97):
-                pattern = re.compile(f'{rating}.*?([0-9.,]+[KMkm]?)', re.DOTALL)
-                matches = pattern.findall(soup.get_text())
-                
-                if matches:
-                    int_prices = []
-                    for p in matches[:10]:  # Limiter aux 10 premiers
-                        try:
-                            price = parse_price(p)
-                            if 100 < price < 10000000:  # Filtre sanity
-                                int_prices.append(price)
-                        except:
-                            pass
-                    
-                    if int_prices:
-                        mapping[rating] = min(int_prices)
+            # Chercher les prix dans le texte brut (10 premiers par note)
+            mapping = cheapest_in_text(parse(resp.text))
             
             if mapping:
                 print(f"[✓] {len(mapping)} notes extraites")
@@ -150,6 +97,26 @@ def use_fallback_prices():
     }
 
 
+def fodder_target(rating, market_price, discount=DISCOUNT_PERCENT):
+    """Cible d'une note (prix d'achat max, profit estimé), None si pas rentable"""
+    # Prix d'achat max = 85% du prix marché (arrondi aux 50)
+    max_buy = int((market_price * (1 - discount)) / 50) * 50
+    
+    # Profit estimé après taxe 5%
+    estimated_profit = int(market_price * 0.95 - max_buy)
+    
+    # Ignorer si profit trop faible
+    if estimated_profit < 100:
+        return None
+    
+    return {
+        'rating': rating,
+        'market_price': market_price,
+        'max_buy': max_buy,
+        'estimated_profit': estimated_profit,
+    }
+
+
 def generate_targets(prices):
     """Génère les cibles de snipe à partir des prix"""
     targets = []
@@ -158,25 +125,16 @@ def generate_targets(prices):
         if rating < 83 or rating > 91:  # Fodder tradable uniquement
             continue
         
-        # Prix d'achat max = 85% du prix marché (arrondi aux 50)
-        max_buy = int((market_price * (1 - DISCOUNT_PERCENT)) / 50) * 50
-        
-        # Profit estimé après taxe 5%
-        estimated_profit = int(market_price * 0.95 - max_buy)
-        
-        # Ignorer si profit trop faible
-        if estimated_profit < 100:
+        target = fodder_target(rating, market_price)
+        if target is None:
             continue
         
-        targets.append({
-            'rating': rating,
-            'market_price': market_price,
-            'max_buy': max_buy,
-            'estimated_profit': estimated_profit,
+        target.update({
             'type': 'fodder_rating',
             'source': 'futbin',
             'updated_at': datetime.now().isoformat()
         })
+        targets.append(target)
     
     return sorted(targets, key=lambda x: x['rating'])
 
@@ -190,8 +148,8 @@ def save_targets(targets, source='futbin'):
         'targets': targets
     }
     
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(output, f, indent=2)
+    # Remplacement atomique: les bots (price_service) ne lisent jamais un fichier à moitié écrit
+    write_atomic(OUTPUT_FILE, output)
     
     print(f"\n[✓] Sauvegardé dans {OUTPUT_FILE}")
 
@@ -0,0 +1,265 @@
+"""Single-pass parser for the Futbin "cheapest by rating" pages.
+
+futbin_feed used to run soup.find(string=re.compile(...)) once per rating
+(16 full tree searches), and its fallback rebuilt soup.get_text() and a new
+DOTALL regex for every rating; futbin_pricer built a whole BeautifulSoup
+tree with html.parser just to read a few columns. parse() now feeds the page
+once through an event scanner (no tree is built) and collects, in that one
+pass, everything both scrapers read:
+
+- price columns (.stc-player-column): rating, PC flag, small price wrappers
+- "NN Rated" sections: the prices of the element holding that header text
+- the page text, as get_text() would return it (scripts/styles excluded)
+
+lxml drives the scanner when it is installed (parser target interface),
+otherwise the standard library html.parser does. All patterns are compiled
+once at import.
+"""
+
+import re
+from html.parser import HTMLParser
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from lxml import etree
+except ImportError:  # Optionnel: repli sur html.parser (plus lent)
+    etree = None
+
+RATINGS = range(81, 97)
+
+HEADER_PATTERN = re.compile(r"^(\d+)\s*Rated", re.IGNORECASE)
+SECTION_PRICE_PATTERN = re.compile(r"(?:psxbox|pc)([0-9.,]+[KMkm]?)")
+# Repli texte brut: prix qui suit la note (10 premiers retenus)
+TEXT_PATTERNS = {rating: re.compile(f"{rating}.*?([0-9.,]+[KMkm]?)", re.DOTALL) for rating in RATINGS}
+TEXT_MATCHES = 10
+TEXT_PRICE_MIN = 100
+TEXT_PRICE_MAX = 10_000_000
+
+COLUMN_CLASS = "stc-player-column"
+PC_CLASS = "hide-not-pc"
+RATING_CLASS = "stc-rating"
+PRICE_CLASS = "platform-price-wrapper-small"
+
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input",
+                       "link", "meta", "param", "source", "track", "wbr"))
+SKIP_TAGS = frozenset(("script", "style", "template"))
+
+
+def parse_price(price_str) -> int:
+    """Convertit '1.2K', '850', '1.5M' en entier (0 si illisible)."""
+    if not price_str:
+        return 0
+    price_str = price_str.upper().strip()
+    try:
+        if 'M' in price_str:
+            return int(float(price_str.replace('M', '').replace(',', '.')) * 1_000_000)
+        elif 'K' in price_str:
+            return int(float(price_str.replace('K', '').replace(',', '.')) * 1_000)
+        else:
+            return int(float(price_str.replace(',', '')))
+    except ValueError:
+        return 0
+
+
+class Column:
+    """One .stc-player-column: its first .stc-rating and every small price."""
+
+    __slots__ = ("pc", "rating_text", "prices")
+
+    def __init__(self, pc: bool):
+        self.pc = pc
+        self.rating_text: Optional[str] = None
+        self.prices: List[int] = []
+
+    @property
+    def rating(self) -> Optional[int]:
+        digits = "".join(filter(str.isdigit, self.rating_text or ""))
+        return int(digits) if digits else None
+
+
+class FutbinPage:
+    """Everything the scrapers read from one page, collected in one pass."""
+
+    __slots__ = ("columns", "sections", "chunks", "_text")
+
+    def __init__(self, columns: List[Column], sections: Dict[int, List[int]], chunks: List[str]):
+        self.columns = columns
+        self.sections = sections   # note -> prix de la première section "NN Rated"
+        self.chunks = chunks
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self.chunks)
+        return self._text
+
+    @property
+    def pc_columns(self) -> List[Column]:
+        return [c for c in self.columns if c.pc]
+
+
+class _Scanner:
+    """Parser target: start/end/data events -> columns, sections, text."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.pending: List[str] = []
+        # (tag, index du premier texte, rôle, colonne, notes des en-têtes "NN Rated")
+        self.stack: list = []
+        self.columns: List[Column] = []
+        self.sections: Dict[int, List[int]] = {}
+        self.skip = 0
+
+    def _flush(self):
+        """Closes the current text node (consecutive data events are one node)."""
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.pending = []
+        self.chunks.append(text)
+        match = HEADER_PATTERN.match(text)
+        if match and self.stack:
+            rating = int(match.group(1))
+            if rating not in self.sections:
+                self.sections[rating] = []       # Réservée: premier en-tête du document
+                parent = self.stack[-1]
+                parent[4] = (parent[4] or ()) + (rating,)
+
+    def start(self, tag, attrib):
+        self._flush()
+        tag = tag.lower()
+        if tag in VOID_TAGS:
+            return
+        if tag in SKIP_TAGS:
+            self.skip += 1
+        classes = (attrib.get("class") or "").split()
+        column = self.stack[-1][3] if self.stack else None
+        role = None
+        if classes:
+            if COLUMN_CLASS in classes:
+                column = Column(PC_CLASS in classes)
+                self.columns.append(column)
+            elif column is not None:
+                if PRICE_CLASS in classes:
+                    role = "price"
+                elif RATING_CLASS in classes and column.rating_text is None:
+                    role = "rating"
+                    column.rating_text = ""      # select_one: le premier dans l'ordre du document
+        self.stack.append([tag, len(self.chunks), role, column, None])
+
+    def end(self, tag):
+        self._flush()
+        tag = tag.lower()
+        if tag in VOID_TAGS:
+            return
+        # html.parser: balises non fermées implicitement closes (lxml équilibre déjà)
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                break
+        else:
+            return
+        while len(self.stack) > depth:
+            self._close(self.stack.pop())
+
+    def _close(self, entry):
+        tag, first, role, column, sections = entry
+        if tag in SKIP_TAGS:
+            self.skip -= 1
+        if role is not None:
+            text = "".join(s.strip() for s in self.chunks[first:])
+            if role == "price":
+                price = parse_price(text)
+                if price > 0:
+                    column.prices.append(price)
+            else:
+                column.rating_text = text
+        if sections:
+            text = "".join(self.chunks[first:])
+            prices = [parse_price(p) for p in SECTION_PRICE_PATTERN.findall(text)]
+            for rating in sections:
+                self.sections[rating] = [p for p in prices if p > 0]
+
+    def data(self, data):
+        if not self.skip:
+            self.pending.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self) -> FutbinPage:
+        self._flush()
+        while self.stack:
+            self._close(self.stack.pop())
+        return FutbinPage(self.columns, self.sections, self.chunks)
+
+
+class _StdlibDriver(HTMLParser):
+    """Feeds html.parser events to the scanner (used without lxml)."""
+
+    def __init__(self, scanner: _Scanner):
+        super().__init__(convert_charrefs=True)
+        self.scanner = scanner
+
+    def handle_starttag(self, tag, attrs):
+        self.scanner.start(tag, {name: value or "" for name, value in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.scanner.end(tag)
+
+    def handle_endtag(self, tag):
+        self.scanner.end(tag)
+
+    def handle_data(self, data):
+        self.scanner.data(data)
+
+    def handle_comment(self, data):
+        self.scanner.comment(data)
+
+
+def parse(html: str, backend: Optional[str] = None) -> FutbinPage:
+    """Scans a Futbin page once. backend: "lxml", "html.parser" or None (best available)."""
+    if backend is None:
+        backend = "lxml" if etree is not None else "html.parser"
+    scanner = _Scanner()
+    if backend == "lxml":
+        parser = etree.HTMLParser(target=scanner)
+        parser.feed(html)
+        return parser.close()
+    driver = _StdlibDriver(scanner)
+    driver.feed(html)
+    driver.close()
+    return scanner.close()
+
+
+def cheapest_by_column(page: FutbinPage, min_rating: int, max_rating: int) -> Dict[int, int]:
+    """Lowest small price per rating over the PC columns (all columns if none is PC)."""
+    prices_by_rating = {}
+    for column in page.pc_columns or page.columns:
+        rating = column.rating
+        if rating is None or not (min_rating <= rating <= max_rating) or not column.prices:
+            continue
+        market_price = min(column.prices)
+        if rating not in prices_by_rating or market_price < prices_by_rating[rating]:
+            prices_by_rating[rating] = market_price
+    return prices_by_rating
+
+
+def cheapest_by_section(page: FutbinPage, ratings: Iterable[int] = RATINGS) -> Dict[int, int]:
+    """Lowest psxbox/pc price of each "NN Rated" section."""
+    return {rating: min(page.sections[rating]) for rating in ratings if page.sections.get(rating)}
+
+
+def cheapest_in_text(page: FutbinPage, ratings: Iterable[int] = RATINGS) -> Dict[int, int]:
+    """Last resort: first prices following each rating in the raw page text."""
+    mapping = {}
+    text = page.text
+    for rating in ratings:
+        pattern = TEXT_PATTERNS.get(rating) or re.compile(f"{rating}.*?([0-9.,]+[KMkm]?)", re.DOTALL)
+        prices = [parse_price(m.group(1)) for m in islice(pattern.finditer(text), TEXT_MATCHES)]
+        prices = [p for p in prices if TEXT_PRICE_MIN < p < TEXT_PRICE_MAX]
+        if prices:
+            mapping[rating] = min(prices)
+    return mapping
@@ -1,16 +1,17 @@
 """
 FUTBIN PRICER - Scrape les prix Futbin PC pour alimenter le sniper
-Utilise Selenium headless + BeautifulSoup
+Utilise Selenium headless + futbin_parser (une seule passe sur la page)
 """
 
-import json
 import time
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+from futbin_parser import cheapest_by_column, parse
+from target_bus import write_atomic
+
 FILTERS_FILE = "futbin_prices.json"
 FODDER_FILE = "fodder_targets.json"
 TARGET_URL = "https://www.futbin.com/home-tab/cheapest-by-rating"
@@ -21,21 +22,6 @@ TAX = 0.95         # Taxe EA 5%
 MIN_RATING = 83    # Note minimum fodder
 MAX_RATING = 92    # Note maximum fodder
 
-def parse_price(price_str):
-    """Convertit '1.2K', '850', '1.5M' en entier."""
-    if not price_str:
-        return 0
-    price_str = price_str.upper().strip()
-    try:
-        if 'M' in price_str:
-            return int(float(price_str.replace('M', '').replace(',', '.')) * 1_000_000)
-        elif 'K' in price_str:
-            return int(float(price_str.replace('K', '').replace(',', '.')) * 1_000)
-        else:
-            return int(float(price_str.replace(',', '')))
-    except ValueError:
-        return 0
-
 def create_driver():
     """Crée le driver Selenium"""
     print("[PRICER] Initialisation Chrome headless...")
@@ -53,60 +39,23 @@ def run_pricer():
     print("="*60)
     
     driver = create_driver()
-    prices_by_rating = {}  # Pour dédupliquer et garder le min
 
     try:
         print(f"[PRICER] Chargement {TARGET_URL}...")
         driver.get(TARGET_URL)
         time.sleep(4)  # Attendre hydratation JS/Cloudflare
 
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        page = parse(driver.page_source)
         
         # IMPORTANT: Cibler uniquement les colonnes PC (.hide-not-pc)
-        columns = soup.select('.stc-player-column.hide-not-pc')
-        
-        print(f"[PRICER] {len(columns)} colonnes PC trouvées. Analyse...")
+        print(f"[PRICER] {len(page.pc_columns)} colonnes PC trouvées. Analyse...")
 
-        if not columns:
+        if not page.pc_columns:
             # Fallback si la classe a changé
             print("[WARN] Aucune colonne .hide-not-pc, tentative fallback...")
-            columns = soup.select('.stc-player-column')
-
-        for col in columns:
-            # 1. Récupération de la note
-            rating_div = col.select_one('.stc-rating')
-            if not rating_div:
-                continue
-            
-            try:
-                rating_text = rating_div.get_text(strip=True)
-                rating = int(''.join(filter(str.isdigit, rating_text)))
-            except:
-                continue
-            
-            # Filtrer les notes fodder (83-92)
-            if not (MIN_RATING <= rating <= MAX_RATING):
-                continue
-
-            # 2. Récupération des prix PC
-            prices = []
-            price_elements = col.select('.platform-price-wrapper-small')
-            
-            for p_el in price_elements:
-                p_text = p_el.get_text(strip=True)
-                val = parse_price(p_text)
-                if val > 0:
-                    prices.append(val)
-            
-            if not prices:
-                continue
 
-            # Prix minimum pour cette note
-            market_price = min(prices)
-            
-            # Garder le prix le plus bas par note (dédupliquer)
-            if rating not in prices_by_rating or market_price < prices_by_rating[rating]:
-                prices_by_rating[rating] = market_price
+        # Prix minimum par note fodder (83-92), dédupliqué sur les colonnes
+        prices_by_rating = cheapest_by_column(page, MIN_RATING, MAX_RATING)
 
         # Générer les targets avec calculs de profit
         filters = []
@@ -143,7 +92,7 @@ def run_pricer():
                     "estimated_profit": profit
                 })
 
-        # Sauvegarde
+        # Sauvegarde (remplacement atomique, relue à chaud par price_service)
         if filters:
             # Fichier détaillé
             output = {
@@ -154,12 +103,10 @@ def run_pricer():
                 "targets": filters
             }
             
-            with open(FILTERS_FILE, 'w') as f:
-                json.dump(output, f, indent=2)
+            write_atomic(FILTERS_FILE, output)
             
             # Fichier pour le bot (format simple)
-            with open(FODDER_FILE, 'w') as f:
-                json.dump({"platform": "PC", "targets": fodder_targets}, f, indent=2)
+            write_atomic(FODDER_FILE, {"platform": "PC", "targets": fodder_targets})
             
             print(f"\n[OK] {len(filters)} prix PC sauvegardés")
             print(f"  -> {FILTERS_FILE}")
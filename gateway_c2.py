@@ -4,13 +4,20 @@ FastAPI backend pour piloter le bot depuis React
 """
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import hashlib
 import json
 import os
+import threading
 import time
-from typing import List, Optional
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from telemetry import TelemetryAggregator
 
 app = FastAPI(title="FUT C2 Gateway")
 
@@ -29,6 +36,27 @@ CONFIG_FILE = os.path.join(BASE_DIR, "bot_config.json")
 TARGETS_FILE = os.path.join(BASE_DIR, "active_targets.json")
 STATS_FILE = os.path.join(BASE_DIR, "snipe_stats.json")
 FILTERS_FILE = os.path.join(BASE_DIR, "snipe_filters.json")
+WATCH_INTERVAL = 0.5  # Scrutation des mtime des fichiers JSON (s)
+STREAM_MIN_INTERVAL = 0.25  # Au plus un envoi coalescé toutes les 250ms par client
+STREAM_HEARTBEAT = 15       # Commentaire SSE keep-alive si rien à envoyer (s)
+STREAM_MAX_TRADES = 100     # Trades en attente par client avant abandon des plus vieux
+
+DEFAULT_CONFIG = {
+    "snipeMode": "safe",
+    "minDelay": 1.5,
+    "maxDelay": 2.5,
+    "maxBuyPrice": 10000,
+    "pauseOnBuy": 60,
+    "softBanThreshold": 3,
+    "autoSellMarkup": 30
+}
+DEFAULT_STATS = {
+    "scans": 0,
+    "hits": 0,
+    "buys": 0,
+    "fails": 0,
+    "profit_estimate": 0
+}
 
 # --- MODELS ---
 class BotConfig(BaseModel):
@@ -46,21 +74,200 @@ class SnipeFilter(BaseModel):
     expected_min_value: int
     active: bool = True
 
-# --- HELPERS ---
-def load_json(filepath, default=None):
-    if not os.path.exists(filepath):
-        return default if default is not None else {}
-    try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return default if default is not None else {}
+class TelemetryBatch(BaseModel):
+    worker_id: str
+    events: List[dict]
+    dropped: int = 0
+    failed: int = 0
+
+# --- TELEMETRY (agrégats en mémoire) ---
+telemetry = TelemetryAggregator()
+
+# --- LIVE STREAM (SSE) ---
+class StreamClient:
+    """Pending updates of one /stream subscriber.
+
+    Publishers only merge into this state: stats and outcomes are
+    overwritten, prices are downsampled per player, trades are capped. A
+    slow dashboard therefore never slows ingest down; it just receives
+    fewer, larger messages.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.wakeup = asyncio.Event()
+        self.lock = threading.Lock()
+        self._reset()
+        self.dropped = 0
+
+    def _reset(self):
+        self.stats: Dict[str, dict] = {}
+        self.outcomes: Dict[str, int] = {}
+        self.trades = deque(maxlen=STREAM_MAX_TRADES)
+        self.prices: Dict[Any, dict] = {}
+
+    def push(self, workers, outcomes, trades, prices):
+        with self.lock:
+            self.stats.update(workers)
+            self.outcomes.update(outcomes)
+            overflow = len(self.trades) + len(trades) - STREAM_MAX_TRADES
+            if overflow > 0:
+                self.dropped += overflow
+            self.trades.extend(trades)
+            for player_id, point in prices.items():
+                pending = self.prices.get(player_id)
+                if pending is None:
+                    self.prices[player_id] = dict(point)
+                else:
+                    pending["min"] = min(pending["min"], point["min"])
+                    pending["last"] = point["last"]
+                    pending["ts"] = point["ts"]
+                    pending["count"] += point["count"]
+        try:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+        except RuntimeError:
+            pass  # Boucle fermée (client parti)
 
+    def take(self) -> list:
+        with self.lock:
+            messages = []
+            if self.stats or self.outcomes:
+                messages.append(("stats", {"workers": self.stats, "outcomes": self.outcomes}))
+            if self.trades:
+                messages.append(("trades", {"trades": list(self.trades), "dropped": self.dropped}))
+            if self.prices:
+                messages.append(("prices", self.prices))
+            self._reset()
+        return messages
+
+class LiveHub:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = set()
+
+    def subscribe(self, loop) -> StreamClient:
+        client = StreamClient(loop)
+        with self.lock:
+            self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client: StreamClient):
+        with self.lock:
+            self.clients.discard(client)
+
+    def publish(self, worker_id: str, events: list):
+        if not self.clients:
+            return
+        trades, prices = [], {}
+        for event in events:
+            kind = event.get("type")
+            if kind == "trade":
+                trades.append({**event, "worker_id": worker_id})
+            elif kind == "scan" and event.get("player_id") is not None and event.get("price"):
+                price, point = event["price"], prices.get(event["player_id"])
+                if point is None:
+                    prices[event["player_id"]] = {"ts": event.get("ts"), "last": price, "min": price, "count": 1}
+                else:
+                    point.update(ts=event.get("ts"), last=price, min=min(point["min"], price))
+                    point["count"] += 1
+        workers = {worker_id: telemetry.worker_stats(worker_id)}
+        outcomes = telemetry.outcome_totals({t.get("result") or "UNKNOWN" for t in trades})
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.push(workers, outcomes, trades, prices)
+
+hub = LiveHub()
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# --- HELPERS ---
 def save_json(filepath, data):
     temp_file = f"{filepath}.tmp"
     with open(temp_file, 'w') as f:
         json.dump(data, f, indent=2)
     os.replace(temp_file, filepath)
+    files.put(filepath, data)
+
+def _file_signature(filepath):
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+class JsonFileCache:
+    """Parsed copies of the JSON files served by the gateway.
+
+    A watcher thread polls the files' mtime/size and reparses only the ones
+    that changed (written by the workers or by save_json), so GET requests
+    never touch the disk. Each entry keeps its serialized body and ETag.
+    """
+
+    def __init__(self, defaults: Dict[str, Any], interval: float = WATCH_INTERVAL):
+        self.defaults = defaults
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.entries: Dict[str, dict] = {}
+        for filepath in defaults:
+            self.refresh(filepath)
+        threading.Thread(target=self._watch, name="json-watch", daemon=True).start()
+
+    def _store(self, filepath, data, signature):
+        body = json.dumps(data).encode()
+        with self.lock:
+            self.entries[filepath] = {"sig": signature, "data": data, "body": body, "etag": _etag(body)}
+
+    def refresh(self, filepath):
+        signature = _file_signature(filepath)
+        entry = self.entries.get(filepath)
+        if entry is not None and entry["sig"] == signature:
+            return
+        if signature is None:
+            self._store(filepath, self.defaults[filepath], None)
+            return
+        try:
+            with open(filepath, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # Écriture en cours côté worker: on garde l'ancienne copie, retry au prochain tour
+            if entry is None:
+                self._store(filepath, self.defaults[filepath], None)
+            return
+        self._store(filepath, data, signature)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            for filepath in self.defaults:
+                self.refresh(filepath)
+
+    def put(self, filepath, data):
+        if filepath in self.defaults:
+            self._store(filepath, data, _file_signature(filepath))
+
+    def get(self, filepath) -> dict:
+        return self.entries[filepath]
+
+def cached_response(request: Request, body: bytes, etag: str) -> Response:
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+files = JsonFileCache({
+    CONFIG_FILE: DEFAULT_CONFIG,
+    FILTERS_FILE: {"filters": []},
+    TARGETS_FILE: [],
+    STATS_FILE: DEFAULT_STATS,
+})
+
+def serve_file(request: Request, filepath) -> Response:
+    entry = files.get(filepath)
+    return cached_response(request, entry["body"], entry["etag"])
 
 # --- ROUTES ---
 
@@ -69,17 +276,8 @@ def health_check():
     return {"status": "ONLINE", "timestamp": time.time()}
 
 @app.get("/config")
-def get_config():
-    defaults = {
-        "snipeMode": "safe",
-        "minDelay": 1.5,
-        "maxDelay": 2.5,
-        "maxBuyPrice": 10000,
-        "pauseOnBuy": 60,
-        "softBanThreshold": 3,
-        "autoSellMarkup": 30
-    }
-    return load_json(CONFIG_FILE, defaults)
+def get_config(request: Request):
+    return serve_file(request, CONFIG_FILE)
 
 @app.post("/config")
 def update_config(config: BotConfig):
@@ -88,8 +286,8 @@ def update_config(config: BotConfig):
     return {"status": "SUCCESS", "msg": "Configuration appliquée"}
 
 @app.get("/filters")
-def get_filters():
-    return load_json(FILTERS_FILE, {"filters": []})
+def get_filters(request: Request):
+    return serve_file(request, FILTERS_FILE)
 
 @app.post("/filters")
 def update_filters(filters: List[SnipeFilter]):
@@ -98,18 +296,68 @@ def update_filters(filters: List[SnipeFilter]):
     return {"status": "SUCCESS", "msg": f"{len(filters)} filtres sauvegardés"}
 
 @app.get("/targets")
-def get_targets():
-    return load_json(TARGETS_FILE, [])
+def get_targets(request: Request):
+    return serve_file(request, TARGETS_FILE)
+
+def current_stats() -> dict:
+    stats = dict(files.get(STATS_FILE)["data"])
+    stats["live"] = telemetry.snapshot()
+    return stats
 
 @app.get("/stats")
 def get_stats():
-    return load_json(STATS_FILE, {
-        "scans": 0,
-        "hits": 0,
-        "buys": 0,
-        "fails": 0,
-        "profit_estimate": 0
-    })
+    # Pas d'ETag: "live" (last_seen, scans_per_min) change à chaque ingest, un
+    # If-None-Match n'obtiendrait presque jamais de 304
+    body = json.dumps(current_stats()).encode()
+    return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-cache"})
+
+@app.get("/stream")
+async def stream(request: Request):
+    """SSE: a full snapshot, then coalesced stats/trades/prices deltas."""
+    client = hub.subscribe(asyncio.get_running_loop())
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            yield sse("snapshot", current_stats())
+            while True:
+                try:
+                    await asyncio.wait_for(client.wakeup.wait(), timeout=STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                client.wakeup.clear()
+                for event, data in client.take():
+                    yield sse(event, data)
+                # Fenêtre de coalescence: les mises à jour suivantes s'accumulent
+                await asyncio.sleep(STREAM_MIN_INTERVAL)
+        finally:
+            hub.unsubscribe(client)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/ingest/batch")
+def ingest_batch(batch: TelemetryBatch):
+    telemetry.ingest(batch.worker_id, batch.events, batch.dropped, batch.failed)
+    hub.publish(batch.worker_id, batch.events)
+    return {"status": "OK", "accepted": len(batch.events)}
+
+@app.post("/ingest/scan")
+def ingest_scan(event: dict):
+    event["type"] = "scan"
+    worker_id = event.get("worker_id", "unknown")
+    telemetry.ingest(worker_id, [event])
+    hub.publish(worker_id, [event])
+    return {"status": "OK"}
+
+@app.post("/ingest/trade")
+def ingest_trade(event: dict):
+    event["type"] = "trade"
+    worker_id = event.get("worker_id", "unknown")
+    telemetry.ingest(worker_id, [event])
+    hub.publish(worker_id, [event])
+    return {"status": "OK"}
 
 if __name__ == "__main__":
     print("="*50)
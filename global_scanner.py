@@ -22,13 +22,22 @@ ANTI-BAN:
 =============================================================================
 """
 
-import requests
 import json
 import time
 import random
 import os
+from array import array
 from datetime import datetime
-from collections import defaultdict
+from collections import deque, namedtuple
+
+import numpy as np
+
+from ea_client import OK, TOKEN_EXPIRED, RATE_LIMIT, NETWORK_ERROR, classify, decode_auctions, get_client
+from price_store import PriceStore
+from page_scoring import AuctionColumns, ReferenceTable, unpack_keys
+from records import Opportunity
+import player_index
+import target_bus
 
 # =============================================================================
 # CONFIGURATION
@@ -37,13 +46,13 @@ from collections import defaultdict
 # Fichiers
 SESSION_FILE = "active_session.json"
 PLAYERS_DB_FILE = "clean_players.json"
-PRICE_CACHE_FILE = "price_cache.json"
+PLAYERS_BIN_FILE = "clean_players.bin"
+PRICE_CACHE_FILE = "price_cache.json"   # Ancien format JSON (migré au démarrage)
+PRICE_STORE_FILE = "price_history.bin"
 TARGETS_FILE = "active_targets.json"
+TARGET_TTL = 300          # Validité d'une cible pour les workers (5 min)
 SCAN_LOG_FILE = "scan_log.json"
 
-# EA API
-EA_BASE_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
-
 # Paramètres de scan
 SCAN_DELAY_MIN = 3.0      # Délai minimum entre requêtes
 SCAN_DELAY_MAX = 7.0      # Délai maximum
@@ -54,7 +63,16 @@ MAX_SCANS_PER_HOUR = 40   # Limite horaire
 TAX_RATE = 0.05           # 5% taxe EA
 MIN_PROFIT_MARGIN = 0.05  # 5% profit minimum après taxe
 MIN_PROFIT_ABSOLUTE = 200 # 200 CR profit minimum
+SELL_FACTOR = 0.95        # Revente visée: 95% du prix moyen
 MAX_BUY_PRICE = 15000     # Prix max d'achat (sécurité)
+MIN_SAMPLES = 5           # Échantillons minimum pour une moyenne fiable
+
+# Historique des prix (par version de carte)
+PRICE_HISTORY_SIZE = 50   # Entrées max gardées par version
+AVG_WINDOW = 20           # Échantillons pour la moyenne pondérée
+LOWEST_WINDOW = 21600     # Fenêtre du plus bas prix vu (6h)
+DECAY_SECONDS = 86400     # Le poids décroît linéairement sur 24h
+MIN_WEIGHT = 0.1          # Poids plancher des vieux échantillons
 
 # Types de scan (rotation pour paraître humain)
 SCAN_STRATEGIES = [
@@ -79,36 +97,169 @@ SCAN_STRATEGIES = [
 # CLASSES
 # =============================================================================
 
+class PriceSeries:
+    """Ring buffer des prix d'une version de carte.
+    
+    Les N derniers (prix, timestamp) vivent dans deux array compacts. Les
+    sommes de la fenêtre de moyenne sont mises à jour à chaque ajout, et une
+    deque monotone (prix croissants) donne le plus bas prix des 6h en O(1)
+    amorti. Mémoire bornée par PRICE_HISTORY_SIZE.
+    """
+    
+    __slots__ = ('capacity', 'prices', 'times', 'total', 't0',
+                 'sum_p', 'sum_pt', 'sum_t', 'min_queue')
+    
+    def __init__(self, capacity=PRICE_HISTORY_SIZE):
+        assert capacity > AVG_WINDOW
+        self.capacity = capacity
+        self.prices = array('I', [0]) * capacity
+        self.times = array('d', [0.0]) * capacity
+        self.total = 0       # Nombre d'enregistrements depuis la création
+        self.t0 = None       # Origine des temps (garde les sommes précises)
+        self.sum_p = 0.0     # Σ prix       (fenêtre AVG_WINDOW)
+        self.sum_pt = 0.0    # Σ prix * t   (t relatif à t0)
+        self.sum_t = 0.0     # Σ t
+        self.min_queue = deque()  # (prix, timestamp, index), prix croissants
+    
+    def __len__(self):
+        return min(self.total, self.capacity)
+    
+    def append(self, price, ts):
+        if self.t0 is None:
+            self.t0 = ts
+        index = self.total
+        slot = index % self.capacity
+        self.prices[slot] = price
+        self.times[slot] = ts
+        self.total += 1
+        
+        if slot == 0:
+            # Recalcul exact à chaque tour de ring (évite la dérive flottante)
+            self._recompute_window()
+        else:
+            rel = ts - self.t0
+            self.sum_p += price
+            self.sum_pt += price * rel
+            self.sum_t += rel
+            if self.total > AVG_WINDOW:
+                old = (index - AVG_WINDOW) % self.capacity
+                old_rel = self.times[old] - self.t0
+                self.sum_p -= self.prices[old]
+                self.sum_pt -= self.prices[old] * old_rel
+                self.sum_t -= old_rel
+        
+        queue = self.min_queue
+        while queue and queue[-1][0] >= price:
+            queue.pop()
+        queue.append((price, ts, index))
+        # Sorties du ring: retirées ici aussi, sinon une série jamais interrogée
+        # (ou aux prix croissants) garde toute son historique dans la deque
+        oldest_index = self.total - self.capacity
+        while queue[0][2] < oldest_index:
+            queue.popleft()
+    
+    def _recompute_window(self):
+        self.sum_p = self.sum_pt = self.sum_t = 0.0
+        for i in range(max(0, self.total - AVG_WINDOW), self.total):
+            slot = i % self.capacity
+            rel = self.times[slot] - self.t0
+            self.sum_p += self.prices[slot]
+            self.sum_pt += self.prices[slot] * rel
+            self.sum_t += rel
+    
+    def average(self, now):
+        """Moyenne pondérée des AVG_WINDOW derniers prix (récent = plus de poids)"""
+        n = min(self.total, AVG_WINDOW)
+        if n == 0:
+            return None
+        
+        # poids_i = 1 - (now - t_i) / 24h, linéaire en t_i donc calculable
+        # depuis les sommes de la fenêtre
+        base = 1 - (now - self.t0) / DECAY_SECONDS
+        weighted_sum = base * self.sum_p + self.sum_pt / DECAY_SECONDS
+        weight_total = base * n + self.sum_t / DECAY_SECONDS
+        
+        # Correction du plancher MIN_WEIGHT, uniquement pour les plus vieux
+        for i in range(self.total - n, self.total):
+            slot = i % self.capacity
+            weight = 1 - (now - self.times[slot]) / DECAY_SECONDS
+            if weight >= MIN_WEIGHT:
+                break
+            weighted_sum += (MIN_WEIGHT - weight) * self.prices[slot]
+            weight_total += MIN_WEIGHT - weight
+        
+        return int(weighted_sum / weight_total) if weight_total > 0 else None
+    
+    def lowest(self, now):
+        """Plus bas prix des LOWEST_WINDOW dernières secondes"""
+        queue = self.min_queue
+        oldest_index = self.total - self.capacity
+        while queue and (now - queue[0][1] >= LOWEST_WINDOW or queue[0][2] < oldest_index):
+            queue.popleft()
+        return queue[0][0] if queue else None
+    
+    def entries(self):
+        """(prix, timestamp) du plus ancien au plus récent"""
+        for i in range(max(0, self.total - self.capacity), self.total):
+            slot = i % self.capacity
+            yield self.prices[slot], self.times[slot]
+
+
 class PriceTracker:
     """Suit les prix pour détecter les anomalies"""
     
-    def __init__(self):
-        self.prices = defaultdict(list)  # {item_id: [(price, timestamp), ...]}
-        self.load_cache()
+    def __init__(self, store_file=PRICE_STORE_FILE):
+        self.prices = {}  # {"assetId_rareflag": PriceSeries}
+        # store_file=None: historique en mémoire seulement (rejeu market_analyzer)
+        self.store = PriceStore(store_file) if store_file else None
+        if self.store is not None:
+            self.load_cache()
     
     def load_cache(self):
-        if os.path.exists(PRICE_CACHE_FILE):
-            try:
-                with open(PRICE_CACHE_FILE, 'r') as f:
-                    data = json.load(f)
-                    for k, v in data.items():
-                        self.prices[int(k)] = v
-            except:
-                pass
+        """Rejoue les 24 dernières heures du store (mmap, pas de parsing JSON)"""
+        if self.store.is_empty() and os.path.exists(PRICE_CACHE_FILE):
+            self.migrate_json_cache()
+            return
+        
+        cutoff = time.time() - 86400
+        for ts, asset_id, rareflag, price in self.store.scan(since=cutoff):
+            key = self.make_key(asset_id, rareflag)
+            series = self.prices.get(key)
+            if series is None:
+                series = self.prices[key] = PriceSeries()
+            series.append(price, ts)
+    
+    def migrate_json_cache(self):
+        """Import unique de l'ancien price_cache.json dans le store binaire"""
+        try:
+            with open(PRICE_CACHE_FILE, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        cutoff = time.time() - 86400
+        rows = []
+        for key, entries in data.items():
+            asset_id, _, rareflag = key.partition('_')
+            if not asset_id.isdigit() or not rareflag.isdigit():
+                continue
+            rows.extend((ts, int(asset_id), int(rareflag), int(price))
+                        for price, ts in entries if ts > cutoff)
+        
+        rows.sort()
+        for ts, asset_id, rareflag, price in rows:
+            self.prices.setdefault(self.make_key(asset_id, rareflag), PriceSeries()).append(price, ts)
+            self.store.append(asset_id, rareflag, price, ts)
+        self.store.flush()
+        print(f"[CACHE] {len(rows)} prix migrés {PRICE_CACHE_FILE} -> {PRICE_STORE_FILE}")
     
     def save_cache(self):
-        # Ne garder que les 24h dernières heures
-        now = time.time()
-        cutoff = now - 86400
-        
-        cleaned = {}
-        for item_id, entries in self.prices.items():
-            recent = [(p, t) for p, t in entries if t > cutoff]
-            if recent:
-                cleaned[item_id] = recent[-50:]  # Max 50 entrées par item
-        
-        with open(PRICE_CACHE_FILE, 'w') as f:
-            json.dump(cleaned, f)
+        """Ajoute les nouvelles observations au store (sans réécrire l'historique)"""
+        if self.store is None:
+            return
+        self.store.flush()
+        # Purge > 24h en tâche de fond, quand elle est due
+        self.store.compact_async()
     
     def make_key(self, asset_id, rareflag):
         """Crée une clé unique par version de carte (Gold vs IF vs TOTW etc.)
@@ -123,46 +274,128 @@ class PriceTracker:
         """
         return f"{asset_id}_{rareflag}"
     
-    def record_price(self, asset_id, price, rareflag=1):
+    def record_price(self, asset_id, price, rareflag=1, now=None):
         key = self.make_key(asset_id, rareflag)
-        self.prices[key].append((price, time.time()))
+        series = self.prices.get(key)
+        if series is None:
+            series = self.prices[key] = PriceSeries()
+        ts = now or time.time()
+        series.append(price, ts)
+        if self.store is not None:
+            self.store.append(asset_id, rareflag, price, ts)
+    
+    def record_prices(self, asset_ids, prices, rareflags, now=None):
+        """Enregistre un lot d'observations (colonnes d'une ou plusieurs pages)"""
+        for asset_id, price, rareflag in zip(asset_ids.tolist(), prices.tolist(), rareflags.tolist()):
+            self.record_price(asset_id, price, rareflag, now)
+    
+    def reference_table(self, keys, now=None):
+        """Moyenne / plus bas / échantillons des versions demandées (clés packées)"""
+        now = now or time.time()
+        averages, lowest, samples = [], [], []
+        for asset_id, rareflag in zip(*(column.tolist() for column in unpack_keys(keys))):
+            series = self.prices.get(self.make_key(asset_id, rareflag))
+            averages.append((series.average(now) or 0) if series else 0)
+            lowest.append((series.lowest(now) or 0) if series else 0)
+            samples.append(len(series) if series else 0)
+        return ReferenceTable(keys, averages, lowest, samples)
     
     def get_average(self, asset_id, rareflag=1):
         """Prix moyen des dernières heures pour cette VERSION spécifique"""
-        key = self.make_key(asset_id, rareflag)
-        entries = self.prices.get(key, [])
-        if not entries:
-            return None
-        
-        # Pondérer les prix récents
-        now = time.time()
-        weighted_sum = 0
-        weight_total = 0
-        
-        for price, ts in entries[-20:]:  # 20 derniers
-            age_hours = (now - ts) / 3600
-            weight = max(0.1, 1 - (age_hours / 24))  # Plus récent = plus de poids
-            weighted_sum += price * weight
-            weight_total += weight
-        
-        return int(weighted_sum / weight_total) if weight_total > 0 else None
+        series = self.prices.get(self.make_key(asset_id, rareflag))
+        return series.average(time.time()) if series else None
     
     def get_lowest_seen(self, asset_id, rareflag=1):
-        """Plus bas prix vu récemment pour cette VERSION spécifique"""
-        key = self.make_key(asset_id, rareflag)
-        entries = self.prices.get(key, [])
-        if not entries:
-            return None
-        
-        # Dernières 6 heures
-        now = time.time()
-        recent = [p for p, t in entries if now - t < 21600]
-        return min(recent) if recent else None
+        """Plus bas prix vu récemment (6h) pour cette VERSION spécifique"""
+        series = self.prices.get(self.make_key(asset_id, rareflag))
+        return series.lowest(time.time()) if series else None
     
     def get_sample_count(self, asset_id, rareflag=1):
         """Nombre d'échantillons de prix (pour mesurer la fiabilité)"""
-        key = self.make_key(asset_id, rareflag)
-        return len(self.prices.get(key, []))
+        series = self.prices.get(self.make_key(asset_id, rareflag))
+        return len(series) if series else 0
+
+
+# =============================================================================
+# DÉCISION (sans réseau, rejouable par market_analyzer)
+# =============================================================================
+
+ScoredPage = namedtuple("ScoredPage", ["auctions", "cols", "gold", "average", "lowest", "samples"])
+
+
+def score_page(auctions, price_tracker, now=None):
+    """Colonnes d'un lot d'annonces jointes à l'historique de price_tracker.
+    
+    Enregistre les prix du lot au passage. Ne dépend d'aucun seuil: un même
+    ScoredPage peut être filtré par plusieurs jeux de seuils (select_deals).
+    """
+    cols = AuctionColumns(auctions)
+    listed = (cols.asset_id > 0) & (cols.buy_now > 0)
+    
+    # Enregistrer tous les prix, versions spéciales comprises (stats)
+    price_tracker.record_prices(cols.asset_id[listed], cols.buy_now[listed], cols.rareflag[listed], now)
+    
+    # IMPORTANT: Filtrer uniquement les Gold Rare (rareflag=1)
+    # On ne veut PAS comparer les prix IF/TOTW avec les Gold!
+    gold = listed & (cols.rareflag == 1)
+    keys = cols.keys()
+    
+    # Une seule jointure contre la table de référence de CETTE VERSION
+    table = price_tracker.reference_table(np.unique(keys[gold]), now)
+    return ScoredPage(auctions, cols, gold, *table.join(keys))
+
+
+def select_deals(scored, player_info=None, min_margin=MIN_PROFIT_MARGIN,
+                 min_profit=MIN_PROFIT_ABSOLUTE, max_buy=MAX_BUY_PRICE,
+                 sell_factor=SELL_FACTOR):
+    """Opportunités d'un ScoredPage pour un jeu de seuils (vectorisé)"""
+    auctions, cols, gold, avg_price, lowest_seen, sample_count = scored
+    
+    # Vente légèrement sous moyenne, profit net après taxe
+    estimated_sell = np.floor(avg_price * sell_factor)
+    profit = estimated_sell * (1 - TAX_RATE) - cols.buy_now
+    margin = profit / np.maximum(cols.buy_now, 1)
+    
+    deals = (gold
+             & (sample_count >= MIN_SAMPLES)  # SÉCURITÉ: besoin de données fiables
+             & (avg_price > 0)
+             & (cols.buy_now <= max_buy)
+             & (profit >= min_profit)
+             & (margin >= min_margin))
+    high = (profit > 500) & (sample_count >= 10)
+    
+    opportunities = []
+    for i in np.flatnonzero(deals).tolist():
+        asset_id = int(cols.asset_id[i])
+        info = player_info(asset_id) if player_info else {'name': f'ID:{asset_id}', 'rating': 0}
+        opportunities.append(Opportunity(
+            trade_id=auctions[i].trade_id,
+            buy_now=int(cols.buy_now[i]),
+            sell_price=int(estimated_sell[i]),
+            profit=int(profit[i]),
+            name=info['name'],
+            rating=int(cols.rating[i]) or info['rating'],
+            asset_id=asset_id,
+            item_id=auctions[i].item_id,
+            expires=int(cols.expires[i]),
+            reference_price=int(avg_price[i]),
+            lowest_seen=int(lowest_seen[i]) or None,
+            sample_count=int(sample_count[i]),
+            confidence='HIGH' if high[i] else 'MEDIUM',
+            source='global_scan',
+        ))
+    return opportunities
+
+
+def find_deals(auctions, price_tracker, now=None, player_info=None, **thresholds):
+    """Opportunités d'un lot d'annonces face à l'historique de price_tracker.
+    
+    Enregistre les prix du lot puis score toutes les annonces en un passage
+    vectorisé. now permet de rejouer des pages enregistrées à leur horodatage.
+    """
+    if not auctions:
+        return []
+    return select_deals(score_page(auctions, price_tracker, now), player_info, **thresholds)
 
 
 class GlobalScanner:
@@ -170,6 +403,7 @@ class GlobalScanner:
     
     def __init__(self):
         self.session = self.load_session()
+        self.client = get_client(self.session)
         self.players_db = self.load_players_db()
         self.price_tracker = PriceTracker()
         self.scan_count = 0
@@ -184,30 +418,25 @@ class GlobalScanner:
             return json.load(f)
     
     def load_players_db(self):
-        """Charge la base de données des joueurs"""
-        if not os.path.exists(PLAYERS_DB_FILE):
+        """Index joueurs partagé du process (chargé une seule fois)"""
+        if not os.path.exists(PLAYERS_BIN_FILE) and not os.path.exists(PLAYERS_DB_FILE):
             print(f"[!] Base joueurs non trouvée: {PLAYERS_DB_FILE}")
-            return {}
-        
-        with open(PLAYERS_DB_FILE, 'r') as f:
-            data = json.load(f)
-        
-        # Index par ID pour recherche rapide
-        by_id = {}
-        for name, cards in data.items():
-            for card in cards:
-                by_id[card.get('resourceId', card.get('baseId'))] = {
-                    'name': card.get('name', name),
-                    'rating': card.get('rating', 0),
-                    'position': card.get('position', '')
-                }
+            return None
         
-        print(f"[DB] {len(by_id)} joueurs chargés")
-        return by_id
+        index = player_index.get_index()
+        print(f"[DB] {len(index)} joueurs chargés")
+        return index
     
     def get_player_info(self, asset_id):
         """Récupère les infos d'un joueur"""
-        return self.players_db.get(asset_id, {'name': f'ID:{asset_id}', 'rating': 0})
+        card = self.players_db.get(asset_id) if self.players_db else None
+        if card is None:
+            return {'name': f'ID:{asset_id}', 'rating': 0}
+        return {
+            'name': card.get('name'),
+            'rating': card.get('rating') or 0,
+            'position': card.get('position') or ''
+        }
     
     def pareto_delay(self):
         """Délai aléatoire avec distribution Pareto (plus réaliste)"""
@@ -227,44 +456,39 @@ class GlobalScanner:
         return self.hourly_count < MAX_SCANS_PER_HOUR
     
     def search_market(self, params, page=0):
-        """Effectue une recherche sur le marché"""
+        """Effectue une recherche sur le marché (annonces décodées en Auction)"""
         if not self.check_hourly_limit():
             print("[!] Limite horaire atteinte")
             return None
         
-        url = f"{EA_BASE_URL}/transfermarket"
-        
         search_params = {
             "num": 21,
             "start": page * 21,
             **params
         }
         
-        headers = {
-            "X-UT-SID": self.session['x-ut-sid'],
-            "User-Agent": self.session.get('user_agent', 'Mozilla/5.0'),
-            "Accept": "application/json",
-        }
+        resp = self.client.get("transfermarket", params=search_params, timeout=15)
+        status = classify(resp)
+        if status == NETWORK_ERROR:
+            return None
+        
+        self.hourly_count += 1
+        self.scan_count += 1
+        
+        if status == TOKEN_EXPIRED:
+            print("[!] Token expiré - relance auth_capture.py")
+            return None
+        elif status == RATE_LIMIT:
+            print("[!] Rate limit - pause longue")
+            time.sleep(random.uniform(60, 120))
+            return None
+        elif status != OK:
+            print(f"[!] Erreur API: {resp.status_code}")
+            return None
         
         try:
-            resp = requests.get(url, params=search_params, headers=headers, timeout=15)
-            self.hourly_count += 1
-            self.scan_count += 1
-            
-            if resp.status_code == 401:
-                print("[!] Token expiré - relance auth_capture.py")
-                return None
-            elif resp.status_code == 429:
-                print("[!] Rate limit - pause longue")
-                time.sleep(random.uniform(60, 120))
-                return None
-            elif resp.status_code != 200:
-                print(f"[!] Erreur API: {resp.status_code}")
-                return None
-            
-            return resp.json()
-            
-        except Exception as e:
+            return decode_auctions(resp)
+        except ValueError as e:
             print(f"[!] Erreur requête: {e}")
             return None
     
@@ -287,70 +511,13 @@ class GlobalScanner:
         return False, profit
     
     def analyze_listing(self, item):
-        """Analyse une annonce pour détecter une opportunité"""
-        try:
-            # Extraction données
-            trade_id = item.get('tradeId')
-            buy_now = item.get('buyNowPrice', 0)
-            current_bid = item.get('currentBid', 0)
-            starting_bid = item.get('startingBid', 0)
-            expires = item.get('expires', 0)
-            
-            item_data = item.get('itemData', {})
-            asset_id = item_data.get('assetId', item_data.get('resourceId'))
-            rating = item_data.get('rating', 0)
-            rareflag = item_data.get('rareflag', 1)  # 1=Gold Rare par défaut
-            
-            if not asset_id or not buy_now:
-                return None
-            
-            # IMPORTANT: Filtrer uniquement les Gold Rare (rareflag=1)
-            # On ne veut PAS comparer les prix IF/TOTW avec les Gold!
-            if rareflag != 1:
-                # Enregistrer quand même pour les stats, mais ne pas trader
-                self.price_tracker.record_price(asset_id, buy_now, rareflag)
-                return None  # On skip les versions spéciales pour l'instant
-            
-            # Enregistrer le prix avec le rareflag
-            self.price_tracker.record_price(asset_id, buy_now, rareflag)
-            
-            # Récupérer prix moyen pour CETTE VERSION (Gold Rare uniquement)
-            avg_price = self.price_tracker.get_average(asset_id, rareflag)
-            lowest_seen = self.price_tracker.get_lowest_seen(asset_id, rareflag)
-            sample_count = self.price_tracker.get_sample_count(asset_id, rareflag)
-            
-            # SÉCURITÉ: Besoin d'au moins 5 échantillons pour être fiable
-            if sample_count < 5:
-                return None  # Pas assez de données pour ce joueur
-            
-            if avg_price:
-                # Comparer avec moyenne
-                estimated_sell = int(avg_price * 0.95)  # Vente légèrement sous moyenne
-                is_deal, profit = self.is_good_deal(buy_now, estimated_sell)
-                
-                if is_deal:
-                    player_info = self.get_player_info(asset_id)
-                    return {
-                        'trade_id': trade_id,
-                        'asset_id': asset_id,
-                        'name': player_info['name'],
-                        'rating': rating or player_info['rating'],
-                        'rareflag': rareflag,
-                        'buy_now': buy_now,
-                        'avg_price': avg_price,
-                        'estimated_sell': estimated_sell,
-                        'profit': int(profit),
-                        'margin_pct': round((profit / buy_now) * 100, 1),
-                        'expires': expires,
-                        'sample_count': sample_count,
-                        'timestamp': time.time(),
-                        'confidence': 'HIGH' if (profit > 500 and sample_count >= 10) else 'MEDIUM'
-                    }
-            
-            return None
-            
-        except Exception as e:
-            return None
+        """Analyse une annonce isolée pour détecter une opportunité"""
+        opportunities = self.analyze_page([item])
+        return opportunities[0] if opportunities else None
+    
+    def analyze_page(self, auctions):
+        """Analyse un lot d'annonces (une ou plusieurs pages) en un seul passage vectorisé"""
+        return find_deals(auctions, self.price_tracker, player_info=self.get_player_info)
     
     def scan_strategy(self, strategy):
         """Scanne avec une stratégie donnée"""
@@ -359,28 +526,27 @@ class GlobalScanner:
         
         print(f"\n[SCAN] {name}")
         
-        opportunities = []
+        listings = []
         
         for page in range(PAGES_PER_SCAN):
-            result = self.search_market(params, page)
+            auctions = self.search_market(params, page)
             
-            if not result:
+            if auctions is None:
                 break
             
-            auctions = result.get('auctionInfo', [])
             print(f"  Page {page + 1}: {len(auctions)} annonces")
-            
-            for item in auctions:
-                opp = self.analyze_listing(item)
-                if opp:
-                    opportunities.append(opp)
-                    print(f"  [💰] {opp['name']} ({opp['rating']}) - "
-                          f"Achat: {opp['buy_now']} | Profit: +{opp['profit']} CR ({opp['margin_pct']}%)")
+            listings.extend(auctions)
             
             # Délai avant page suivante
             if page < PAGES_PER_SCAN - 1:
                 time.sleep(self.pareto_delay())
         
+        # Toutes les pages de la stratégie sont scorées en un seul passage
+        opportunities = self.analyze_page(listings)
+        for opp in opportunities:
+            print(f"  [💰] {opp.name} ({opp.rating}) - "
+                  f"Achat: {opp.buy_now} | Profit: +{opp.profit} CR ({opp.margin_pct}%)")
+        
         return opportunities
     
     def run_full_scan(self):
@@ -405,7 +571,7 @@ class GlobalScanner:
             time.sleep(delay)
         
         # Trier par profit
-        all_opportunities.sort(key=lambda x: x['profit'], reverse=True)
+        all_opportunities.sort(key=lambda x: x.profit, reverse=True)
         
         # Sauvegarder
         self.save_opportunities(all_opportunities[:10])  # Top 10
@@ -419,19 +585,8 @@ class GlobalScanner:
     
     def save_opportunities(self, opportunities):
         """Sauvegarde les opportunités pour le worker"""
-        targets = []
-        
-        for opp in opportunities:
-            targets.append({
-                "player_id": opp['asset_id'],
-                "player_name": opp['name'],
-                "max_buy_price": opp['buy_now'],
-                "target_sell_price": opp['estimated_sell'],
-                "expected_profit": opp['profit'],
-                "confidence": opp['confidence'],
-                "expires_at": time.time() + 300,  # Valide 5 min
-                "source": "global_scan"
-            })
+        now = time.time()
+        targets = [opp.to_target(TARGET_TTL, now).to_dict() for opp in opportunities]
         
         output = {
             "generated_at": datetime.now().isoformat(),
@@ -439,10 +594,10 @@ class GlobalScanner:
             "targets": targets
         }
         
-        with open(TARGETS_FILE, 'w') as f:
-            json.dump(output, f, indent=2)
+        # Écriture atomique + push immédiat aux workers abonnés
+        notified = target_bus.publish(TARGETS_FILE, output)
         
-        print(f"[✓] {len(targets)} cibles sauvegardées → {TARGETS_FILE}")
+        print(f"[✓] {len(targets)} cibles sauvegardées → {TARGETS_FILE} ({notified} workers notifiés)")
     
     def run_continuous(self, interval_minutes=5):
         """Mode continu avec scans réguliers"""
@@ -18,22 +18,22 @@ ANTI-BAN:
 =============================================================================
 """
 
-import requests
 import json
 import time
 import random
 import os
 from datetime import datetime
 
+from ea_client import OK, TOKEN_EXPIRED, RATE_LIMIT, NETWORK_ERROR, classify, decode_auctions, get_client
+from target_bus import TargetSubscriber
+from trade_journal import get_journal
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 
 SESSION_FILE = "active_session.json"
 TARGETS_FILE = "active_targets.json"
-PURCHASES_LOG = "purchases_log.json"
-
-EA_BASE_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
 
 # Anti-ban
 REQUEST_DELAY_MIN = 2.5
@@ -54,10 +54,12 @@ class OpportunitySniper:
     
     def __init__(self):
         self.session = self.load_session()
+        self.client = get_client(self.session)
         self.buys_this_hour = 0
         self.hour_start = time.time()
         self.total_profit = 0
         self.purchases = []
+        self.bus = TargetSubscriber(TARGETS_FILE)
     
     def load_session(self):
         if not os.path.exists(SESSION_FILE):
@@ -66,23 +68,9 @@ class OpportunitySniper:
             return json.load(f)
     
     def load_targets(self):
-        """Charge les cibles actives"""
-        if not os.path.exists(TARGETS_FILE):
-            return []
-        
-        try:
-            with open(TARGETS_FILE, 'r') as f:
-                data = json.load(f)
-            
-            targets = data.get('targets', [])
-            now = time.time()
-            
-            # Filtrer les cibles expirées
-            valid = [t for t in targets if t.get('expires_at', 0) > now]
-            
-            return valid
-        except:
-            return []
+        """Cibles actives (poussées par le scanner, expirées filtrées)"""
+        self.bus.poll()
+        return self.bus.targets()
     
     def pareto_delay(self, min_d=None, max_d=None):
         """Délai aléatoire Pareto"""
@@ -104,8 +92,6 @@ class OpportunitySniper:
     
     def search_player(self, player_id, max_price):
         """Recherche un joueur sur le marché"""
-        url = f"{EA_BASE_URL}/transfermarket"
-        
         params = {
             "type": "player",
             "maskedDefId": player_id,
@@ -114,27 +100,21 @@ class OpportunitySniper:
             "start": 0
         }
         
-        headers = {
-            "X-UT-SID": self.session['x-ut-sid'],
-            "User-Agent": self.session.get('user_agent', 'Mozilla/5.0'),
-            "Accept": "application/json",
-        }
+        resp = self.client.get("transfermarket", params=params, timeout=15)
+        status = classify(resp)
+        
+        if status == TOKEN_EXPIRED:
+            print("[!] Token expiré")
+            return None
+        elif status == RATE_LIMIT:
+            print("[!] Rate limit")
+            return None
+        elif status != OK:
+            return None
         
         try:
-            resp = requests.get(url, params=params, headers=headers, timeout=15)
-            
-            if resp.status_code == 401:
-                print("[!] Token expiré")
-                return None
-            elif resp.status_code == 429:
-                print("[!] Rate limit")
-                return None
-            elif resp.status_code != 200:
-                return None
-            
-            return resp.json()
-            
-        except Exception as e:
+            return decode_auctions(resp)
+        except ValueError as e:
             print(f"[!] Erreur recherche: {e}")
             return None
     
@@ -144,77 +124,59 @@ class OpportunitySniper:
             print(f"  [DRY-RUN] Achat simulé: {trade_id} @ {price}")
             return True
         
-        url = f"{EA_BASE_URL}/trade/{trade_id}/bid"
-        
-        headers = {
-            "X-UT-SID": self.session['x-ut-sid'],
-            "User-Agent": self.session.get('user_agent', 'Mozilla/5.0'),
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
+        resp = self.client.put(f"trade/{trade_id}/bid", data={"bid": price}, timeout=15)
+        status = classify(resp)
         
-        payload = {"bid": price}
-        
-        try:
-            resp = requests.put(url, json=payload, headers=headers, timeout=15)
-            
-            if resp.status_code == 200:
-                return True
-            else:
-                print(f"  [!] Échec achat: {resp.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"  [!] Erreur achat: {e}")
-            return False
+        if status == OK:
+            return True
+        if status != NETWORK_ERROR:
+            print(f"  [!] Échec achat: {resp.status_code}")
+        return False
     
     def log_purchase(self, target, trade_id, price):
         """Log un achat"""
         purchase = {
             "timestamp": datetime.now().isoformat(),
-            "player_id": target['player_id'],
-            "player_name": target['player_name'],
+            "player_id": target.player_id,
+            "player_name": target.player_name,
             "trade_id": trade_id,
             "buy_price": price,
-            "expected_sell": target.get('target_sell_price', 0),
-            "expected_profit": target.get('expected_profit', 0),
-            "source": target.get('source', 'global')
+            "expected_sell": target.target_sell_price,
+            "expected_profit": target.expected_profit,
+            "source": target.source or 'global'
         }
         
         self.purchases.append(purchase)
-        self.total_profit += target.get('expected_profit', 0)
-        
-        # Sauvegarder
-        all_purchases = []
-        if os.path.exists(PURCHASES_LOG):
-            try:
-                with open(PURCHASES_LOG, 'r') as f:
-                    all_purchases = json.load(f)
-            except:
-                pass
-        
-        all_purchases.append(purchase)
+        self.total_profit += target.expected_profit
         
-        with open(PURCHASES_LOG, 'w') as f:
-            json.dump(all_purchases, f, indent=2)
+        # Journal partagé (ajout O(1), plus de réécriture du fichier)
+        get_journal().record(
+            "global_sniper",
+            player_id=target.player_id,
+            player_name=target.player_name,
+            trade_id=trade_id,
+            price=price,
+            expected_sell=target.target_sell_price,
+            expected_profit=target.expected_profit,
+            origin=target.source or 'global',
+        )
     
     def hunt_target(self, target):
         """Chasse une cible spécifique"""
-        player_id = target['player_id']
-        player_name = target['player_name']
-        max_price = target['max_buy_price']
-        expected_profit = target.get('expected_profit', 0)
+        player_id = target.player_id
+        player_name = target.player_name
+        max_price = target.max_buy_price
+        expected_profit = target.expected_profit
         
         print(f"\n[🎯] Chasse: {player_name} (max {max_price} CR)")
         
         # Rechercher
-        result = self.search_player(player_id, max_price)
+        auctions = self.search_player(player_id, max_price)
         
-        if not result:
+        if auctions is None:
             print("  [✗] Recherche échouée")
             return False
         
-        auctions = result.get('auctionInfo', [])
         print(f"  [i] {len(auctions)} annonces trouvées")
         
         if not auctions:
@@ -223,17 +185,17 @@ class OpportunitySniper:
         # Chercher la meilleure offre
         best = None
         for auction in auctions:
-            buy_now = auction.get('buyNowPrice', 0)
+            buy_now = auction.buy_now
             if buy_now and buy_now <= max_price:
-                if not best or buy_now < best['buyNowPrice']:
+                if not best or buy_now < best.buy_now:
                     best = auction
         
         if not best:
             print("  [✗] Aucune offre dans le budget")
             return False
         
-        trade_id = best['tradeId']
-        buy_now = best['buyNowPrice']
+        trade_id = best.trade_id
+        buy_now = best.buy_now
         
         print(f"  [→] Meilleure offre: {buy_now} CR")
         
@@ -295,11 +257,12 @@ class OpportunitySniper:
                     print(f"\n[📊] Session: {len(self.purchases)} achats | "
                           f"Profit estimé: +{self.total_profit} CR")
                 
-                # Attendre
+                # Attendre (réveil immédiat si le scanner pousse de nouvelles cibles)
                 wait = check_interval + random.uniform(-3, 3)
-                time.sleep(max(5, wait))
+                self.bus.wait(max(5, wait))
                 
         except KeyboardInterrupt:
+            self.bus.close()
             print("\n[STOP] Sniper arrêté")
             print(f"[📊] Total achats: {len(self.purchases)}")
             print(f"[📊] Profit estimé: +{self.total_profit} CR")
@@ -10,12 +10,16 @@ HARD SNIPER v2 - Détection d'anomalies temps réel
 import json
 import time
 import random
-import requests
 from datetime import datetime
+from functools import lru_cache
 
-# ==================== CONFIG ====================
-BASE_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
+from ea_client import OK, TOKEN_EXPIRED, RATE_LIMIT, NETWORK_ERROR, classify, decode_auctions, get_client
+from filter_engine import FilterEngine
+from notifier import get_notifier
+from price_service import EA_MIN_PRICE, get_price_service
+from records import Opportunity, TradeResult
 
+# ==================== CONFIG ====================
 # Discord Webhook (mettre ton URL ici)
 DISCORD_WEBHOOK_URL = ""  # Ex: "https://discord.com/api/webhooks/123456/abcdef..."
 DISCORD_ENABLED = False    # Passer à True une fois le webhook configuré
@@ -23,19 +27,7 @@ DISCORD_ENABLED = False    # Passer à True une fois le webhook configuré
 # Notes à surveiller - toutes les notes fodder
 TARGET_RATINGS = [83, 84, 85, 86, 87, 88, 89, 90]
 
-# Prix minimum EA par note (impossible de vendre en dessous)
-EA_MIN_PRICE = {
-    83: 700,
-    84: 700,
-    85: 700,
-    86: 750,
-    87: 800,
-    88: 850,
-    89: 900,
-    90: 950,
-    91: 1000,
-    92: 1100
-}
+# Prix minimum EA par note (plancher): EA_MIN_PRICE de price_service.py
 
 # Seuil d'anomalie: acheter si prix < X% du prix Futbin
 ANOMALY_THRESHOLD = 0.85  # 85% = -15% sous le marché Futbin
@@ -50,28 +42,14 @@ MAX_BUDGET_PER_CARD = 30000  # Budget max par carte
 MAX_PURCHASE_PER_CYCLE = 3   # Max achats par cycle (anti-flood)
 
 # ==================== DISCORD ====================
-def send_discord_notification(title, description, color=0x00ff00, fields=None):
-    """Envoie une notification Discord via webhook"""
+def send_discord_notification(title, description, color=0x00ff00, fields=None, urgent=False):
+    """Envoie une notification Discord via webhook (file + envoi en arrière-plan)"""
     if not DISCORD_ENABLED or not DISCORD_WEBHOOK_URL:
         return
     
-    embed = {
-        "title": title,
-        "description": description,
-        "color": color,
-        "timestamp": datetime.utcnow().isoformat(),
-        "footer": {"text": "FC Bot Sniper"}
-    }
-    
-    if fields:
-        embed["fields"] = fields
-    
-    payload = {"embeds": [embed]}
-    
-    try:
-        requests.post(DISCORD_WEBHOOK_URL, json=payload, timeout=5)
-    except:
-        pass  # Silencieux si Discord échoue
+    get_notifier(DISCORD_WEBHOOK_URL, footer="FC Bot Sniper").notify(
+        title, description, color=color, fields=fields, urgent=urgent
+    )
 
 def notify_snipe(player, rating, price, futbin_price, profit):
     """Notification de snipe réussi"""
@@ -92,7 +70,8 @@ def notify_session_expired():
     send_discord_notification(
         title="❌ SESSION EXPIRÉE",
         description="Le token EA a expiré. Relance le bot après extraction d'un nouveau token.",
-        color=0xff0000  # Rouge
+        color=0xff0000,  # Rouge
+        urgent=True
     )
 
 def notify_bot_started():
@@ -118,34 +97,18 @@ def load_session():
         return None
 
 def load_futbin_prices():
-    """Charge les prix Futbin comme référence depuis fodder_targets.json"""
-    try:
-        with open("fodder_targets.json", "r") as f:
-            data = json.load(f)
-        
-        prices = {}
-        for target in data.get("targets", []):
-            rating = target["rating"]
+    """Prix Futbin de référence par note (table price_service, rechargée à chaud)"""
+    prices = {}
+    for rating, ref in get_price_service().current().by_rating.items():
+        # Uniquement les notes couvertes par un fichier Futbin, pas les valeurs par défaut
+        if ref.market_price:
             # sell_price = prix Futbin marché
             # max_buy = prix achat safe calculé par futbin_pricer
             prices[rating] = {
-                "futbin_price": target["sell_price"],
-                "max_buy": target["max_buy"]
+                "futbin_price": ref.sell_price,
+                "max_buy": ref.buy_max
             }
-        
-        return prices
-    except Exception as e:
-        print(f"❌ Erreur chargement fodder_targets.json: {e}")
-        return {}
-
-def get_headers(session):
-    """Headers pour les requêtes EA"""
-    return {
-        "X-UT-SID": session["x-ut-sid"],
-        "User-Agent": session.get("user_agent", "Mozilla/5.0"),
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
+    return prices
 
 # ==================== EA API ====================
 def search_market(session, rating, max_price=None):
@@ -153,8 +116,6 @@ def search_market(session, rating, max_price=None):
     Recherche sur le marché EA pour une note donnée
     Filtre: Gold, Rare, note exacte
     """
-    headers = get_headers(session)
-    
     params = {
         "type": "player",
         "rarityIds": "1",          # Gold Rare uniquement
@@ -168,74 +129,53 @@ def search_market(session, rating, max_price=None):
     if max_price:
         params["maxb"] = max_price
     
-    url = f"{BASE_URL}/transfermarket"
+    resp = get_client(session).get("transfermarket", params=params, timeout=10)
+    status = classify(resp)
+    
+    if status == TOKEN_EXPIRED:
+        print("❌ Token expiré! Relancer l'extraction.")
+        return None
+    
+    if status == RATE_LIMIT:
+        print("⚠️ Rate limit - pause 60s")
+        time.sleep(60)
+        return []
+    
+    if status == NETWORK_ERROR:
+        return []
+    
+    if status != OK:
+        print(f"⚠️ Erreur API: {resp.status_code}")
+        return []
     
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
-        
-        if resp.status_code == 401:
-            print("❌ Token expiré! Relancer l'extraction.")
-            return None
-        
-        if resp.status_code == 429:
-            print("⚠️ Rate limit - pause 60s")
-            time.sleep(60)
-            return []
-        
-        if resp.status_code != 200:
-            print(f"⚠️ Erreur API: {resp.status_code}")
-            return []
-        
-        data = resp.json()
-        return data.get("auctionInfo", [])
-        
-    except Exception as e:
+        return decode_auctions(resp)
+    except ValueError as e:
         print(f"⚠️ Erreur requête: {e}")
         return []
 
 def buy_card(session, trade_id, price):
     """Achète une carte sur le marché (BIN)"""
-    headers = get_headers(session)
-    url = f"{BASE_URL}/trade/{trade_id}/bid"
-    
-    payload = {"bid": price}
-    
-    try:
-        resp = requests.put(url, headers=headers, json=payload, timeout=10)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).put(f"trade/{trade_id}/bid", data={"bid": price}, timeout=10)
+    status = classify(resp)
+    return TradeResult(status == OK, status, trade_id, price)
 
 def send_to_tradepile(session, item_id):
     """Envoie une carte dans la pile de transfert"""
-    headers = get_headers(session)
-    url = f"{BASE_URL}/item"
-    
     payload = {"itemData": [{"id": item_id, "pile": "trade"}]}
-    
-    try:
-        resp = requests.put(url, headers=headers, json=payload, timeout=10)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).put("item", data=payload, timeout=10)
+    return classify(resp) == OK
 
 def list_card_for_sale(session, item_id, start_price, buy_now):
     """Met une carte en vente"""
-    headers = get_headers(session)
-    url = f"{BASE_URL}/auctionhouse"
-    
     payload = {
         "itemData": {"id": item_id},
         "startingBid": start_price,
         "duration": 3600,  # 1 heure
         "buyNowPrice": buy_now
     }
-    
-    try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=10)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).post("auctionhouse", data=payload, timeout=10)
+    return classify(resp) == OK
 
 # ==================== SNIPER LOGIC ====================
 def gaussian_delay(min_d, max_d):
@@ -245,6 +185,47 @@ def gaussian_delay(min_d, max_d):
     delay = random.gauss(mean, std)
     return max(min_d, min(max_d, delay))
 
+def threshold_price(rating, futbin_price, threshold=ANOMALY_THRESHOLD):
+    """Prix max d'une anomalie pour cette note, None si sous le plancher EA"""
+    price = int(futbin_price * threshold)
+    return price if price > EA_MIN_PRICE.get(rating, 700) else None
+
+@lru_cache(maxsize=256)
+def anomaly_engine(rating, max_price):
+    """Filtre compilé une fois par (note, seuil), réutilisé à chaque scan"""
+    # IMPORTANT: la note RÉELLE doit correspondre (l'API ne filtre pas toujours)
+    return FilterEngine([{
+        "name": f"Anomalie {rating}",
+        "params": {"minr": rating, "maxr": rating, "maxb": max_price},
+    }])
+
+def find_anomalies(auctions, rating, futbin_price, threshold=ANOMALY_THRESHOLD):
+    """
+    Décision pure (sans réseau): annonces d'une page sous le seuil d'anomalie
+    Rejouable hors ligne par market_analyzer
+    """
+    max_price = threshold_price(rating, futbin_price, threshold)
+    if max_price is None:
+        return []
+    
+    anomalies = []
+    for match in anomaly_engine(rating, max_price).evaluate(auctions):
+        auction = match.auction
+        anomalies.append(Opportunity(
+            trade_id=auction.trade_id,
+            buy_now=match.price,
+            sell_price=futbin_price,  # Revente au prix Futbin
+            profit=int(futbin_price * 0.95 - match.price),
+            name=auction.last_name or "Unknown",
+            rating=rating,
+            asset_id=auction.asset_id,
+            item_id=auction.item_id,
+            expires=auction.expires,
+            reference_price=futbin_price,
+            source="hard_sniper",
+        ))
+    return anomalies
+
 def scan_for_anomalies(session, futbin_prices):
     """
     Scan le marché EA et compare aux prix Futbin
@@ -259,45 +240,22 @@ def scan_for_anomalies(session, futbin_prices):
         ref = futbin_prices[rating]
         futbin_price = ref["futbin_price"]
         
-        # Prix seuil = X% du prix Futbin
-        threshold_price = int(futbin_price * ANOMALY_THRESHOLD)
-        
-        # Vérifier que le seuil est au-dessus du prix plancher EA
+        # Prix seuil = X% du prix Futbin, au-dessus du prix plancher EA
         min_ea_price = EA_MIN_PRICE.get(rating, 700)
-        if threshold_price <= min_ea_price:
-            print(f"  [Note {rating}] ⏭️ Skip - seuil {threshold_price} <= plancher EA {min_ea_price}")
+        max_price = threshold_price(rating, futbin_price)
+        if max_price is None:
+            print(f"  [Note {rating}] ⏭️ Skip - seuil {int(futbin_price * ANOMALY_THRESHOLD)} <= plancher EA {min_ea_price}")
             continue
         
-        print(f"  [Note {rating}] Futbin: {futbin_price} CR | Cherche {min_ea_price}-{threshold_price} CR")
+        print(f"  [Note {rating}] Futbin: {futbin_price} CR | Cherche {min_ea_price}-{max_price} CR")
         
         # Recherche EA avec prix max = seuil anomalie
-        auctions = search_market(session, rating, max_price=threshold_price)
+        auctions = search_market(session, rating, max_price=max_price)
         
         if auctions is None:  # Token expiré
             return None
         
-        if auctions:
-            for auction in auctions:
-                buy_now = auction.get("buyNowPrice", 0)
-                player_data = auction.get("itemData", {})
-                actual_rating = player_data.get("rating", 0)
-                
-                # IMPORTANT: Vérifier que la note RÉELLE correspond
-                if actual_rating != rating:
-                    continue  # Skip si note différente
-                
-                if buy_now > 0 and buy_now <= threshold_price:
-                    player_name = player_data.get("lastName", "Unknown")
-                    
-                    anomalies.append({
-                        "trade_id": auction["tradeId"],
-                        "item_id": player_data["id"],
-                        "rating": actual_rating,
-                        "price": buy_now,
-                        "futbin_price": futbin_price,
-                        "discount": round((1 - buy_now/futbin_price) * 100, 1),
-                        "player": player_name
-                    })
+        anomalies.extend(find_anomalies(auctions, rating, futbin_price))
         
         # Délai anti-ban entre chaque note
         time.sleep(gaussian_delay(SCAN_DELAY_MIN, SCAN_DELAY_MAX))
@@ -309,20 +267,20 @@ def process_anomalies(session, anomalies, futbin_prices):
     purchases = 0
     
     # Trier par meilleur discount (les meilleures affaires d'abord)
-    anomalies.sort(key=lambda x: x["discount"], reverse=True)
+    anomalies.sort(key=lambda x: x.discount_pct, reverse=True)
     
     for anomaly in anomalies:
         if purchases >= MAX_PURCHASE_PER_CYCLE:
             print(f"  ⏸️ Max achats atteint ({MAX_PURCHASE_PER_CYCLE})")
             break
         
-        trade_id = anomaly["trade_id"]
-        item_id = anomaly["item_id"]
-        price = anomaly["price"]
-        rating = anomaly["rating"]
-        discount = anomaly["discount"]
-        player = anomaly["player"]
-        futbin_price = anomaly["futbin_price"]
+        trade_id = anomaly.trade_id
+        item_id = anomaly.item_id
+        price = anomaly.buy_now
+        rating = anomaly.rating
+        discount = anomaly.discount_pct
+        player = anomaly.name
+        futbin_price = anomaly.reference_price
         
         print(f"\n  🎯 ANOMALIE: {player} (Note {rating})")
         print(f"     Prix: {price} CR | Futbin: {futbin_price} CR | -{discount}%")
@@ -332,8 +290,7 @@ def process_anomalies(session, anomalies, futbin_prices):
             print(f"     ✅ ACHETÉ!")
             purchases += 1
             
-            # Calculer profit pour la notification
-            profit = int(futbin_price * 0.95 - price)
+            profit = anomaly.profit
             
             # Notification Discord
             notify_snipe(player, rating, price, futbin_price, profit)
@@ -344,7 +301,7 @@ def process_anomalies(session, anomalies, futbin_prices):
             # Envoyer dans pile de transfert
             if send_to_tradepile(session, item_id):
                 # Mettre en vente au prix Futbin (ou légèrement en dessous)
-                sell_price = futbin_price
+                sell_price = anomaly.sell_price
                 start_price = int(sell_price * 0.9)
                 
                 if list_card_for_sale(session, item_id, start_price, sell_price):
@@ -394,6 +351,7 @@ def main():
     
     total_purchases = 0
     cycle = 0
+    prices_version = get_price_service().current().version
     
     print(f"\n🚀 Démarrage du sniper...")
     print("-"*60)
@@ -406,6 +364,13 @@ def main():
             cycle += 1
             print(f"\n[Cycle {cycle}] {datetime.now().strftime('%H:%M:%S')} - Scan en cours...")
             
+            # Nouveaux prix Futbin (fichiers réécrits par futbin_pricer/futbin_feed)
+            table = get_price_service().current()
+            if table.version != prices_version:
+                prices_version = table.version
+                futbin_prices = load_futbin_prices() or futbin_prices
+                print(f"  📊 Référentiel Futbin rechargé ({len(futbin_prices)} notes)")
+            
             # Scanner les anomalies
             anomalies = scan_for_anomalies(session, futbin_prices)
             
@@ -0,0 +1,659 @@
+"""Recorded transfermarket pages and an offline replay of the buy decisions.
+
+The pricing thresholds (ANOMALY_THRESHOLD in hard_sniper, MIN_PROFIT_MARGIN
+in global_scanner, DISCOUNT_PERCENT in futbin_feed) could only be judged by
+running the bots live. Any bot going through ea_client.decode_auctions now
+records the raw auctionInfo pages it receives when MARKET_RECORD_FILE is
+set, and this module streams such a recording back through the same
+decision functions (hard_sniper.find_anomalies, global_scanner.find_deals,
+futbin_feed.fodder_target) as fast as the decoder allows, reporting
+simulated buys, tax-adjusted profit and capital usage. sweep() runs a whole
+parameter grid over a process pool and writes a ranked CSV table.
+
+    MARKET_RECORD_FILE=pages.bin python global_scanner.py
+    python market_analyzer.py info pages.bin
+    python market_analyzer.py replay pages.bin --strategy hard_sniper --threshold 0.8
+    python market_analyzer.py replay pages.bin --strategy global_scanner --min-margin 0.08 --bankroll 200000
+    python market_analyzer.py sweep pages.bin --strategy global_scanner \
+        --grid min_margin=0.03:0.10:0.01 --grid min_profit=100,200,400 --grid sell_factor=0.93,0.95,0.97
+
+File layout (little-endian):
+    header : b"FCPAGES1"
+    page*  : b"PAGE" | ts:f64 | length:u32 | body[length] | padding to 8 bytes
+
+The body is the response as received (JSON bytes). A page cut short by a
+crash is ignored and truncated on the next open, like price_store.py.
+"""
+
+import atexit
+import csv
+import heapq
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ea_client import Auction, loads, parse_auctions
+from filter_engine import TAX_RATE, FilterEngine
+from records import Opportunity
+
+FILE_MAGIC = b"FCPAGES1"
+PAGE_MAGIC = b"PAGE"
+PAGE_HEADER = struct.Struct("<4sdI")
+FLUSH_EVERY = 32               # Pages bufferisées avant écriture disque
+REFERENCE_FILE = "fodder_targets.json"
+HOLD_SECONDS = 3600            # Délai simulé entre l'achat et la vente (1 mise en vente)
+
+# Une décision: page d'annonces + horodatage -> opportunités à acheter
+Decision = Callable[[List[Auction], float], List[Opportunity]]
+
+
+def _page_size(length: int) -> int:
+    return (PAGE_HEADER.size + length + 7) & ~7
+
+
+def _iter_pages(buf, limit: Optional[int] = None):
+    """Yields (offset, ts, body_start, body_end) of every complete page in buf[:limit]."""
+    offset = len(FILE_MAGIC)
+    total = len(buf) if limit is None else min(limit, len(buf))
+    while offset + PAGE_HEADER.size <= total:
+        magic, ts, length = PAGE_HEADER.unpack_from(buf, offset)
+        end = offset + _page_size(length)
+        if magic != PAGE_MAGIC or end > total:
+            break
+        start = offset + PAGE_HEADER.size
+        yield offset, ts, start, start + length
+        offset = end
+
+
+class PageRecorder:
+    """Append-only file of raw transfermarket bodies."""
+
+    def __init__(self, path: str, flush_every: int = FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.count = 0
+        self._repair()
+        self.file = open(path, "ab")
+
+    def _repair(self):
+        """Creates the file, or truncates a trailing partial page."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < len(FILE_MAGIC):
+            with open(self.path, "wb") as f:
+                f.write(FILE_MAGIC)
+            return
+
+        valid_end = len(FILE_MAGIC)
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(FILE_MAGIC)] != FILE_MAGIC:
+                    raise ValueError(f"{self.path}: not a page recording")
+                size = len(mm)
+                for offset, _, start, end in _iter_pages(mm):
+                    valid_end = offset + _page_size(end - start)
+                    self.count += 1
+
+        if valid_end < size:
+            print(f"[RECORD] Page incomplète ignorée ({size - valid_end} octets)")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_end)
+
+    def record(self, body: bytes, ts: Optional[float] = None):
+        """Appends one raw response body (flushed every flush_every pages)."""
+        header = PAGE_HEADER.pack(PAGE_MAGIC, ts or time.time(), len(body))
+        padding = b"\0" * (_page_size(len(body)) - PAGE_HEADER.size - len(body))
+        with self.lock:
+            self.file.write(header + body + padding)
+            self.count += 1
+            self.pending += 1
+            if self.pending >= self.flush_every:
+                self.file.flush()
+                self.pending = 0
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+            self.pending = 0
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+_recorders: Dict[str, PageRecorder] = {}
+_recorders_lock = threading.Lock()
+
+
+def get_recorder(path: str) -> PageRecorder:
+    """Returns the process-wide recorder for this file (flushed at exit)."""
+    recorder = _recorders.get(path)
+    if recorder is None:
+        with _recorders_lock:
+            recorder = _recorders.get(path)
+            if recorder is None:
+                recorder = _recorders[path] = PageRecorder(path)
+                atexit.register(recorder.close)
+    return recorder
+
+
+def map_recording(path: str) -> Optional[mmap.mmap]:
+    """Read-only mapping of a recording (None when it holds no page)."""
+    if os.path.getsize(path) <= len(FILE_MAGIC):
+        return None
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm[:len(FILE_MAGIC)] != FILE_MAGIC:
+        mm.close()
+        raise ValueError(f"{path}: not a page recording")
+    return mm
+
+
+def iter_mapped(buf, since: float = 0.0) -> Iterator[Tuple[float, List[Auction]]]:
+    """Decodes the pages of an already mapped recording, oldest first."""
+    for _, ts, start, end in _iter_pages(buf):
+        if ts <= since:
+            continue
+        try:
+            yield ts, parse_auctions(loads(buf[start:end]))
+        except ValueError:
+            continue  # Corps non JSON (page d'erreur enregistrée)
+
+
+def read_pages(path: str, since: float = 0.0) -> Iterator[Tuple[float, List[Auction]]]:
+    """Yields (ts, auctions) of every recorded page newer than since, oldest first."""
+    mm = map_recording(path)
+    if mm is None:
+        return
+    try:
+        yield from iter_mapped(mm, since)
+    finally:
+        mm.close()
+
+
+def load_reference_prices(path: str = REFERENCE_FILE) -> Dict[int, int]:
+    """Futbin price per rating from fodder_targets.json (sell_price or market_price)."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    prices = {}
+    for target in data.get("targets", []):
+        price = target.get("sell_price") or target.get("market_price")
+        if target.get("rating") and price:
+            prices[int(target["rating"])] = int(price)
+    return prices
+
+
+# =============================================================================
+# STRATÉGIES (mêmes fonctions de décision que les bots, paramètres surchargeables)
+# =============================================================================
+
+def hard_sniper_strategy(reference_prices: Dict[int, int], threshold: Optional[float] = None) -> Decision:
+    """hard_sniper: buy below threshold x Futbin price, best discounts first."""
+    import hard_sniper
+
+    threshold = hard_sniper.ANOMALY_THRESHOLD if threshold is None else threshold
+    ratings = [r for r in hard_sniper.TARGET_RATINGS if r in reference_prices]
+
+    def decide(auctions, now):
+        anomalies = []
+        for rating in ratings:
+            anomalies.extend(hard_sniper.find_anomalies(auctions, rating, reference_prices[rating], threshold))
+        anomalies.sort(key=lambda o: o.discount_pct, reverse=True)
+        return anomalies[:hard_sniper.MAX_PURCHASE_PER_CYCLE]
+
+    return decide
+
+
+class PageScorer:
+    """global_scanner.score_page run once per replayed page.
+
+    Every global_scanner strategy built on the same scorer shares its price
+    history and the scored page; only the thresholds differ.
+    """
+
+    def __init__(self):
+        import global_scanner
+
+        self.score_page = global_scanner.score_page
+        self.tracker = global_scanner.PriceTracker(store_file=None)
+        self.auctions = None
+        self.scored = None
+
+    def __call__(self, auctions, now):
+        if auctions is not self.auctions:
+            self.auctions = auctions
+            self.scored = self.score_page(auctions, self.tracker, now) if auctions else None
+        return self.scored
+
+
+def global_scanner_strategy(min_margin: Optional[float] = None, min_profit: Optional[int] = None,
+                            max_buy: Optional[int] = None, sell_factor: Optional[float] = None,
+                            scorer: Optional[PageScorer] = None) -> Decision:
+    """global_scanner: price history built from the replayed pages themselves."""
+    import global_scanner
+
+    scorer = scorer or PageScorer()
+    thresholds = {
+        "min_margin": global_scanner.MIN_PROFIT_MARGIN if min_margin is None else min_margin,
+        "min_profit": global_scanner.MIN_PROFIT_ABSOLUTE if min_profit is None else min_profit,
+        "max_buy": global_scanner.MAX_BUY_PRICE if max_buy is None else max_buy,
+        "sell_factor": global_scanner.SELL_FACTOR if sell_factor is None else sell_factor,
+    }
+
+    def decide(auctions, now):
+        scored = scorer(auctions, now)
+        return global_scanner.select_deals(scored, **thresholds) if scored else []
+
+    return decide
+
+
+def futbin_feed_strategy(reference_prices: Dict[int, int], discount: Optional[float] = None) -> Decision:
+    """fodder_sniper fed by futbin_feed targets generated with this discount."""
+    import futbin_feed
+
+    discount = futbin_feed.DISCOUNT_PERCENT if discount is None else discount
+    configs = []
+    for rating, market_price in sorted(reference_prices.items()):
+        target = futbin_feed.fodder_target(rating, market_price, discount)
+        if target is None:
+            continue
+        # Même filtre que FodderSniper pour cette note
+        configs.append({
+            "name": f"Fodder {rating}",
+            "params": {"raretype": "1", "minr": rating, "maxr": rating, "maxb": target["max_buy"]},
+            "expected_min_value": market_price,
+            "min_profit": target["estimated_profit"],
+        })
+    engine = FilterEngine(configs)
+
+    def decide(auctions, now):
+        return [
+            Opportunity(
+                trade_id=m.auction.trade_id,
+                buy_now=m.price,
+                sell_price=m.filter.expected_value,
+                profit=m.profit,
+                name=m.auction.last_name or "Unknown",
+                rating=m.auction.rating,
+                asset_id=m.auction.asset_id,
+                item_id=m.auction.item_id,
+                expires=m.auction.expires,
+                reference_price=m.filter.expected_value,
+                source="futbin_feed",
+            )
+            for m in engine.evaluate(auctions)
+        ]
+
+    return decide
+
+
+STRATEGIES = {
+    "hard_sniper": hard_sniper_strategy,
+    "global_scanner": global_scanner_strategy,
+    "futbin_feed": futbin_feed_strategy,
+}
+
+
+def make_strategy(name: str, reference_prices: Optional[Dict[int, int]] = None,
+                  scorer: Optional[PageScorer] = None, **params) -> Decision:
+    """Builds a named strategy; params left to None keep the bot's own constants."""
+    factory = STRATEGIES[name]
+    params = {k: v for k, v in params.items() if v is not None}
+    if name == "global_scanner":
+        return factory(scorer=scorer, **params)
+    if reference_prices is None:
+        reference_prices = load_reference_prices()
+    return factory(reference_prices, **params)
+
+
+# =============================================================================
+# BACKTEST
+# =============================================================================
+
+@dataclass(slots=True)
+class BacktestReport:
+    strategy: str = ""
+    pages: int = 0
+    listings: int = 0
+    signals: int = 0              # Opportunités retenues par la stratégie
+    buys: int = 0
+    missed: int = 0               # Achats perdus (fill_rate)
+    skipped_capital: int = 0      # Achats impossibles faute de crédits
+    spent: int = 0
+    revenue: int = 0              # Reventes, taxe EA déduite
+    tax: int = 0
+    profit: int = 0
+    peak_capital: int = 0         # Crédits immobilisés au pire moment
+    recorded_seconds: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def roi_pct(self) -> float:
+        return round(self.profit / self.peak_capital * 100, 1) if self.peak_capital else 0.0
+
+    @property
+    def listings_per_second(self) -> float:
+        return round(self.listings / self.elapsed) if self.elapsed else 0.0
+
+    def to_dict(self) -> dict:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["roi_pct"] = self.roi_pct
+        return data
+
+
+class Backtest:
+    """Simulated buyer: every signal is bought at buy_now and resold at sell_price.
+
+    A purchase ties up its price for hold_seconds of recorded time, then
+    returns sell_price minus EA tax. bankroll (None = unlimited) caps the
+    credits available; fill_rate < 1 simulates lost races.
+    """
+
+    def __init__(self, decide: Decision, name: str = "", bankroll: Optional[int] = None,
+                 hold_seconds: float = HOLD_SECONDS, fill_rate: float = 1.0, seed: int = 0):
+        self.decide = decide
+        self.bankroll = bankroll
+        self.hold_seconds = hold_seconds
+        self.fill_rate = fill_rate
+        self.rng = random.Random(seed)
+        self.report = BacktestReport(strategy=name)
+        self.cash = bankroll
+        self.in_use = 0
+        self.positions: List[Tuple[float, int, int]] = []   # (revente, prix d'achat, vente nette)
+        self.bought = set()
+        self.first_ts: Optional[float] = None
+        self.last_ts = 0.0
+
+    def _settle(self, now: float):
+        positions = self.positions
+        while positions and positions[0][0] <= now:
+            _, price, proceeds = heapq.heappop(positions)
+            self.in_use -= price
+            if self.cash is not None:
+                self.cash += proceeds
+
+    def feed(self, ts: float, auctions: List[Auction]):
+        """Runs the decision on one page and books the simulated buys."""
+        report = self.report
+        if self.first_ts is None:
+            self.first_ts = ts
+        self.last_ts = ts
+        report.pages += 1
+        report.listings += len(auctions)
+        self._settle(ts)
+
+        for opp in self.decide(auctions, ts):
+            if opp.trade_id in self.bought:
+                continue
+            report.signals += 1
+            if self.fill_rate < 1 and self.rng.random() >= self.fill_rate:
+                report.missed += 1
+                continue
+            if self.cash is not None and self.cash < opp.buy_now:
+                report.skipped_capital += 1
+                continue
+
+            proceeds = int(opp.sell_price * (1 - TAX_RATE))
+            self.bought.add(opp.trade_id)
+            report.buys += 1
+            report.spent += opp.buy_now
+            report.revenue += proceeds
+            report.tax += opp.sell_price - proceeds
+            if self.cash is not None:
+                self.cash -= opp.buy_now
+            self.in_use += opp.buy_now
+            report.peak_capital = max(report.peak_capital, self.in_use)
+            heapq.heappush(self.positions, (ts + self.hold_seconds, opp.buy_now, proceeds))
+
+    def finish(self) -> BacktestReport:
+        """Settles open positions (assumed sold) and returns the report."""
+        self._settle(float("inf"))
+        report = self.report
+        report.profit = report.revenue - report.spent
+        report.recorded_seconds = round(self.last_ts - (self.first_ts or self.last_ts), 1)
+        return report
+
+
+def replay(path: str, decide: Decision, name: str = "", speed: Optional[float] = None,
+           since: float = 0.0, **options) -> BacktestReport:
+    """Streams a recording through decide; speed=None replays as fast as possible.
+
+    speed=600 plays ten recorded minutes per second (pauses scaled from the
+    recorded timestamps).
+    """
+    backtest = Backtest(decide, name=name, **options)
+    started = time.perf_counter()
+    previous = None
+    for ts, auctions in read_pages(path, since):
+        if speed and previous is not None and ts > previous:
+            time.sleep((ts - previous) / speed)
+        previous = ts
+        backtest.feed(ts, auctions)
+    report = backtest.finish()
+    report.elapsed = round(time.perf_counter() - started, 3)
+    return report
+
+
+# =============================================================================
+# SWEEP (grille de paramètres répartie sur un pool de processus)
+# =============================================================================
+
+SWEEP_RESULTS_FILE = "sweep_results.csv"
+BACKTEST_OPTIONS = ("bankroll", "hold_seconds", "fill_rate")
+
+_mapped: Dict[str, Optional[mmap.mmap]] = {}
+
+
+def _shared_recording(path: str) -> Optional[mmap.mmap]:
+    """Process-wide read-only mapping (inherited as-is by forked workers)."""
+    if path not in _mapped:
+        _mapped[path] = map_recording(path)
+    return _mapped[path]
+
+
+def parse_grid(specs: List[str]) -> Dict[str, list]:
+    """["min_margin=0.03:0.10:0.01", "min_profit=100,200"] -> {name: values}.
+
+    start:stop:step ranges include stop; integer-looking values stay ints.
+    """
+    def number(text):
+        return int(text) if text.lstrip("-").isdigit() else float(text)
+
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"grid entry without values: {spec}")
+        if ":" in values:
+            start, stop, step = (number(v) for v in values.split(":"))
+            steps = int(round((stop - start) / step))
+            grid[name] = [round(start + i * step, 10) for i in range(steps + 1)]
+        else:
+            grid[name] = [number(v) for v in values.split(",") if v]
+    return grid
+
+
+def expand_grid(grid: Dict[str, list]) -> List[dict]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def run_configs(path: str, strategy: str, configs: List[dict],
+                reference_prices: Optional[Dict[int, int]] = None,
+                options: Optional[dict] = None) -> List[Tuple[dict, dict]]:
+    """Replays the recording once for a shard of configs.
+
+    Each page is decoded once and fed to every config of the shard in
+    lockstep; global_scanner configs also share one PageScorer.
+    """
+    scorer = PageScorer() if strategy == "global_scanner" else None
+    backtests = []
+    for config in configs:
+        params = {k: v for k, v in config.items() if k not in BACKTEST_OPTIONS}
+        backtest_options = dict(options or {})
+        backtest_options.update((k, v) for k, v in config.items() if k in BACKTEST_OPTIONS)
+        decide = make_strategy(strategy, reference_prices, scorer=scorer, **params)
+        backtests.append(Backtest(decide, name=strategy, **backtest_options))
+
+    started = time.perf_counter()
+    mm = _shared_recording(path)
+    if mm is not None:
+        for ts, auctions in iter_mapped(mm):
+            for backtest in backtests:
+                backtest.feed(ts, auctions)
+    elapsed = round(time.perf_counter() - started, 3)
+
+    results = []
+    for config, backtest in zip(configs, backtests):
+        report = backtest.finish()
+        report.elapsed = elapsed
+        results.append((config, report.to_dict()))
+    return results
+
+
+def _run_shard(task):
+    return run_configs(*task)
+
+
+def sweep(path: str, strategy: str, grid: Dict[str, list],
+          reference_prices: Optional[Dict[int, int]] = None, workers: Optional[int] = None,
+          options: Optional[dict] = None, rank: str = "profit") -> List[Tuple[dict, dict]]:
+    """Backtests every combination of grid, best `rank` first.
+
+    The grid is split into one shard per worker process (round-robin, so
+    shards cost about the same). The recording is mapped before the pool
+    forks: workers read the same read-only pages instead of copies.
+    """
+    configs = expand_grid(grid)
+    if strategy != "global_scanner" and reference_prices is None:
+        reference_prices = load_reference_prices()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(configs)))
+    tasks = [(path, strategy, configs[i::workers], reference_prices, options) for i in range(workers)]
+
+    _shared_recording(path)
+    if workers == 1:
+        results = run_configs(*tasks[0])
+    else:
+        # Sans fork (spawn), chaque worker mappe le fichier à sa première tâche
+        with multiprocessing.Pool(workers) as pool:
+            results = [r for shard in pool.imap_unordered(_run_shard, tasks) for r in shard]
+    results.sort(key=lambda r: r[1][rank], reverse=True)
+    return results
+
+
+def write_results(results: List[Tuple[dict, dict]], path: str = SWEEP_RESULTS_FILE):
+    """Ranked results table (CSV): rank, swept parameters, report metrics."""
+    if not results:
+        return
+    params = list(results[0][0])
+    metrics = [m for m in results[0][1] if m != "strategy"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank"] + params + metrics)
+        for rank, (config, report) in enumerate(results, 1):
+            writer.writerow([rank] + [config[p] for p in params] + [report[m] for m in metrics])
+
+
+def print_report(report: BacktestReport):
+    print(f"\n[BACKTEST] {report.strategy}")
+    print(f"  Pages: {report.pages} | Annonces: {report.listings} "
+          f"({report.listings_per_second:,.0f}/s, {report.elapsed}s)")
+    print(f"  Période enregistrée: {report.recorded_seconds / 3600:.1f}h")
+    print(f"  Signaux: {report.signals} | Achats: {report.buys} | Ratés: {report.missed} "
+          f"| Sans crédits: {report.skipped_capital}")
+    print(f"  Dépensé: {report.spent:,} CR | Reventes nettes: {report.revenue:,} CR | Taxe: {report.tax:,} CR")
+    print(f"  Profit: {report.profit:+,} CR | Capital max: {report.peak_capital:,} CR | ROI: {report.roi_pct}%")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recorded market pages: info and backtest replay")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    info = sub.add_parser("info", help="Summary of a recording")
+    info.add_argument("path")
+
+    run = sub.add_parser("replay", help="Backtest a strategy on a recording")
+    run.add_argument("path")
+    run.add_argument("--strategy", choices=sorted(STRATEGIES), default="hard_sniper")
+    run.add_argument("--references", default=REFERENCE_FILE, help="Futbin prices per rating")
+    run.add_argument("--threshold", type=float, help="hard_sniper ANOMALY_THRESHOLD")
+    run.add_argument("--discount", type=float, help="futbin_feed DISCOUNT_PERCENT")
+    run.add_argument("--min-margin", type=float, help="global_scanner MIN_PROFIT_MARGIN")
+    run.add_argument("--min-profit", type=int, help="global_scanner MIN_PROFIT_ABSOLUTE")
+    run.add_argument("--max-buy", type=int, help="global_scanner MAX_BUY_PRICE")
+    run.add_argument("--sell-factor", type=float, help="global_scanner SELL_FACTOR (resale / average)")
+    run.add_argument("--bankroll", type=int, help="Credits available (default: unlimited)")
+    run.add_argument("--hold", type=float, default=HOLD_SECONDS, help="Seconds between buy and resale")
+    run.add_argument("--fill-rate", type=float, default=1.0, help="Share of buy attempts that win")
+    run.add_argument("--speed", type=float, help="Replay speed factor (default: as fast as possible)")
+    run.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    grid = sub.add_parser("sweep", help="Backtest a parameter grid on a process pool")
+    grid.add_argument("path")
+    grid.add_argument("--strategy", choices=sorted(STRATEGIES), default="global_scanner")
+    grid.add_argument("--references", default=REFERENCE_FILE, help="Futbin prices per rating")
+    grid.add_argument("--grid", action="append", required=True, metavar="NAME=VALUES",
+                      help="Strategy parameter or backtest option, e.g. min_margin=0.03:0.10:0.01 "
+                           "or sell_factor=0.93,0.95 (repeat for each dimension)")
+    grid.add_argument("--bankroll", type=int, help="Credits available (default: unlimited)")
+    grid.add_argument("--hold", type=float, default=HOLD_SECONDS, help="Seconds between buy and resale")
+    grid.add_argument("--fill-rate", type=float, default=1.0, help="Share of buy attempts that win")
+    grid.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    grid.add_argument("--rank", default="profit", help="Report metric to rank by (profit, roi_pct, buys...)")
+    grid.add_argument("--out", default=SWEEP_RESULTS_FILE, help="Ranked results table (CSV)")
+    grid.add_argument("--top", type=int, default=10, help="Rows printed")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        pages = listings = 0
+        first = last = None
+        for ts, auctions in read_pages(args.path):
+            pages += 1
+            listings += len(auctions)
+            first = ts if first is None else first
+            last = ts
+        print(f"[RECORD] {args.path}: {pages} pages, {listings} annonces")
+        if pages:
+            print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(first))} -> "
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(last))}")
+    elif args.command == "sweep":
+        references = None if args.strategy == "global_scanner" else load_reference_prices(args.references)
+        options = {"bankroll": args.bankroll, "hold_seconds": args.hold, "fill_rate": args.fill_rate}
+        grid = parse_grid(args.grid)
+        started = time.perf_counter()
+        results = sweep(args.path, args.strategy, grid, references, args.workers, options, args.rank)
+        write_results(results, args.out)
+
+        print(f"[SWEEP] {args.strategy}: {len(results)} configurations en "
+              f"{time.perf_counter() - started:.1f}s -> {args.out}")
+        for rank, (config, report) in enumerate(results[:args.top], 1):
+            params = " ".join(f"{k}={v}" for k, v in config.items())
+            print(f"  #{rank:<3} {params} | achats {report['buys']} | profit {report['profit']:+,} CR "
+                  f"| capital max {report['peak_capital']:,} CR | ROI {report['roi_pct']}%")
+    else:
+        if args.strategy == "hard_sniper":
+            params = {"threshold": args.threshold}
+        elif args.strategy == "futbin_feed":
+            params = {"discount": args.discount}
+        else:
+            params = {"min_margin": args.min_margin, "min_profit": args.min_profit,
+                      "max_buy": args.max_buy, "sell_factor": args.sell_factor}
+        references = None if args.strategy == "global_scanner" else load_reference_prices(args.references)
+        decide = make_strategy(args.strategy, references, **params)
+        report = replay(args.path, decide, name=args.strategy, speed=args.speed,
+                        bankroll=args.bankroll, hold_seconds=args.hold, fill_rate=args.fill_rate)
+        if args.json:
+            print(json.dumps(report.to_dict(), indent=2))
+        else:
+            print_report(report)
@@ -0,0 +1,513 @@
+"""Local stand-in for the EA transfer-market API (offline benchmarks).
+
+The only offline path used to be smart_worker's DRY_RUN mode, which returns
+one random item per search and never exercises the real request/response
+handling. This module serves the endpoints the bots use from a seeded
+synthetic order book:
+
+    GET  transfermarket        search (type, maskedDefId, minr/maxr, ovr_min/ovr_max,
+                               raretype/rarityIds, lev, leag, pos, minb/maxb, start, num)
+    PUT  trade/{id}/bid        buy now; 461 when sold, 478 on a bad bid, 470 without credits
+    PUT  item                  move purchased items to the trade pile
+    POST auctionhouse          list an item from the trade pile
+    GET  tradepile             own listings (active listings sell over time)
+    GET  purchased/items       unassigned items
+    GET  user/credits          coins
+    GET  user/massInfo         token validation (smart_worker)
+
+Latency is drawn per request from a configurable distribution, 429s can be
+injected every N requests or with a probability, and a share of buy-now
+bids lose the race to another buyer (461). Every bot reads its host from
+EA_BASE_URL, so a whole bot can be benchmarked end to end:
+
+    python mock_market.py --port 8765 --seed 42 --latency lognormal:40,0.4
+    EA_BASE_URL=http://127.0.0.1:8765/ut/game/fc26 python fodder_sniper.py
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+BASE_PATH = "/ut/game/fc26"
+
+# Prix de référence d'une Gold Rare par note (versions spéciales: x SPECIAL_MULTIPLIER)
+FAIR_BY_RATING = {
+    75: 400, 76: 450, 77: 500, 78: 550, 79: 600, 80: 650, 81: 700, 82: 800,
+    83: 950, 84: 1100, 85: 2800, 86: 6000, 87: 10000, 88: 15000, 89: 24000,
+    90: 38000, 91: 60000,
+}
+SPECIAL_MULTIPLIER = 3
+RAREFLAG_WEIGHTS = {0: 0.25, 1: 0.6, 3: 0.1, 12: 0.05}
+LEAGUES = (13, 16, 19, 31, 53)
+POSITIONS = ("GK", "CB", "LB", "RB", "CDM", "CM", "CAM", "LM", "RM", "LW", "RW", "ST")
+FIRST_NAMES = ("Lucas", "Mateo", "Noah", "Leo", "Adam", "Hugo", "Liam", "Ethan", "Rafael", "Yanis")
+LAST_NAMES = ("Martin", "Silva", "Müller", "Rossi", "García", "Dubois", "Kane", "Costa", "Novak", "Berg")
+LEVELS = {"bronze": (0, 64), "silver": (65, 74), "gold": (75, 99)}
+TRADEPILE_SIZE = 100
+
+
+def price_step(price: int) -> int:
+    """EA price increments."""
+    if price < 1000:
+        return 50
+    if price < 10000:
+        return 100
+    if price < 50000:
+        return 250
+    if price < 100000:
+        return 500
+    return 1000
+
+
+def round_price(price: float) -> int:
+    step = price_step(int(price))
+    return max(200, int(round(price / step)) * step)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Latency distribution in seconds from a spec (values in ms).
+
+    fixed:MS, uniform:MIN,MAX, normal:MEAN,STD, lognormal:MEDIAN,SIGMA
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        (ms,) = values
+        return lambda rng: ms / 1000
+    if kind == "uniform":
+        low, high = values
+        return lambda rng: rng.uniform(low, high) / 1000
+    if kind == "normal":
+        mean, std = values
+        return lambda rng: max(0.0, rng.gauss(mean, std)) / 1000
+    if kind == "lognormal":
+        median, sigma = values
+        mu = math.log(median)
+        return lambda rng: rng.lognormvariate(mu, sigma) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockMarket:
+    """Seeded order book plus one account (credits, purchased items, trade pile)."""
+
+    def __init__(self, seed: int = 42, players: int = 400, book_size: int = 2000,
+                 churn: int = 5, underpriced_rate: float = 0.05, sold_rate: float = 0.1,
+                 sale_rate: float = 0.05, credits: int = 200000):
+        self.rng = random.Random(seed)
+        self.lock = threading.RLock()
+        self.churn = churn
+        self.underpriced_rate = underpriced_rate
+        self.sold_rate = sold_rate      # Part des achats perdus contre un autre acheteur (461)
+        self.sale_rate = sale_rate      # Probabilité de vente d'une annonce perso par lecture
+        self.credits = credits
+        self.next_trade_id = 500_000_000_000 + seed
+        self.next_item_id = 100_000_000_000 + seed
+        self.players = [self._make_player(i) for i in range(players)]
+        self.book: Dict[int, dict] = {}
+        self.purchased: Dict[int, dict] = {}
+        self.tradepile: Dict[int, dict] = {}   # item id -> entrée de pile (annonce ou non)
+        self.counters: Dict[str, int] = {}
+        now = time.time()
+        for _ in range(book_size):
+            self._list_random(now)
+
+    # ---------- Génération ----------
+
+    def _make_player(self, index: int) -> dict:
+        rng = self.rng
+        rareflag = rng.choices(list(RAREFLAG_WEIGHTS), weights=list(RAREFLAG_WEIGHTS.values()))[0]
+        rating = rng.randint(75, 91) if rareflag <= 1 else rng.randint(82, 91)
+        asset_id = 200000 + index * 37
+        fair = FAIR_BY_RATING[rating] * (SPECIAL_MULTIPLIER if rareflag > 1 else 1)
+        if rareflag == 0:
+            fair = fair * 0.8
+        return {
+            "assetId": asset_id,
+            "resourceId": asset_id + (50331648 if rareflag > 1 else 0),
+            "rating": rating,
+            "rareflag": rareflag,
+            "leagueId": rng.choice(LEAGUES),
+            "preferredPosition": rng.choice(POSITIONS),
+            "firstName": rng.choice(FIRST_NAMES),
+            "lastName": rng.choice(LAST_NAMES),
+            "fair": fair,
+        }
+
+    def _new_item(self, player: dict) -> dict:
+        item_id = self.next_item_id
+        self.next_item_id += 1
+        item = {key: value for key, value in player.items() if key != "fair"}
+        item.update({"id": item_id, "itemType": "player", "untradeable": False, "lastSalePrice": 0})
+        return item
+
+    def _list_random(self, now: float):
+        player = self.rng.choice(self.players)
+        fair = player["fair"]
+        if self.rng.random() < self.underpriced_rate:
+            price = fair * self.rng.uniform(0.6, 0.85)
+        else:
+            price = fair * self.rng.lognormvariate(0, 0.12)
+        buy_now = round_price(price)
+        trade_id = self.next_trade_id
+        self.next_trade_id += 1
+        self.book[trade_id] = {
+            "trade_id": trade_id,
+            "item": self._new_item(player),
+            "buy_now": buy_now,
+            "starting_bid": round_price(buy_now * 0.9),
+            "expires_at": now + self.rng.uniform(10, 3600),
+        }
+
+    def count(self, name: str):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    # ---------- Endpoints ----------
+
+    @staticmethod
+    def _auction(entry: dict, now: float, state: str = "active") -> dict:
+        return {
+            "tradeId": entry["trade_id"],
+            "tradeIdStr": str(entry["trade_id"]),
+            "tradeState": state,
+            "buyNowPrice": entry["buy_now"],
+            "currentBid": 0,
+            "startingBid": entry["starting_bid"],
+            "expires": max(0, int(entry["expires_at"] - now)),
+            "offers": 0,
+            "bidState": "none",
+            "watched": False,
+            "sellerName": "FIFA UT",
+            "itemData": entry["item"],
+        }
+
+    def search(self, query: Dict[str, str]) -> dict:
+        now = time.time()
+        with self.lock:
+            for trade_id in [t for t, e in self.book.items() if e["expires_at"] <= now]:
+                del self.book[trade_id]
+            for _ in range(self.churn):
+                self._list_random(now)
+
+            level = LEVELS.get(query.get("lev", "").lower(), (0, 99))
+            min_rating = max(level[0], int(query.get("minr") or query.get("ovr_min") or 0))
+            max_rating = min(level[1], int(query.get("maxr") or query.get("ovr_max") or 99))
+            rareflag = query.get("raretype") or query.get("rarityIds")
+            positions = {p for p in query.get("pos", "").upper().split(",") if p}
+            masked = int(query["maskedDefId"]) if query.get("maskedDefId") else None
+            league = int(query["leag"]) if query.get("leag") else None
+            min_price = int(query.get("minb") or 0)
+            max_price = int(query.get("maxb") or 0) or math.inf
+            start = int(query.get("start") or 0)
+            num = int(query.get("num") or 21)
+
+            matches = []
+            for entry in self.book.values():
+                item = entry["item"]
+                if masked is not None and item["assetId"] != masked:
+                    continue
+                if not min_rating <= item["rating"] <= max_rating:
+                    continue
+                if rareflag not in (None, "") and item["rareflag"] != int(rareflag):
+                    continue
+                if league is not None and item["leagueId"] != league:
+                    continue
+                if positions and item["preferredPosition"] not in positions:
+                    continue
+                if not min_price <= entry["buy_now"] <= max_price:
+                    continue
+                matches.append(entry)
+            matches.sort(key=lambda e: e["expires_at"])
+            page = matches[start:start + num]
+            return {"auctionInfo": [self._auction(e, now) for e in page]}
+
+    def bid(self, trade_id: int, amount: int):
+        now = time.time()
+        with self.lock:
+            entry = self.book.get(trade_id)
+            if entry is None or entry["expires_at"] <= now:
+                self.count("bid_gone")
+                return 461, {"code": 461, "reason": "Permission Denied"}
+            if amount != entry["buy_now"]:
+                self.count("bid_invalid")
+                return 478, {"code": 478, "reason": "Bad Request"}
+            if amount > self.credits:
+                self.count("bid_no_credits")
+                return 470, {"code": 470, "reason": "Not enough credit"}
+            if self.rng.random() < self.sold_rate:
+                # Un autre acheteur a été plus rapide
+                del self.book[trade_id]
+                self.count("bid_lost")
+                return 461, {"code": 461, "reason": "Permission Denied"}
+            del self.book[trade_id]
+            self.credits -= amount
+            self.purchased[entry["item"]["id"]] = entry["item"]
+            self.count("bid_won")
+            return 200, {"credits": self.credits, "auctionInfo": [self._auction(entry, now, "closed")]}
+
+    def move_items(self, body: dict):
+        with self.lock:
+            moved = []
+            for request in body.get("itemData", []):
+                item = self.purchased.get(request.get("id"))
+                if item is None or request.get("pile") != "trade" or len(self.tradepile) >= TRADEPILE_SIZE:
+                    moved.append({"id": request.get("id"), "success": False, "reason": "Destination Full"})
+                    continue
+                del self.purchased[item["id"]]
+                self.tradepile[item["id"]] = {"item": item, "listing": None}
+                moved.append({"id": item["id"], "pile": "trade", "success": True})
+            return 200, {"itemData": moved}
+
+    def list_item(self, body: dict):
+        item_id = (body.get("itemData") or {}).get("id")
+        buy_now = int(body.get("buyNowPrice") or 0)
+        starting_bid = int(body.get("startingBid") or 0)
+        with self.lock:
+            pile_entry = self.tradepile.get(item_id)
+            if pile_entry is None or (pile_entry["listing"] and pile_entry["listing"]["state"] == "active"):
+                return 478, {"code": 478, "reason": "Bad Request"}
+            if not 0 < starting_bid < buy_now:
+                return 478, {"code": 478, "reason": "Bad Request"}
+            trade_id = self.next_trade_id
+            self.next_trade_id += 1
+            pile_entry["listing"] = {
+                "trade_id": trade_id,
+                "item": pile_entry["item"],
+                "buy_now": buy_now,
+                "starting_bid": starting_bid,
+                "expires_at": time.time() + int(body.get("duration") or 3600),
+                "state": "active",
+            }
+            self.count("listed")
+            return 200, {"id": trade_id, "idStr": str(trade_id)}
+
+    def get_tradepile(self):
+        now = time.time()
+        with self.lock:
+            auctions = []
+            for item_id, pile_entry in list(self.tradepile.items()):
+                listing = pile_entry["listing"]
+                if listing is None:
+                    auctions.append({"tradeId": 0, "tradeState": None, "buyNowPrice": 0, "currentBid": 0,
+                                     "startingBid": 0, "expires": 0, "itemData": pile_entry["item"]})
+                    continue
+                if listing["state"] == "active":
+                    if self.rng.random() < self.sale_rate:
+                        listing["state"] = "closed"
+                        self.credits += int(listing["buy_now"] * 0.95)
+                        self.count("sold")
+                    elif listing["expires_at"] <= now:
+                        listing["state"] = "expired"
+                auctions.append(self._auction(listing, now, listing["state"]))
+                if listing["state"] == "closed":
+                    # Vente affichée une fois puis retirée (pas de "clear sold" à simuler)
+                    del self.tradepile[item_id]
+            return 200, {"auctionInfo": auctions, "credits": self.credits}
+
+    def get_purchased(self):
+        with self.lock:
+            return 200, {"itemData": list(self.purchased.values())}
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "book": len(self.book),
+                "credits": self.credits,
+                "purchased": len(self.purchased),
+                "tradepile": len(self.tradepile),
+                "counters": dict(self.counters),
+            }
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, market: MockMarket, latency: Optional[Callable] = None,
+                 bid_latency: Optional[Callable] = None, rate_limit_every: int = 0,
+                 rate_limit_rate: float = 0.0, token: Optional[str] = None,
+                 token_ttl: float = 0.0, quiet: bool = True):
+        super().__init__(address, MockHandler)
+        self.market = market
+        self.latency = latency
+        self.bid_latency = bid_latency or latency
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_rate = rate_limit_rate
+        self.token = token                # None: tout X-UT-SID non vide est accepté
+        self.token_expires = time.time() + token_ttl if token_ttl else None
+        self.quiet = quiet
+        self.requests = 0
+        self.latency_rng = random.Random(market.rng.random())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH}"
+
+    def start(self) -> str:
+        """Serves in a background thread; returns the base URL for EA_BASE_URL."""
+        self.thread = threading.Thread(target=self.serve_forever, name="mock-market", daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def delay(self, bid: bool) -> float:
+        distribution = self.bid_latency if bid else self.latency
+        if distribution is None:
+            return 0.0
+        with self.market.lock:
+            return distribution(self.latency_rng)
+
+    def throttled(self) -> bool:
+        with self.market.lock:
+            self.requests += 1
+            if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+                return True
+            return bool(self.rate_limit_rate) and self.latency_rng.random() < self.rate_limit_rate
+
+
+_BID_PATH = re.compile(r"^trade/(\d+)/bid$")
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server: MockServer
+    protocol_version = "HTTP/1.1"   # Keep-alive, comme l'API réelle
+    # En-têtes + corps envoyés en un seul segment (sinon ACK retardé: +40ms par requête)
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def send_json(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def dispatch(self, method: str):
+        server, market = self.server, self.server.market
+        url = urlsplit(self.path)
+        body = self.read_body() if method != "GET" else {}
+
+        if url.path == "/_mock/stats":
+            return self.send_json(200, market.stats())
+
+        endpoint = url.path[len(BASE_PATH):] if url.path.startswith(BASE_PATH) else url.path
+        endpoint = endpoint.strip("/")
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        method = self.headers.get("X-HTTP-Method-Override", method).upper()
+        bid = _BID_PATH.match(endpoint)
+
+        time.sleep(server.delay(bid is not None))
+        market.count(f"{method} {'trade/{id}/bid' if bid else endpoint}")
+
+        sid = self.headers.get("X-UT-SID")
+        if not sid or (server.token and sid != server.token) or (
+                server.token_expires and time.time() > server.token_expires):
+            return self.send_json(401, {"code": 401, "reason": "expired session"})
+        if server.throttled():
+            market.count("rate_limited")
+            return self.send_json(429, {"code": 429, "reason": "Too many requests"})
+
+        if method == "GET" and endpoint == "transfermarket":
+            return self.send_json(200, market.search(query))
+        if method == "PUT" and bid:
+            return self.send_json(*market.bid(int(bid.group(1)), int(body.get("bid") or 0)))
+        if method == "PUT" and endpoint == "item":
+            return self.send_json(*market.move_items(body))
+        if method == "POST" and endpoint == "auctionhouse":
+            return self.send_json(*market.list_item(body))
+        if method == "GET" and endpoint == "tradepile":
+            return self.send_json(*market.get_tradepile())
+        if method == "GET" and endpoint == "purchased/items":
+            return self.send_json(*market.get_purchased())
+        if method == "GET" and endpoint == "user/credits":
+            return self.send_json(200, {"credits": market.credits})
+        if method == "GET" and endpoint == "user/massInfo":
+            return self.send_json(200, {"userInfo": {"credits": market.credits, "personaName": "mock"}})
+        return self.send_json(404, {"code": 404, "reason": f"Unknown endpoint {method} {endpoint}"})
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, seed: int = 42, latency: Optional[str] = None,
+          bid_latency: Optional[str] = None, **options) -> MockServer:
+    """Starts a mock market in a background thread (port 0 picks a free port)."""
+    market_options = {k: options.pop(k) for k in list(options)
+                      if k in ("players", "book_size", "churn", "underpriced_rate",
+                               "sold_rate", "sale_rate", "credits")}
+    server = MockServer(
+        (host, port),
+        MockMarket(seed=seed, **market_options),
+        latency=parse_latency(latency) if latency else None,
+        bid_latency=parse_latency(bid_latency) if bid_latency else None,
+        **options,
+    )
+    server.start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local mock of the EA transfer market")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", help="fixed:MS | uniform:MIN,MAX | normal:MEAN,STD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--bid-latency", help="Distribution for trade/{id}/bid (defaults to --latency)")
+    parser.add_argument("--book-size", type=int, default=2000)
+    parser.add_argument("--churn", type=int, default=5, help="New listings per search")
+    parser.add_argument("--underpriced-rate", type=float, default=0.05)
+    parser.add_argument("--sold-rate", type=float, default=0.1, help="Share of bids lost to another buyer (461)")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer 429 every N requests")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Answer 429 with this probability")
+    parser.add_argument("--token", help="Only accept this X-UT-SID")
+    parser.add_argument("--token-ttl", type=float, default=0.0, help="Answer 401 after N seconds")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    mock = serve(
+        args.host, args.port, args.seed, args.latency, args.bid_latency,
+        book_size=args.book_size, churn=args.churn, underpriced_rate=args.underpriced_rate,
+        sold_rate=args.sold_rate, rate_limit_every=args.rate_limit_every,
+        rate_limit_rate=args.rate_limit_rate, token=args.token, token_ttl=args.token_ttl,
+        quiet=not args.verbose,
+    )
+    print(f"[MOCK] Marché simulé prêt: EA_BASE_URL={mock.base_url}")
+    print(f"[MOCK] Stats: http://{args.host}:{mock.server_address[1]}/_mock/stats")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+        print("\n[STOP] Marché simulé arrêté")
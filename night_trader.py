@@ -3,17 +3,18 @@ NIGHT TRADER - Bot Achat/Vente Multi-Notes
 Scanne les notes 83-86, achète <= Futbin, revend au prix Futbin
 """
 
-import requests
 import json
 import time
 import random
 from datetime import datetime
 
+from ea_client import OK, TOKEN_EXPIRED, classify, decode_auctions, get_client, load_session
+from records import Opportunity, TradeResult
+
 # Config
 SESSION_FILE = "active_session.json"
 TARGETS_FILE = "fodder_targets.json"
 LOG_FILE = "night_trader_log.json"
-EA_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
 
 # Timing anti-ban (plus agressif)
 SCAN_DELAY_MIN = 4.0
@@ -27,8 +28,8 @@ MAX_BUYS_PER_HOUR = 25
 
 class NightTrader:
     def __init__(self):
-        with open(SESSION_FILE) as f:
-            self.session = json.load(f)
+        self.session = load_session(SESSION_FILE)
+        self.client = get_client(self.session)
         with open(TARGETS_FILE) as f:
             self.config = json.load(f)
         
@@ -40,23 +41,7 @@ class NightTrader:
         self.log = []
     
     def api(self, method, endpoint, params=None, data=None):
-        url = f"{EA_URL}/{endpoint}"
-        headers = {
-            "X-UT-SID": self.session['x-ut-sid'],
-            "User-Agent": self.session.get('user_agent', 'Mozilla/5.0'),
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
-        try:
-            if method == "GET":
-                return requests.get(url, params=params, headers=headers, timeout=15)
-            elif method == "PUT":
-                return requests.put(url, json=data, headers=headers, timeout=15)
-            elif method == "POST":
-                return requests.post(url, json=data, headers=headers, timeout=15)
-        except Exception as e:
-            print(f"[!] Erreur: {e}")
-            return None
+        return self.client.request(method, endpoint, params=params, data=data, timeout=15)
     
     def check_limits(self):
         now = time.time()
@@ -84,43 +69,52 @@ class NightTrader:
         }
         
         resp = self.api("GET", "transfermarket", params=params)
-        if not resp or resp.status_code != 200:
-            if resp and resp.status_code == 401:
-                return None  # Token expiré
+        status = classify(resp)
+        if status == TOKEN_EXPIRED:
+            return None  # Token expiré
+        if status != OK:
             return []
         
-        auctions = resp.json().get('auctionInfo', [])
+        try:
+            auctions = decode_auctions(resp)
+        except ValueError:  # 200 non JSON (page Cloudflare / maintenance)
+            return []
         
         # Filtrer Gold Rare + bonne note
         opps = []
         for a in auctions:
-            item = a.get('itemData', {})
-            if item.get('rareflag') == 1 and item.get('rating') == rating:
-                opps.append({
-                    'trade_id': a['tradeId'],
-                    'item_id': item.get('id'),
-                    'name': item.get('lastName', '?'),
-                    'rating': rating,
-                    'price': a['buyNowPrice'],
-                    'sell_price': target['sell_price']
-                })
+            if a.rareflag == 1 and a.rating == rating:
+                opps.append(Opportunity(
+                    trade_id=a.trade_id,
+                    buy_now=a.buy_now,
+                    sell_price=target['sell_price'],
+                    profit=int(target['sell_price'] * 0.95 - a.buy_now),
+                    name=a.last_name or '?',
+                    rating=rating,
+                    asset_id=a.asset_id,
+                    item_id=a.item_id,
+                    expires=a.expires,
+                    source='night_trader',
+                ))
         
         return opps
     
     def buy(self, opp):
         """Achète une carte"""
-        resp = self.api("PUT", f"trade/{opp['trade_id']}/bid", data={"bid": opp['price']})
-        if resp and resp.status_code == 200:
-            return True
-        return False
+        resp = self.api("PUT", f"trade/{opp.trade_id}/bid", data={"bid": opp.buy_now})
+        status = classify(resp)
+        return TradeResult(status == OK, status, opp.trade_id, opp.buy_now)
     
     def sell_unassigned(self, sell_price):
         """Liste les cartes non assignées"""
         resp = self.api("GET", "purchased/items")
-        if not resp or resp.status_code != 200:
+        if classify(resp) != OK:
             return 0
         
-        items = resp.json().get('itemData', [])
+        try:
+            items = resp.json().get('itemData', [])
+        except ValueError:
+            return 0
         count = 0
         
         for item in items:
@@ -141,7 +135,7 @@ class NightTrader:
                 "buyNowPrice": sell_price
             })
             
-            if resp and resp.status_code == 200:
+            if classify(resp) == OK:
                 count += 1
             
             time.sleep(random.uniform(2, 4))
@@ -181,8 +175,8 @@ class NightTrader:
                 print(f"\n[{now}] Note {rating}: {len(opps)} trouvé(s)!")
                 
                 # Acheter le moins cher
-                opp = min(opps, key=lambda x: x['price'])
-                print(f"  -> {opp['name']} @ {opp['price']} CR")
+                opp = min(opps, key=lambda x: x.buy_now)
+                print(f"  -> {opp.name} @ {opp.buy_now} CR")
                 
                 if self.buy(opp):
                     print(f"  [OK] ACHETE!")
@@ -194,9 +188,9 @@ class NightTrader:
                     print(f"  Pause {pause:.0f}s puis revente...")
                     time.sleep(pause)
                     
-                    listed = self.sell_unassigned(opp['sell_price'])
+                    listed = self.sell_unassigned(opp.sell_price)
                     if listed:
-                        print(f"  [OK] {listed} carte(s) en vente @ {opp['sell_price']} CR")
+                        print(f"  [OK] {listed} carte(s) en vente @ {opp.sell_price} CR")
                         self.listed += listed
                 else:
                     print(f"  [X] Echec (deja vendue?)")
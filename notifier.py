@@ -0,0 +1,267 @@
+"""Non-blocking Discord notifications with periodic digests.
+
+hard_sniper, turbo_sniper and volume_trader used to POST every webhook
+inline in their main loop (up to 5s per snipe when Discord is slow or rate
+limited), and discord_bot awaited channel.send for each event. notify() now
+only appends the event to a bounded in-memory queue; one background thread
+per destination wakes every DIGEST_INTERVAL seconds and ships what is
+pending:
+
+- a lone event keeps its own message (embed with title/fields, or text)
+- several events are folded into digest embeds, one line per event
+- X-RateLimit-Remaining / X-RateLimit-Reset-After are honoured before the
+  next send, and a 429 keeps the message and retries after retry_after
+
+urgent=True (token expiré, arrêt) wakes the thread immediately instead of
+waiting for the next digest. When the queue is full new events are dropped
+and counted instead of slowing the caller down. Pending events get
+DRAIN_TIMEOUT seconds to go out at process exit.
+"""
+
+import abc
+import atexit
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+DIGEST_INTERVAL = float(os.environ.get("NOTIFY_DIGEST_SECONDS", 5))
+MAX_QUEUE = int(os.environ.get("NOTIFY_MAX_QUEUE", 500))
+SEND_TIMEOUT = 5.0
+MAX_RETRIES = 3
+DRAIN_TIMEOUT = 10.0
+
+# Limites Discord (caractères)
+CONTENT_LIMIT = 2000
+DESCRIPTION_LIMIT = 4096
+LINE_LIMIT = 400  # Une ligne de résumé par événement
+
+# Couleurs d'embed
+SUCCESS = 0x00ff00
+ERROR = 0xff0000
+WARNING = 0xf1c40f
+INFO = 0x3498db
+
+Event = namedtuple("Event", ["ts", "title", "description", "color", "fields", "urgent"])
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _clock(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%H:%M:%S")
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def render_line(event: Event) -> str:
+    """One digest line: time, title, description and fields on a single line."""
+    parts = [f"**{event.title}**"] if event.title else []
+    if event.description:
+        parts.append(" · ".join(line for line in event.description.splitlines() if line.strip()))
+    for field in event.fields or ():
+        parts.append(f"{field['name']} {field['value']}")
+    return _truncate(f"`{_clock(event.ts)}` " + " · ".join(parts), LINE_LIMIT)
+
+
+def build_payloads(events: List[Event], footer: str) -> List[dict]:
+    """Webhook/channel payloads for a batch of events (one per message)."""
+    if len(events) == 1:
+        event = events[0]
+        if not event.title:
+            return [{"content": _truncate(f"[{_clock(event.ts)}] {event.description}", CONTENT_LIMIT)}]
+        embed = {
+            "title": event.title,
+            "description": _truncate(event.description, DESCRIPTION_LIMIT),
+            "color": event.color,
+            "timestamp": _iso(event.ts),
+            "footer": {"text": footer},
+        }
+        if event.fields:
+            embed["fields"] = event.fields
+        return [embed_payload(embed)]
+
+    # Plusieurs événements: résumés, découpés à la limite de description
+    chunks, chunk, size = [], [], 0
+    for event in events:
+        line = render_line(event)
+        if chunk and size + len(line) + 1 > DESCRIPTION_LIMIT:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append((event, line))
+        size += len(line) + 1
+    chunks.append(chunk)
+
+    payloads = []
+    for chunk in chunks:
+        urgent = [event for event, _ in chunk if event.urgent]
+        color = (urgent[0] if urgent else chunk[-1][0]).color
+        first, last = chunk[0][0].ts, chunk[-1][0].ts
+        payloads.append(embed_payload({
+            "title": f"📋 {len(chunk)} notifications ({_clock(first)} → {_clock(last)})",
+            "description": "\n".join(line for _, line in chunk),
+            "color": color,
+            "timestamp": _iso(last),
+            "footer": {"text": footer},
+        }, events=len(chunk)))
+    return payloads
+
+
+def embed_payload(embed: dict, events: int = 1) -> dict:
+    # "_events" sert au comptage, retiré avant l'envoi
+    return {"embeds": [embed], "_events": events}
+
+
+class Notifier(abc.ABC):
+    """Queue + background sender; subclasses implement deliver()."""
+
+    def __init__(self, footer: str = "FC Bot", digest_interval: float = DIGEST_INTERVAL,
+                 max_queue: int = MAX_QUEUE, drain_timeout: float = DRAIN_TIMEOUT):
+        self.footer = footer
+        self.digest_interval = digest_interval
+        self.max_queue = max_queue
+        self.drain_timeout = drain_timeout
+        self.queue = deque()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.ready_at = 0.0      # Pas d'envoi avant (monotonic), fixé par les rate limits
+        self.sent = 0            # Événements livrés
+        self.messages = 0        # Messages Discord envoyés
+        self.dropped = 0         # File pleine
+        self.failed = 0          # Abandonnés après erreur ou trop de 429
+        self.rate_limited = 0    # Réponses 429
+        self.thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self.thread.start()
+
+    def notify(self, title: Optional[str] = None, description: str = "", color: int = INFO,
+               fields: Optional[list] = None, urgent: bool = False):
+        """Queues one event; never blocks (drops when the queue is full)."""
+        if self.stopping or len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self.queue.append(Event(time.time(), title, description, color, fields, urgent))
+        if urgent:
+            self.wakeup.set()
+
+    @abc.abstractmethod
+    def deliver(self, payload: dict) -> Tuple[bool, float]:
+        """Sends one message; returns (delivered, seconds to wait before the next send).
+
+        Not delivered with a wait > 0 means rate limited: the message is retried.
+        """
+
+    def _drain(self) -> List[Event]:
+        events = []
+        try:
+            while True:
+                events.append(self.queue.popleft())
+        except IndexError:
+            pass
+        return events
+
+    def _send(self, payload: dict, deadline: Optional[float] = None):
+        count = payload.pop("_events", 1)
+        for _ in range(MAX_RETRIES + 1):
+            delay = self.ready_at - time.monotonic()
+            if delay > 0:
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    break
+                time.sleep(delay)
+            try:
+                delivered, wait = self.deliver(payload)
+            except Exception as e:
+                print(f"[NOTIF] Erreur envoi: {e}")
+                delivered, wait = False, 0.0
+            if wait > 0:
+                self.ready_at = time.monotonic() + wait
+            if delivered:
+                self.sent += count
+                self.messages += 1
+                return
+            if wait <= 0:
+                break  # Erreur définitive: pas de nouvel essai
+            self.rate_limited += 1
+        self.failed += count
+
+    def _flush(self, deadline: Optional[float] = None):
+        events = self._drain()
+        if events:
+            for payload in build_payloads(events, self.footer):
+                self._send(payload, deadline)
+
+    def _run(self):
+        while not self.stopping:
+            self.wakeup.wait(self.digest_interval)
+            self.wakeup.clear()
+            self._flush()
+        # Arrêt: dernier envoi borné de ce qui reste en file
+        self._flush(deadline=time.monotonic() + self.drain_timeout)
+
+    def close(self):
+        self.stopping = True
+        self.wakeup.set()
+        self.thread.join(timeout=self.drain_timeout + SEND_TIMEOUT)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "messages": self.messages,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+        }
+
+
+class WebhookNotifier(Notifier):
+    """Discord webhook destination (pooled requests.Session)."""
+
+    def __init__(self, url: str, **kwargs):
+        self.url = url
+        self.http = requests.Session()
+        super().__init__(**kwargs)
+
+    def deliver(self, payload: dict) -> Tuple[bool, float]:
+        try:
+            resp = self.http.post(self.url, json=payload, timeout=SEND_TIMEOUT)
+        except requests.exceptions.RequestException:
+            return False, 0.0
+
+        wait = 0.0
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            wait = float(resp.headers.get("X-RateLimit-Reset-After") or 1)
+        if resp.status_code == 429:
+            try:
+                retry_after = float(resp.json()["retry_after"])
+            except (ValueError, KeyError, TypeError):
+                retry_after = float(resp.headers.get("Retry-After") or 1)
+            return False, max(wait, retry_after, 0.1)
+        return resp.status_code < 400, wait
+
+    def close(self):
+        super().close()
+        self.http.close()
+
+
+_notifiers: Dict[str, WebhookNotifier] = {}
+_notifiers_lock = threading.Lock()
+
+
+def get_notifier(url: str, footer: str = "FC Bot") -> WebhookNotifier:
+    """Process-wide notifier for this webhook (one sender thread, drained at exit)."""
+    notifier = _notifiers.get(url)
+    if notifier is None:
+        with _notifiers_lock:
+            notifier = _notifiers.get(url)
+            if notifier is None:
+                notifier = WebhookNotifier(url, footer=footer)
+                _notifiers[url] = notifier
+                atexit.register(notifier.close)
+    return notifier
@@ -0,0 +1,88 @@
+"""Column view of auctionInfo pages and per-version reference prices (NumPy).
+
+GlobalScanner.analyze_listing used to score one listing at a time: three
+PriceTracker calls (average, lowest seen, sample count) and a players-DB
+lookup per auction. A scan now hands all its pages over at once:
+
+- AuctionColumns turns ea_client.Auction records into int64 columns
+  (tradeId, buyNow, assetId, rareflag, rating, expires) in one pass
+- ReferenceTable holds average / lowest / sample count per card version,
+  sorted by a packed (assetId, rareflag) key
+- ReferenceTable.join() aligns it with the columns through searchsorted, so
+  profit, margin and confidence are computed as array expressions by the
+  scanner; only the winning rows go back to Python dicts
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from ea_client import Auction
+
+KEY_SHIFT = 16                 # rareflag sur les 16 bits de poids faible
+KEY_MASK = (1 << KEY_SHIFT) - 1
+
+_FIELDS = ("trade_id", "buy_now", "asset_id", "rareflag", "rating", "expires")
+
+
+def pack_keys(asset_ids: np.ndarray, rareflags: np.ndarray) -> np.ndarray:
+    """One int64 key per card version (same split as PriceTracker.make_key)."""
+    return (asset_ids.astype(np.int64) << KEY_SHIFT) | (rareflags.astype(np.int64) & KEY_MASK)
+
+
+def unpack_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return keys >> KEY_SHIFT, keys & KEY_MASK
+
+
+class AuctionColumns:
+    """Auction records as parallel int64 arrays (missing values are 0)."""
+
+    __slots__ = ("auctions",) + _FIELDS
+
+    def __init__(self, auctions: List[Auction]):
+        self.auctions = auctions
+        rows = [
+            (a.trade_id or 0, a.buy_now, a.asset_id, a.rareflag, a.rating, a.expires)
+            for a in auctions
+        ]
+        table = np.array(rows, dtype=np.int64).reshape(len(rows), len(_FIELDS))
+        for name, column in zip(_FIELDS, table.T):
+            setattr(self, name, column)
+
+    def __len__(self):
+        return len(self.auctions)
+
+    def keys(self) -> np.ndarray:
+        return pack_keys(self.asset_id, self.rareflag)
+
+
+class ReferenceTable:
+    """Reference prices per card version, joinable against AuctionColumns."""
+
+    __slots__ = ("keys", "average", "lowest", "samples")
+
+    def __init__(self, keys: Iterable[int], average: Iterable[int],
+                 lowest: Iterable[int], samples: Iterable[int]):
+        keys = np.asarray(keys, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        # Ligne sentinelle à zéro en fin de tableau: l'index -1 = version inconnue
+        self.average = np.append(np.asarray(average, dtype=np.float64)[order], 0.0)
+        self.lowest = np.append(np.asarray(lowest, dtype=np.int64)[order], 0)
+        self.samples = np.append(np.asarray(samples, dtype=np.int64)[order], 0)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rows(self, keys: np.ndarray) -> np.ndarray:
+        """Row of each key in the table, -1 when the version is unknown."""
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.searchsorted(self.keys, keys)
+        pos = np.minimum(pos, len(self.keys) - 1)
+        return np.where(self.keys[pos] == keys, pos, -1)
+
+    def join(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(average, lowest, samples) aligned with keys; zeros for unknown versions."""
+        rows = self.rows(keys)
+        return self.average[rows], self.lowest[rows], self.samples[rows]
@@ -0,0 +1,197 @@
+"""Process-wide indexed view of the EA players database.
+
+players_loader used to re-read and re-parse clean_players.json on every
+find_players() call and scan every key linearly, and GlobalScanner built its
+own id map on top. PlayerIndex is built once (by fetch_and_process, or lazily
+on first use) and shared by everything running in the process:
+
+- O(1) lookup by maskedDefId / resourceId / baseId (O(log n) bisect over the
+  mmap'd clean_players.bin when the index is backed by the binary table)
+- trigram inverted index over normalized names for substring and fuzzy search,
+  built on the first search
+"""
+
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+import player_table
+import players_loader
+
+NGRAM = 3
+FUZZY_MIN_SCORE = 0.4  # Part minimale des trigrammes de la requête
+MASKED_DEF_ID, RESOURCE_ID, BASE_ID = 0, 1, 2  # Sections de player_table
+
+
+def _grams(text: str) -> List[str]:
+    return [text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)]
+
+
+def _rating(entry: dict) -> int:
+    rating = entry.get("rating")
+    return rating if isinstance(rating, int) else 0
+
+
+class PlayerIndex:
+    """Index over a clean_players dict already in memory."""
+
+    def __init__(self, db: Dict[str, List[dict]]):
+        self.db = db
+        self.by_masked_def_id: Dict[int, dict] = {}
+        self.by_resource_id: Dict[int, dict] = {}
+        self.by_base_id: Dict[int, List[dict]] = {}
+        self._keys: Optional[List[str]] = None
+        self._postings: Optional[Dict[str, List[int]]] = None
+
+        for entries in db.values():
+            for entry in entries:
+                if entry.get("maskedDefId") is not None:
+                    self.by_masked_def_id.setdefault(entry["maskedDefId"], entry)
+                if entry.get("resourceId") is not None:
+                    self.by_resource_id.setdefault(entry["resourceId"], entry)
+                if entry.get("baseId") is not None:
+                    self.by_base_id.setdefault(entry["baseId"], []).append(entry)
+
+        print(f"[INDEX] {len(self)} cartes indexées ({len(db)} noms)")
+
+    def __len__(self) -> int:
+        return len(self.by_resource_id)
+
+    def get(self, player_id) -> Optional[dict]:
+        """Card for a resourceId, maskedDefId or baseId (best rated version)."""
+        entry = self.by_resource_id.get(player_id) or self.by_masked_def_id.get(player_id)
+        if entry is None:
+            versions = self.versions(player_id)
+            entry = max(versions, key=_rating) if versions else None
+        return entry
+
+    def versions(self, base_id) -> List[dict]:
+        """Every card (gold, IF, TOTW, ...) sharing this baseId."""
+        return self.by_base_id.get(base_id, [])
+
+    def keys(self) -> List[str]:
+        return list(self.db)
+
+    def entries(self, key: str) -> List[dict]:
+        return self.db.get(key, [])
+
+    def _build_postings(self):
+        # Les trigrammes ne sont construits qu'à la première recherche
+        self._keys = self.keys()
+        postings: Dict[str, List[int]] = {}
+        for key_id, key in enumerate(self._keys):
+            # Clé encadrée d'espaces pour indexer aussi les débuts/fins de mots
+            for gram in set(_grams(f" {key} ")):
+                postings.setdefault(gram, []).append(key_id)
+        self._postings = postings
+
+    def search(self, query: str, limit: int = 5) -> List[dict]:
+        """Substring matches first (by rating), then fuzzy trigram matches."""
+        key = players_loader.normalize_name(query)
+        if not key:
+            return []
+        if self._postings is None:
+            self._build_postings()
+
+        grams = set(_grams(key))
+        if not grams:
+            # Requête trop courte pour les trigrammes: scan direct
+            exact = [k for k in self._keys if key in k]
+            return self._entries(exact)[:limit]
+
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+
+        exact, fuzzy = [], []
+        for key_id, hits in counts.items():
+            candidate = self._keys[key_id]
+            if hits == len(grams) and key in candidate:
+                exact.append(candidate)
+            else:
+                score = hits / len(grams)
+                if score >= FUZZY_MIN_SCORE:
+                    fuzzy.append((score, candidate))
+
+        matches = self._entries(exact)
+        if len(matches) < limit and fuzzy:
+            fuzzy.sort(key=lambda x: x[0], reverse=True)
+            for _, candidate in fuzzy:
+                matches.extend(sorted(self.entries(candidate), key=_rating, reverse=True))
+                if len(matches) >= limit:
+                    break
+        return matches[:limit]
+
+    def _entries(self, keys: List[str]) -> List[dict]:
+        matches: List[dict] = []
+        for k in keys:
+            matches.extend(self.entries(k))
+        matches.sort(key=_rating, reverse=True)
+        return matches
+
+
+class TablePlayerIndex(PlayerIndex):
+    """Same interface backed by the mmap'd clean_players.bin (no JSON parse)."""
+
+    def __init__(self, table: player_table.PlayerTable):
+        self.table = table
+        self._keys = None
+        self._postings = None
+        print(f"[INDEX] {len(table)} cartes (table binaire {table.path})")
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def get(self, player_id) -> Optional[dict]:
+        for section in (RESOURCE_ID, MASKED_DEF_ID, BASE_ID):
+            rows = self.table.find(section, player_id)
+            if rows:
+                return rows[0]
+        return None
+
+    def versions(self, base_id) -> List[dict]:
+        return self.table.find(BASE_ID, base_id)
+
+    def keys(self) -> List[str]:
+        return self.table.keys()
+
+    def entries(self, key: str) -> List[dict]:
+        return self.table.entries(key)
+
+
+_index: Optional[PlayerIndex] = None
+_index_lock = threading.Lock()
+
+
+def set_index(index: PlayerIndex):
+    global _index
+    _index = index
+
+
+def _table_is_fresh() -> bool:
+    if not os.path.exists(players_loader.OUTPUT_BIN):
+        return False
+    if not os.path.exists(players_loader.OUTPUT_DB):
+        return True
+    return os.path.getmtime(players_loader.OUTPUT_BIN) >= os.path.getmtime(players_loader.OUTPUT_DB)
+
+
+def get_index() -> PlayerIndex:
+    """Shared index for this process, loaded on first use.
+
+    Prefers the binary table; a clean_players.json without (or newer than)
+    its table is converted once so the next cold start skips the parse.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None and not _table_is_fresh():
+                db = players_loader.load_db()
+                # load_db() peut avoir déclenché fetch_and_process (index déjà posé)
+                if _index is None:
+                    player_table.write_table(db, players_loader.OUTPUT_BIN)
+                    _index = PlayerIndex(db)
+            if _index is None:
+                _index = TablePlayerIndex(player_table.PlayerTable(players_loader.OUTPUT_BIN))
+    return _index
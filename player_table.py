@@ -0,0 +1,175 @@
+"""Fixed-width memory-mapped players table (clean_players.bin).
+
+Loading clean_players.json means parsing tens of thousands of cards into a
+dict-of-lists-of-dicts in every process. players_loader also writes this
+binary table; readers mmap it and decode a row only when it is asked for,
+so opening it costs a few page faults instead of a full parse.
+
+File layout (little-endian, every section 4-byte aligned):
+    header   : b"FCPLAYR1" | rows:u32 | masked:u32 | resource:u32 | base:u32
+               | heap_size:u32 | reserved:u32
+    rows     : rows x ROW (ids, rating, position code, name/key heap refs),
+               sorted by normalized key then rating desc
+    id maps  : for maskedDefId, resourceId, baseId: ids[n]:u32 then row[n]:u32,
+               sorted by id (bisect on the mmap)
+    heap     : utf-8 names and normalized keys
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+FILE_MAGIC = b"FCPLAYR1"
+HEADER = struct.Struct("<8sIIIIII")
+# maskedDefId, resourceId, baseId, rating, position, name_off, key_off, name_len, key_len
+ROW = struct.Struct("<IIIBBxxIIHH")
+
+POSITIONS = ["", "GK", "RB", "RWB", "CB", "LB", "LWB", "CDM", "CM", "CAM",
+             "RM", "LM", "RW", "LW", "CF", "ST"]
+_POSITION_CODES = {p: i for i, p in enumerate(POSITIONS)}
+
+
+def _as_u32(value) -> int:
+    """Ids/ratings that are not plain integers are stored as 0 (missing)."""
+    return value if isinstance(value, int) and 0 < value < 2 ** 32 else 0
+
+
+def _position_code(position) -> int:
+    if not position:
+        return 0
+    # Dump CSV: "ST, LW" -> poste principal
+    return _POSITION_CODES.get(str(position).split(",")[0].strip().upper(), 0)
+
+
+def write_table(db: Dict[str, List[dict]], path: str):
+    """Writes the binary table for a clean_players dict (atomic replace)."""
+    heap = bytearray()
+    heap_offsets: Dict[str, int] = {}
+
+    def intern(text: str) -> Tuple[int, int]:
+        offset = heap_offsets.get(text)
+        data = text.encode("utf-8")[:0xFFFF]
+        if offset is None:
+            offset = heap_offsets[text] = len(heap)
+            heap.extend(data)
+        return offset, len(data)
+
+    rows = bytearray()
+    id_maps: List[List[Tuple[int, int, int]]] = [[], [], []]
+    row_id = 0
+    for key in sorted(db):
+        key_off, key_len = intern(key)
+        entries = sorted(db[key], key=lambda e: _as_u32(e.get("rating")), reverse=True)
+        for entry in entries:
+            ids = (_as_u32(entry.get("maskedDefId")), _as_u32(entry.get("resourceId")),
+                   _as_u32(entry.get("baseId")))
+            rating = _as_u32(entry.get("rating"))
+            name_off, name_len = intern(entry.get("name") or key)
+            rows += ROW.pack(ids[0], ids[1], ids[2], min(rating, 255),
+                             _position_code(entry.get("position")),
+                             name_off, key_off, name_len, key_len)
+            for section, player_id in zip(id_maps, ids):
+                if player_id:
+                    section.append((player_id, -rating, row_id))
+            row_id += 1
+
+    heap += b"\0" * (-len(heap) % 4)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(FILE_MAGIC, row_id, len(id_maps[0]), len(id_maps[1]),
+                            len(id_maps[2]), len(heap), 0))
+        f.write(rows)
+        for section in id_maps:
+            section.sort()
+            f.write(array("I", (s[0] for s in section)).tobytes())
+            f.write(array("I", (s[2] for s in section)).tobytes())
+        f.write(heap)
+    os.replace(tmp_path, path)
+    print(f"[SUCCESS] Wrote {row_id} rows to {path}")
+
+
+class PlayerTable:
+    """Read-only mmap view of clean_players.bin; rows are decoded on demand."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, masked, resource, base, heap_size, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != FILE_MAGIC:
+            self.mm.close()
+            raise ValueError(f"{path}: not a players table")
+
+        self.view = view = memoryview(self.mm)
+        offset = HEADER.size + self.rows * ROW.size
+        self.id_maps = []
+        for count in (masked, resource, base):
+            ids = view[offset:offset + 4 * count].cast("I")
+            offset += 4 * count
+            rows = view[offset:offset + 4 * count].cast("I")
+            offset += 4 * count
+            self.id_maps.append((ids, rows))
+        self.heap_offset = offset
+        self._key_ranges: Optional[Dict[str, Tuple[int, int]]] = None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _text(self, offset: int, length: int) -> str:
+        start = self.heap_offset + offset
+        return self.mm[start:start + length].decode("utf-8")
+
+    def row(self, row_id: int) -> dict:
+        masked, resource, base, rating, position, name_off, _, name_len, _ = \
+            ROW.unpack_from(self.mm, HEADER.size + row_id * ROW.size)
+        return {
+            "name": self._text(name_off, name_len),
+            "maskedDefId": masked or None,
+            "resourceId": resource or None,
+            "baseId": base or None,
+            "rating": rating or None,
+            "position": POSITIONS[position] if position < len(POSITIONS) else "",
+        }
+
+    def _lookup(self, section: int, player_id: int) -> Tuple[int, int]:
+        ids, _ = self.id_maps[section]
+        return bisect_left(ids, player_id), bisect_right(ids, player_id)
+
+    def find(self, section: int, player_id) -> List[dict]:
+        """Rows whose id in section (0=maskedDefId, 1=resourceId, 2=baseId) matches."""
+        if not isinstance(player_id, int):
+            return []
+        lo, hi = self._lookup(section, player_id)
+        rows = self.id_maps[section][1]
+        return [self.row(rows[i]) for i in range(lo, hi)]
+
+    def keys(self) -> List[str]:
+        """Distinct normalized keys (decoded on first call only)."""
+        if self._key_ranges is None:
+            ranges: Dict[str, Tuple[int, int]] = {}
+            last_off, last_key = None, None
+            for row_id in range(self.rows):
+                *_, key_off, _, key_len = ROW.unpack_from(self.mm, HEADER.size + row_id * ROW.size)
+                if key_off != last_off:
+                    last_off, last_key = key_off, self._text(key_off, key_len)
+                    ranges[last_key] = (row_id, row_id + 1)
+                else:
+                    ranges[last_key] = (ranges[last_key][0], row_id + 1)
+            self._key_ranges = ranges
+        return list(self._key_ranges)
+
+    def entries(self, key: str) -> List[dict]:
+        if self._key_ranges is None:
+            self.keys()
+        start, end = self._key_ranges.get(key, (0, 0))
+        return [self.row(i) for i in range(start, end)]
+
+    def close(self):
+        for ids, rows in self.id_maps:
+            ids.release()
+            rows.release()
+        self.view.release()
+        self.mm.close()
@@ -1,8 +1,11 @@
 """Download and normalize the official EA players database.
 
 Outputs a local JSON (clean_players.json) with normalized names mapped to
-player metadata (ids, rating, position). Provides a helper to search by
-name and return maskedDefId/baseId values usable by the worker.
+player metadata (ids, rating, position), plus the same data as a fixed-width
+memory-mapped table (clean_players.bin, see player_table.py). Provides a
+helper to search by name and return maskedDefId/baseId values usable by the
+worker; lookups go through the shared PlayerIndex (player_index.py) built
+once per process.
 """
 
 import csv
@@ -13,11 +16,15 @@ from typing import Dict, List
 
 import requests
 
+import player_index
+import player_table
+
 EA_DB_URL = os.environ.get(
     "EA_DB_URL",
     "https://content.ea.com/fc24/ultimate-team/players.json",
 )
 OUTPUT_DB = os.environ.get("EA_OUTPUT_DB", "clean_players.json")
+OUTPUT_BIN = os.environ.get("EA_OUTPUT_BIN", "clean_players.bin")
 
 
 def normalize_name(name: str) -> str:
@@ -107,6 +114,8 @@ def fetch_and_process() -> Dict[str, List[dict]]:
         json.dump(processed, f, ensure_ascii=False)
 
     print(f"[SUCCESS] Wrote {len(processed)} unique keys to {OUTPUT_DB}")
+    player_table.write_table(processed, OUTPUT_BIN)
+    player_index.set_index(player_index.PlayerIndex(processed))
     return processed
 
 
@@ -118,16 +127,7 @@ def load_db() -> Dict[str, List[dict]]:
 
 
 def find_players(query: str, limit: int = 5) -> List[dict]:
-    db = load_db()
-    key = normalize_name(query)
-    matches: List[dict] = []
-
-    for search_key, entries in db.items():
-        if key in search_key:
-            matches.extend(entries)
-
-    matches.sort(key=lambda x: x.get("rating") or 0, reverse=True)
-    return matches[:limit]
+    return player_index.get_index().search(query, limit)
 
 
 if __name__ == "__main__":
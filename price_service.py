@@ -0,0 +1,348 @@
+"""One reference price table shared by the snipers, reloaded when files change.
+
+Reference prices used to live in six places, each read once at startup:
+futbin_prices.json and fodder_targets.json (written by futbin_pricer /
+futbin_feed), SNIPE_CONFIGS in fodder_sniper, PRICE_RANGES in turbo_sniper,
+config["price_ranges"] in discord_bot and EA_MIN_PRICE in hard_sniper. A bot
+started before a Futbin refresh kept trading on stale prices until restarted.
+
+PriceService merges them into one PriceTable of PriceRef records, indexed by
+rating (and by asset id for per-player entries). Fields are merged one by
+one, highest layer first, except the buy range: buy_min always comes from
+the layer that supplied buy_max (the EA floor when that layer has none), so
+a Futbin max_buy is never narrowed by a manual minimum from a lower layer:
+
+1. runtime overrides (discord_bot !prix)
+2. fodder_targets.json / futbin_prices.json, freshest entry first (entry
+   updated_at, else file generated_at, else file mtime)
+3. DEFAULT_RANGES (manual buy/sell ranges, formerly PRICE_RANGES)
+4. FALLBACK_CONFIGS (formerly SNIPE_CONFIGS)
+
+turbo_sniper and discord_bot traded on PRICE_RANGES and keep doing so: they
+read the table with manual=True, where DEFAULT_RANGES sits above the Futbin
+files (overrides still first). The other bots get the Futbin view.
+
+and every rating gets its EA floor from EA_MIN_PRICE. current() stats the
+files at most every CHECK_INTERVAL seconds; when one changed, the new table
+is built off to the side and swapped in with a single assignment, so readers
+always see a complete table and the hot path stays a dict lookup. A file that
+fails to parse keeps its previous entries until it changes again.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from records import PriceRef
+
+SOURCE_FILES = ("fodder_targets.json", "futbin_prices.json")  # À fraîcheur égale, le premier gagne
+CHECK_INTERVAL = float(os.environ.get("PRICE_CHECK_SECONDS", 2))
+
+# Prix minimum EA par note (impossible de vendre en dessous)
+EA_MIN_PRICE = {
+    83: 700,
+    84: 700,
+    85: 700,
+    86: 750,
+    87: 800,
+    88: 850,
+    89: 900,
+    90: 950,
+    91: 1000,
+    92: 1100
+}
+DEFAULT_FLOOR = 700
+
+# Plages d'achat manuelles par note: (min_buy, max_buy, sell_price)
+DEFAULT_RANGES = {
+    83: {"min": 700, "max": 900, "sell": 1000},     # Profit: 50-250 CR
+    84: {"min": 800, "max": 1100, "sell": 1200},    # Profit: 40-340 CR
+    85: {"min": 2200, "max": 2800, "sell": 3000},   # Profit: 50-650 CR
+    86: {"min": 4500, "max": 5500, "sell": 6000},   # Profit: 200-1200 CR
+    87: {"min": 7500, "max": 9000, "sell": 10000},  # Profit: 500-2000 CR
+    88: {"min": 11000, "max": 13500, "sell": 15000},# Profit: 250-3250 CR
+}
+
+# Derniers recours si aucun fichier Futbin ne couvre la note
+FALLBACK_CONFIGS = {
+    83: {"max_buy": 1100, "sell_target": 1500, "min_profit": 200},
+    84: {"max_buy": 1900, "sell_target": 2500, "min_profit": 300},
+    85: {"max_buy": 3400, "sell_target": 4200, "min_profit": 400},
+    86: {"max_buy": 7800, "sell_target": 9000, "min_profit": 600},
+    87: {"max_buy": 11500, "sell_target": 13500, "min_profit": 1000},
+    88: {"max_buy": 16500, "sell_target": 19000, "min_profit": 1200},
+    89: {"max_buy": 22000, "sell_target": 26000, "min_profit": 2000},
+    90: {"max_buy": 29000, "sell_target": 34000, "min_profit": 2500},
+}
+
+_MERGED_FIELDS = ("buy_min", "buy_max", "sell_price", "min_profit", "market_price")
+_PAIRED_FIELDS = {"buy_max": "buy_min"}  # Plage d'achat: prise d'un seul bloc dans la même couche
+
+# (champs, source, horodatage) d'une couche pour une note ou un asset
+Layer = Tuple[dict, str, float]
+
+
+def floor_price(rating: int) -> int:
+    return EA_MIN_PRICE.get(rating, DEFAULT_FLOOR)
+
+
+def _timestamp(value) -> float:
+    """updated_at / generated_at of the Futbin files (ISO or "%Y-%m-%d %H:%M")."""
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _target_fields(target: dict) -> dict:
+    """Merged fields of one fodder_targets/futbin_prices entry."""
+    market = target.get("market_price") or target.get("sell_price")
+    fields = {
+        "buy_max": target.get("max_buy"),
+        "sell_price": target.get("sell_price") or target.get("market_price"),
+        "market_price": market,
+        "min_profit": target.get("estimated_profit", target.get("profit")),
+    }
+    return {name: int(value) for name, value in fields.items() if value is not None}
+
+
+def load_source(path: str, mtime: float) -> List[Tuple[str, int, Layer]]:
+    """Entries of one Futbin file as ("rating" | "asset", key, layer).
+
+    Raises OSError / ValueError on an unreadable or malformed file.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    source = data.get("source") or os.path.basename(path)
+    file_ts = _timestamp(data.get("generated_at")) or mtime
+
+    entries = []
+    for target in data.get("targets", []):
+        fields = _target_fields(target)
+        updated = _timestamp(target.get("updated_at")) or file_ts
+        asset_id = target.get("asset_id")
+        if asset_id:
+            fields["rating"] = int(target.get("rating") or 0)
+            entries.append(("asset", int(asset_id), (fields, source, updated)))
+        elif target.get("rating"):
+            entries.append(("rating", int(target["rating"]), (fields, source, updated)))
+    return entries
+
+
+def _merge(rating: int, layers: Iterable[Layer], asset_id: int = 0) -> Optional[PriceRef]:
+    merged = {}
+    source, updated = "", 0.0
+    for fields, layer_source, layer_updated in layers:
+        for name in _MERGED_FIELDS:
+            if name in _PAIRED_FIELDS.values():
+                continue
+            if name not in merged and fields.get(name) is not None:
+                merged[name] = fields[name]
+                paired = _PAIRED_FIELDS.get(name)
+                if paired is not None and fields.get(paired) is not None:
+                    merged[paired] = fields[paired]
+                if not source:
+                    source, updated = layer_source, layer_updated
+    if "buy_max" not in merged or "sell_price" not in merged:
+        return None
+    floor = floor_price(rating)
+    buy_min = min(merged.get("buy_min", floor), merged["buy_max"])
+    return PriceRef(rating, merged["buy_max"], merged["sell_price"], floor, buy_min=buy_min,
+                    min_profit=merged.get("min_profit", 0), market_price=merged.get("market_price", 0),
+                    asset_id=asset_id, source=source, updated_at=updated)
+
+
+def _default_layers() -> Dict[int, List[Layer]]:
+    layers: Dict[int, List[Layer]] = {}
+    for rating, r in DEFAULT_RANGES.items():
+        fields = {"buy_min": r["min"], "buy_max": r["max"], "sell_price": r["sell"]}
+        layers.setdefault(rating, []).append((fields, "default_ranges", 0.0))
+    for rating, c in FALLBACK_CONFIGS.items():
+        fields = {"buy_max": c["max_buy"], "sell_price": c["sell_target"], "min_profit": c["min_profit"]}
+        layers.setdefault(rating, []).append((fields, "fallback", 0.0))
+    return layers
+
+
+class PriceTable:
+    """Immutable snapshot of the merged prices (replaced whole on reload)."""
+
+    __slots__ = ("by_rating", "by_asset", "manual", "version", "loaded_at")
+
+    def __init__(self, by_rating: Dict[int, PriceRef], by_asset: Dict[int, PriceRef], version: int,
+                 manual: Optional[Dict[int, PriceRef]] = None):
+        self.by_rating = by_rating
+        self.by_asset = by_asset
+        self.manual = manual or {}   # Vue DEFAULT_RANGES d'abord (turbo_sniper, discord_bot)
+        self.version = version
+        self.loaded_at = time.time()
+
+    def get(self, rating: Optional[int] = None, asset_id: Optional[int] = None,
+            manual: bool = False) -> Optional[PriceRef]:
+        """Per-asset entry when there is one, else the rating entry.
+
+        manual=True prefers the DEFAULT_RANGES range over the Futbin files.
+        """
+        if asset_id:
+            ref = self.by_asset.get(asset_id)
+            if ref is not None:
+                return ref
+        if manual:
+            ref = self.manual.get(rating)
+            if ref is not None:
+                return ref
+        return self.by_rating.get(rating)
+
+    def ratings(self) -> List[int]:
+        return sorted(self.by_rating)
+
+
+def build_table(file_entries: Iterable[Tuple[int, Tuple[str, int, Layer]]],
+                overrides: Dict[int, dict], version: int = 0) -> PriceTable:
+    """Merges (file priority, entry) pairs, overrides and defaults into a table."""
+    rating_layers: Dict[int, List[Tuple[float, int, Layer]]] = {}
+    asset_layers: Dict[int, List[Tuple[float, int, Layer]]] = {}
+    for priority, (kind, key, layer) in file_entries:
+        target = asset_layers if kind == "asset" else rating_layers
+        target.setdefault(key, []).append((-layer[2], priority, layer))
+
+    defaults = _default_layers()
+    by_rating = {}
+    manual = {}
+    for rating in set(rating_layers) | set(defaults) | set(overrides):
+        top = [(overrides[rating], "override", time.time())] if rating in overrides else []
+        files = [layer for _, _, layer in sorted(rating_layers.get(rating, ()), key=lambda x: x[:2])]
+        rest = defaults.get(rating, [])
+        ref = _merge(rating, top + files + rest)
+        if ref is not None:
+            by_rating[rating] = ref
+        if rating in DEFAULT_RANGES:
+            # Plages manuelles au-dessus des fichiers Futbin
+            ref = _merge(rating, top + rest[:1] + files + rest[1:])
+            if ref is not None:
+                manual[rating] = ref
+
+    by_asset = {}
+    for asset_id, entries in asset_layers.items():
+        layers = [layer for _, _, layer in sorted(entries, key=lambda x: x[:2])]
+        rating = layers[0][0].get("rating", 0)
+        base = by_rating.get(rating)
+        if base is not None:
+            # Champs absents de l'entrée joueur: ceux de sa note
+            layers.append(({name: getattr(base, name) for name in _MERGED_FIELDS}, base.source, base.updated_at))
+        ref = _merge(rating, layers, asset_id=asset_id)
+        if ref is not None:
+            by_asset[asset_id] = ref
+    return PriceTable(by_rating, by_asset, version, manual)
+
+
+def _stamp(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class PriceService:
+    """Merged price table, rebuilt and swapped when a source file changes."""
+
+    def __init__(self, paths: Iterable[str] = SOURCE_FILES, check_interval: float = CHECK_INTERVAL):
+        self.paths = tuple(paths)
+        self.check_interval = check_interval
+        self.overrides: Dict[int, dict] = {}
+        self.files: Dict[str, tuple] = {}    # path -> (stamp, entries)
+        self.failed: Dict[str, tuple] = {}   # path -> stamp déjà signalé illisible
+        self.next_check = 0.0
+        self.reloads = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.table = PriceTable({}, {}, 0)
+        self.refresh(force=True)
+
+    def _reload_files(self) -> bool:
+        changed = False
+        for path in self.paths:
+            stamp = _stamp(path)
+            cached = self.files.get(path)
+            if cached is not None and cached[0] == stamp:
+                continue
+            if stamp is None:
+                entries = []  # Fichier supprimé: retour aux valeurs par défaut
+            else:
+                try:
+                    entries = load_source(path, stamp[0] / 1e9)
+                except (OSError, ValueError, TypeError, AttributeError) as e:
+                    # Fichier en cours d'écriture ou corrompu: on garde les entrées précédentes
+                    if self.failed.get(path) != stamp:
+                        self.failed[path] = stamp
+                        self.errors += 1
+                        print(f"[PRIX] {path} illisible ({e}) - prix précédents conservés")
+                    continue
+            self.files[path] = (stamp, entries)
+            self.failed.pop(path, None)
+            changed = True
+        return changed
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reloads the table if a source file changed; True if it was replaced."""
+        with self.lock:
+            if not self._reload_files() and not force:
+                return False
+            entries = [(priority, entry)
+                       for priority, path in enumerate(self.paths)
+                       for entry in self.files.get(path, (None, ()))[1]]
+            # Construite à part puis remplacée d'un coup: un lecteur voit l'ancienne ou la nouvelle
+            self.table = build_table(entries, self.overrides, self.table.version + 1)
+            self.reloads += 1
+        return True
+
+    def current(self) -> PriceTable:
+        """Current table, checking the files at most every check_interval seconds."""
+        now = time.monotonic()
+        if now >= self.next_check:
+            self.next_check = now + self.check_interval
+            self.refresh()
+        return self.table
+
+    def get(self, rating: Optional[int] = None, asset_id: Optional[int] = None,
+            manual: bool = False) -> Optional[PriceRef]:
+        return self.current().get(rating, asset_id, manual)
+
+    def set_override(self, rating: int, buy_min: Optional[int] = None, buy_max: Optional[int] = None,
+                     sell_price: Optional[int] = None):
+        """Runtime prices for a rating, above every file (applied immediately)."""
+        fields = {"buy_min": buy_min, "buy_max": buy_max, "sell_price": sell_price}
+        self.overrides[rating] = {name: value for name, value in fields.items() if value is not None}
+        self.refresh(force=True)
+
+    def clear_override(self, rating: int):
+        if self.overrides.pop(rating, None) is not None:
+            self.refresh(force=True)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.table.version,
+            "ratings": len(self.table.by_rating),
+            "assets": len(self.table.by_asset),
+            "reloads": self.reloads,
+            "errors": self.errors,
+        }
+
+
+_service: Optional[PriceService] = None
+_service_lock = threading.Lock()
+
+
+def get_price_service() -> PriceService:
+    """Process-wide price service (files read once, then only on change)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PriceService()
+    return _service
@@ -0,0 +1,212 @@
+"""Append-only columnar on-disk store for the scanner price history.
+
+Replaces the full price_cache.json rewrite done at the end of every scan.
+Observations are buffered in memory and appended as one block per flush;
+history is never rewritten except by the 24h compaction, which runs in a
+background thread.
+
+File layout (little-endian):
+    header  : b"FCPRICE1"
+    block*  : b"PBLK" | count:u32
+              ts[count]:f64 | asset_id[count]:u32 | price[count]:u32
+              | rareflag[count]:u16 | padding to 8 bytes
+
+Readers memory-map the file and cast each column in place (no parsing).
+A block cut short by a crash is ignored and truncated on the next open.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from typing import Iterator, Optional, Tuple
+
+FILE_MAGIC = b"FCPRICE1"
+BLOCK_MAGIC = b"PBLK"
+BLOCK_HEADER = struct.Struct("<4sI")
+RETENTION_SECONDS = 86400      # Historique gardé par la compaction
+COMPACT_SLACK_SECONDS = 3600   # Compacter quand le plus vieux dépasse 24h + 1h
+
+
+def _block_size(count: int) -> int:
+    size = BLOCK_HEADER.size + count * (8 + 4 + 4 + 2)
+    return (size + 7) & ~7
+
+
+def _iter_blocks(buf, limit: Optional[int] = None):
+    """Yields (offset, end, count) of every complete block in buf[:limit]."""
+    offset = len(FILE_MAGIC)
+    total = len(buf) if limit is None else min(limit, len(buf))
+    while offset + BLOCK_HEADER.size <= total:
+        magic, count = BLOCK_HEADER.unpack_from(buf, offset)
+        end = offset + _block_size(count)
+        if magic != BLOCK_MAGIC or end > total:
+            break
+        yield offset, end, count
+        offset = end
+
+
+def _columns(view: memoryview, offset: int, count: int):
+    """Zero-copy column views of one block."""
+    pos = offset + BLOCK_HEADER.size
+    ts = view[pos:pos + 8 * count].cast("d")
+    pos += 8 * count
+    assets = view[pos:pos + 4 * count].cast("I")
+    pos += 4 * count
+    prices = view[pos:pos + 4 * count].cast("I")
+    pos += 4 * count
+    rareflags = view[pos:pos + 2 * count].cast("H")
+    return ts, assets, prices, rareflags
+
+
+def _encode_block(ts, assets, prices, rareflags) -> bytes:
+    count = len(ts)
+    body = BLOCK_HEADER.pack(BLOCK_MAGIC, count) + ts.tobytes() + assets.tobytes() \
+        + prices.tobytes() + rareflags.tobytes()
+    return body + b"\0" * (_block_size(count) - len(body))
+
+
+class PriceStore:
+    """Segment file of (ts, asset_id, rareflag, price) observations."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.oldest_ts: Optional[float] = None
+        self.compaction: Optional[threading.Thread] = None
+        self._reset_pending()
+        self._repair()
+
+    def _reset_pending(self):
+        self.pending_ts = array("d")
+        self.pending_assets = array("I")
+        self.pending_prices = array("I")
+        self.pending_rareflags = array("H")
+
+    def _repair(self):
+        """Creates the file, or truncates a trailing partial block."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < len(FILE_MAGIC):
+            with open(self.path, "wb") as f:
+                f.write(FILE_MAGIC)
+            return
+
+        valid_end = len(FILE_MAGIC)
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(FILE_MAGIC)] != FILE_MAGIC:
+                    raise ValueError(f"{self.path}: not a price store")
+                size = len(mm)
+                for offset, end, count in _iter_blocks(mm):
+                    if self.oldest_ts is None and count:
+                        self.oldest_ts = struct.unpack_from("<d", mm, offset + BLOCK_HEADER.size)[0]
+                    valid_end = end
+
+        if valid_end < size:
+            print(f"[STORE] Bloc incomplet ignoré ({size - valid_end} octets)")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_end)
+
+    def is_empty(self) -> bool:
+        return os.path.getsize(self.path) <= len(FILE_MAGIC) and not self.pending_ts
+
+    def scan(self, since: float = 0.0, limit: Optional[int] = None) -> Iterator[Tuple[float, int, int, int]]:
+        """Yields (ts, asset_id, rareflag, price) with ts > since, oldest first.
+
+        limit bounds the scan to the first `limit` bytes of the file.
+        """
+        if os.path.getsize(self.path) <= len(FILE_MAGIC):
+            return
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        try:
+            for offset, _, count in _iter_blocks(mm, limit):
+                ts, assets, prices, rareflags = _columns(view, offset, count)
+                try:
+                    if count and ts[count - 1] <= since:
+                        continue  # Bloc entièrement trop vieux
+                    for i in range(count):
+                        if ts[i] > since:
+                            yield ts[i], assets[i], rareflags[i], prices[i]
+                finally:
+                    ts.release(); assets.release(); prices.release(); rareflags.release()
+        finally:
+            view.release()
+            mm.close()
+
+    def append(self, asset_id: int, rareflag: int, price: int, ts: float):
+        """Buffers one observation; written on the next flush()."""
+        self.pending_ts.append(ts)
+        self.pending_assets.append(asset_id)
+        self.pending_prices.append(price)
+        self.pending_rareflags.append(rareflag)
+
+    def flush(self):
+        """Appends buffered observations as one block (no rewrite)."""
+        if not self.pending_ts:
+            return
+        block = _encode_block(self.pending_ts, self.pending_assets,
+                              self.pending_prices, self.pending_rareflags)
+        first_ts = self.pending_ts[0]
+        with self.lock:
+            with open(self.path, "ab") as f:
+                f.write(block)
+            if self.oldest_ts is None:
+                self.oldest_ts = first_ts
+        self._reset_pending()
+
+    def needs_compaction(self, now: Optional[float] = None) -> bool:
+        now = now or time.time()
+        if self.compaction and self.compaction.is_alive():
+            return False
+        return self.oldest_ts is not None and \
+            self.oldest_ts < now - RETENTION_SECONDS - COMPACT_SLACK_SECONDS
+
+    def compact_async(self, now: Optional[float] = None) -> Optional[threading.Thread]:
+        """Starts the 24h compaction in a background thread if it is due."""
+        if not self.needs_compaction(now):
+            return None
+        cutoff = (now or time.time()) - RETENTION_SECONDS
+        self.compaction = threading.Thread(target=self.compact, args=(cutoff,), daemon=True)
+        self.compaction.start()
+        return self.compaction
+
+    def compact(self, cutoff: float):
+        """Rewrites the file keeping only observations newer than cutoff.
+
+        The bulk copy runs without the lock; blocks appended meanwhile are
+        copied as-is under the lock just before the atomic replace.
+        """
+        tmp_path = f"{self.path}.compact"
+        with self.lock:
+            snapshot_end = os.path.getsize(self.path)
+
+        kept_ts, kept_assets = array("d"), array("I")
+        kept_prices, kept_rareflags = array("I"), array("H")
+        for ts, asset_id, rareflag, price in self.scan(since=cutoff, limit=snapshot_end):
+            kept_ts.append(ts)
+            kept_assets.append(asset_id)
+            kept_prices.append(price)
+            kept_rareflags.append(rareflag)
+
+        with open(tmp_path, "wb") as out:
+            out.write(FILE_MAGIC)
+            if kept_ts:
+                out.write(_encode_block(kept_ts, kept_assets, kept_prices, kept_rareflags))
+
+            with self.lock:
+                with open(self.path, "rb") as f:
+                    f.seek(snapshot_end)
+                    tail = f.read()
+                out.write(tail)
+                out.flush()
+                os.fsync(out.fileno())
+                out.close()
+                os.replace(tmp_path, self.path)
+                self.oldest_ts = kept_ts[0] if kept_ts else None
+                if self.oldest_ts is None and tail:
+                    self.oldest_ts = struct.unpack_from("<d", tail, BLOCK_HEADER.size)[0]
+
+        print(f"[STORE] Compaction: {len(kept_ts)} observations gardées (< 24h)")
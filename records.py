@@ -0,0 +1,140 @@
+"""Shared record types handed between scanners, snipers and workers.
+
+Opportunities, targets, buy outcomes and reference prices used to travel
+as ad-hoc dicts built per listing, with different key names in each bot
+(buy_now / price, sell_target / sell_price / futbin_price, name / player /
+player_name...).
+These slotted dataclasses are cheap to build, share one set of field names
+and serialize explicitly with to_dict() / from_dict() for
+active_targets.json, the trade journal and the gateway.
+
+The Auction record lives in ea_client, next to its decoder.
+"""
+
+import time
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+def _field_names(cls):
+    return tuple(f.name for f in fields(cls))
+
+
+@dataclass(slots=True)
+class Opportunity:
+    """A listing worth buying, as spotted by a scanner or a sniper."""
+
+    trade_id: int
+    buy_now: int
+    sell_price: int               # Prix de revente visé
+    profit: int                   # Profit net attendu (après taxe)
+    name: str = "?"
+    rating: int = 0
+    asset_id: int = 0
+    item_id: Optional[int] = None
+    rareflag: int = 1
+    expires: int = 0
+    reference_price: int = 0      # Prix de référence (moyenne marché, Futbin...)
+    lowest_seen: Optional[int] = None
+    sample_count: int = 0
+    confidence: str = "MEDIUM"
+    source: str = ""
+
+    @property
+    def margin_pct(self) -> float:
+        return round(self.profit / self.buy_now * 100, 1) if self.buy_now else 0.0
+
+    @property
+    def discount_pct(self) -> float:
+        """How far below the reference price the listing is."""
+        if not self.reference_price:
+            return 0.0
+        return round((1 - self.buy_now / self.reference_price) * 100, 1)
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in _OPPORTUNITY_FIELDS}
+        data["margin_pct"] = self.margin_pct
+        return data
+
+    def to_target(self, ttl: float, now: Optional[float] = None) -> "Target":
+        """Target handed to the workers, valid for ttl seconds."""
+        return Target(
+            player_id=self.asset_id,
+            player_name=self.name,
+            max_buy_price=self.buy_now,
+            target_sell_price=self.sell_price,
+            expected_profit=self.profit,
+            confidence=self.confidence,
+            expires_at=(now or time.time()) + ttl,
+            source=self.source,
+        )
+
+
+@dataclass(slots=True)
+class Target:
+    """One entry of active_targets.json (scanner -> workers)."""
+
+    player_id: int
+    player_name: str
+    max_buy_price: int
+    target_sell_price: int = 0
+    expected_profit: int = 0
+    confidence: str = "MEDIUM"
+    expires_at: float = 0.0
+    source: str = ""
+    type: str = "player"          # "player" ou "training"
+    cat: Optional[str] = None     # Catégorie des consommables (playStyle...)
+
+    def expired(self, now: float) -> bool:
+        return bool(self.expires_at) and self.expires_at <= now
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in _TARGET_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Target":
+        """Builds a target from the file/bus payload (unknown keys are ignored)."""
+        return cls(**{name: data[name] for name in _TARGET_FIELDS if name in data})
+
+
+@dataclass(slots=True)
+class TradeResult:
+    """Outcome of one buy attempt."""
+
+    success: bool
+    status: str                   # Statut ea_client (OK, ALREADY_SOLD, ...)
+    trade_id: Optional[int] = None
+    price: int = 0
+    item_id: Optional[int] = None
+    message: str = ""
+
+    def __bool__(self):
+        return self.success
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in _TRADE_RESULT_FIELDS}
+
+
+@dataclass(slots=True)
+class PriceRef:
+    """Merged reference prices for one rating (or one asset), see price_service."""
+
+    rating: int
+    buy_max: int                  # Prix d'achat max
+    sell_price: int               # Prix de revente visé
+    floor: int                    # Plancher EA (vente impossible en dessous)
+    buy_min: int = 0
+    min_profit: int = 0
+    market_price: int = 0         # Prix marché Futbin (0 = valeurs par défaut seulement)
+    asset_id: int = 0
+    source: str = ""
+    updated_at: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in _PRICE_REF_FIELDS}
+
+
+_OPPORTUNITY_FIELDS = _field_names(Opportunity)
+_TARGET_FIELDS = _field_names(Target)
+_TRADE_RESULT_FIELDS = _field_names(TradeResult)
+_PRICE_REF_FIELDS = _field_names(PriceRef)
@@ -13,10 +13,14 @@ import json
 import os
 import random
 import time
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 import requests
 
+from ea_client import OK, ALREADY_SOLD, INVALID_TRADE, KeepAliveAdapter, POOL_SIZE, classify
+from telemetry import get_shipper
+from trade_cache import TradeCache
+
 SESSION_FILE = "active_session.json"
 # Default FC26 host; override with EA_BASE_URL if needed.
 EA_BASE_URL = os.environ.get(
@@ -50,6 +54,9 @@ RANDOM_BREAK_DURATION = float(os.environ.get("RANDOM_BREAK_DURATION", "30.0"))
 class SmartSession:
     def __init__(self):
         self.session = requests.Session()
+        adapter = KeepAliveAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.token: Optional[str] = None
         self.user_agent: Optional[str] = None
         self.load_session()
@@ -124,24 +131,11 @@ class SmartSession:
         return None
 
 
-class TradeCache:
-    def __init__(self, ttl: int = 300):
-        self.ttl = ttl
-        self.cache: Dict[str, float] = {}
-
-    def seen(self, trade_id: str) -> bool:
-        now = time.time()
-        self.cache = {k: v for k, v in self.cache.items() if now - v < self.ttl}
-        return trade_id in self.cache
-
-    def add(self, trade_id: str):
-        self.cache[trade_id] = time.time()
-
-
 class MarketLogic:
     def __init__(self, session: SmartSession):
         self.s = session
         self.trades = TradeCache()
+        self.telemetry = get_shipper(GATEWAY_URL, WORKER_ID)
         self.buys_this_hour = 0
         self.hour_start = time.time()
         self.search_count = 0
@@ -175,31 +169,23 @@ class MarketLogic:
         return []
 
     def send_scan_metric(self, player_id: int, item: dict):
-        try:
-            payload = {
-                "worker_id": WORKER_ID,
-                "player_id": player_id,
-                "price": item.get("buyNowPrice"),
-                "trade_id": item.get("tradeId"),
-                "expires": item.get("expires"),
-            }
-            requests.post(f"{GATEWAY_URL}/ingest/scan", json=payload, timeout=0.5)
-        except Exception:
-            pass
+        self.telemetry.emit("scan", {
+            "worker_id": WORKER_ID,
+            "player_id": player_id,
+            "price": item.get("buyNowPrice"),
+            "trade_id": item.get("tradeId"),
+            "expires": item.get("expires"),
+        })
 
     def send_trade_metric(self, trade_id: str, action: str, result: str, price: int, latency_ms: Optional[int]):
-        try:
-            payload = {
-                "worker_id": WORKER_ID,
-                "trade_id": trade_id,
-                "action": action,
-                "price": price,
-                "result": result,
-                "latency_ms": latency_ms,
-            }
-            requests.post(f"{GATEWAY_URL}/ingest/trade", json=payload, timeout=0.5)
-        except Exception:
-            pass
+        self.telemetry.emit("trade", {
+            "worker_id": WORKER_ID,
+            "trade_id": trade_id,
+            "action": action,
+            "price": price,
+            "result": result,
+            "latency_ms": latency_ms,
+        })
 
     def snipe_routine(self, target_id: int, max_buy: int):
         # Reset compteur horaire
@@ -220,6 +206,9 @@ class MarketLogic:
         if self.search_count % RANDOM_BREAK_EVERY == 0:
             pause = random.uniform(RANDOM_BREAK_DURATION * 0.5, RANDOM_BREAK_DURATION * 1.5)
             print(f"[ANTI-BAN] Pause humaine de {pause:.1f}s (après {self.search_count} recherches)")
+            t = self.telemetry.stats()
+            if t["dropped"] or t["failed"]:
+                print(f"[TELEMETRY] {t['sent']} envoyés | {t['dropped']} abandonnés (file pleine) | {t['failed']} perdus (gateway)")
             time.sleep(pause)
 
         items = self.search(target_id, max_buy)
@@ -263,19 +252,20 @@ class MarketLogic:
 
         resp = self.s.request("PUT", url, json=payload, headers=headers)
 
-        if not resp:
+        if resp is None:
             return False
 
         latency_ms = int(resp.elapsed.total_seconds() * 1000) if resp.elapsed else None
 
-        if resp.status_code == 200:
+        status = classify(resp)
+        if status == OK:
             print(f"[$$$] BID sent {price} (latency {latency_ms}ms)")
             self.send_trade_metric(trade_id, "BID", "SUCCESS", price, latency_ms)
             return True
-        elif resp.status_code == 461:
+        elif status == ALREADY_SOLD:
             print("[FAIL] Outbid/Sold (461)")
             self.send_trade_metric(trade_id, "BID", "OUTBID", price, latency_ms)
-        elif resp.status_code == 478:
+        elif status == INVALID_TRADE:
             print("[FAIL] Invalid trade (478)")
             self.send_trade_metric(trade_id, "BID", "INVALID", price, latency_ms)
         else:
@@ -296,10 +286,13 @@ def main():
     print(f"[START] Worker {WORKER_ID} targeting {target_id} <= {max_buy} (dry_run={DRY_RUN})")
     print(f"[ANTI-BAN] Délai: {CYCLE_DELAY_MIN}-{CYCLE_DELAY_MAX}s | Max achats/h: {MAX_BUYS_PER_HOUR} | Pause post-achat: {POST_BUY_PAUSE_MIN}-{POST_BUY_PAUSE_MAX}s")
 
-    while True:
-        bot.snipe_routine(target_id, max_buy)
-        delay = random.uniform(CYCLE_DELAY_MIN, CYCLE_DELAY_MAX)
-        time.sleep(delay)
+    try:
+        while True:
+            bot.snipe_routine(target_id, max_buy)
+            delay = random.uniform(CYCLE_DELAY_MIN, CYCLE_DELAY_MAX)
+            time.sleep(delay)
+    finally:
+        bot.telemetry.close()
 
 
 if __name__ == "__main__":
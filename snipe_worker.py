@@ -3,20 +3,20 @@ SNIPE WORKER - Hard Sniping Mode
 Blind Buy sur filtres pré-définis - Vitesse pure
 """
 
-import requests
 import json
 import time
 import random
 from datetime import datetime
 from collections import deque
 
+from ea_client import OK, TOKEN_EXPIRED, RATE_LIMIT, NETWORK_ERROR, classify, decode_auctions, get_client, load_session
+from filter_engine import FilterEngine
+
 # === CONFIG ===
 SESSION_FILE = "active_session.json"
 FILTERS_FILE = "snipe_filters.json"
 STATS_FILE = "snipe_stats.json"
 
-EA_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
-
 # VITESSE - Agressif mais pas suicidaire
 SPEED_MIN = 1.5  # Minimum entre requêtes
 SPEED_MAX = 2.5  # Maximum entre requêtes
@@ -31,8 +31,8 @@ def smart_delay():
 
 class AggressiveSniper:
     def __init__(self):
-        with open(SESSION_FILE) as f:
-            self.session = json.load(f)
+        self.session = load_session(SESSION_FILE)
+        self.client = get_client(self.session)
         
         self.load_filters()
         self.stats = {
@@ -51,31 +51,13 @@ class AggressiveSniper:
         with open(FILTERS_FILE) as f:
             data = json.load(f)
         self.filters = [f for f in data['filters'] if f.get('active', True)]
+        # Chaque page est vérifiée contre tous les filtres actifs en une passe
+        self.engine = FilterEngine(self.filters)
         print(f"[INIT] {len(self.filters)} filtres actifs chargés")
         
     def api(self, method, endpoint, params=None, data=None):
-        """Requête API optimisée pour la vitesse"""
-        url = f"{EA_URL}/{endpoint}"
-        headers = {
-            "X-UT-SID": self.session['x-ut-sid'],
-            "User-Agent": self.session.get('user_agent', 'Mozilla/5.0'),
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
-        
-        try:
-            if method == "GET":
-                resp = requests.get(url, params=params, headers=headers, timeout=10)
-            elif method == "PUT":
-                resp = requests.put(url, json=data, headers=headers, timeout=10)
-            elif method == "POST":
-                resp = requests.post(url, json=data, headers=headers, timeout=10)
-            return resp
-        except requests.exceptions.Timeout:
-            return None
-        except Exception as e:
-            print(f"[ERR] {e}")
-            return None
+        """Requête API optimisée pour la vitesse (connexion keep-alive partagée)"""
+        return self.client.request(method, endpoint, params=params, data=data, timeout=10)
     
     def scan_filter(self, filter_config):
         """Scan un filtre et retourne les résultats"""
@@ -85,35 +67,26 @@ class AggressiveSniper:
         resp = self.api("GET", "transfermarket", params=params)
         self.stats['scans'] += 1
         
-        if not resp:
+        status = classify(resp)
+        if status == NETWORK_ERROR:
             return None, "TIMEOUT"
         
-        if resp.status_code == 401:
-            return None, "TOKEN_EXPIRED"
-        
-        if resp.status_code == 429:
+        if status == RATE_LIMIT:
             return None, "SOFTBAN"
         
-        if resp.status_code != 200:
-            return None, f"HTTP_{resp.status_code}"
+        if status != OK:
+            return None, status
         
         try:
-            auctions = resp.json().get('auctionInfo', [])
-            return auctions, "OK"
-        except:
+            return decode_auctions(resp), "OK"
+        except ValueError:
             return None, "JSON_ERROR"
     
     def blind_buy(self, auction):
         """Achat instantané - pas de vérification"""
-        trade_id = auction['tradeId']
-        price = auction['buyNowPrice']
-        
         # PUT instantané
-        resp = self.api("PUT", f"trade/{trade_id}/bid", data={"bid": price})
-        
-        if resp and resp.status_code == 200:
-            return True
-        return False
+        resp = self.api("PUT", f"trade/{auction.trade_id}/bid", data={"bid": auction.buy_now})
+        return classify(resp) == OK
     
     def move_to_tradepile(self, item_id):
         """Déplace vers pile de transfert"""
@@ -138,10 +111,9 @@ class AggressiveSniper:
     
     def process_hit(self, auction, filter_config):
         """Traite un hit - Achat + Vente"""
-        item = auction.get('itemData', {})
-        price = auction['buyNowPrice']
-        name = item.get('lastName', item.get('name', '?'))
-        rating = item.get('rating', '?')
+        price = auction.buy_now
+        name = auction.last_name or '?'
+        rating = auction.rating or '?'
         expected = filter_config.get('expected_min_value', price * 1.5)
         
         now = datetime.now().strftime("%H:%M:%S")
@@ -171,8 +143,11 @@ class AggressiveSniper:
             
             # Récupérer l'item acheté
             resp = self.api("GET", "purchased/items")
-            if resp and resp.status_code == 200:
-                items = resp.json().get('itemData', [])
+            if classify(resp) == OK:
+                try:
+                    items = resp.json().get('itemData', [])
+                except ValueError:  # 200 non JSON (page Cloudflare / maintenance)
+                    items = []
                 for bought_item in items:
                     item_id = bought_item.get('id')
                     if item_id:
@@ -237,17 +212,18 @@ class AggressiveSniper:
                 auctions, status = self.scan_filter(current_filter)
                 
                 # Gestion erreurs
-                if status == "TOKEN_EXPIRED":
+                if status == TOKEN_EXPIRED:
                     print("\n❌ TOKEN EXPIRÉ - Arrêt")
                     break
                 
                 if self.check_softban(status):
                     continue
                 
-                # Traitement des résultats
-                if auctions:
-                    # BLIND BUY sur le premier résultat
-                    self.process_hit(auctions[0], current_filter)
+                # Traitement des résultats: meilleur match parmi tous les filtres actifs
+                matches = self.engine.evaluate(auctions) if auctions else []
+                if matches:
+                    best = matches[0]
+                    self.process_hit(best.auction, best.filter.config)
                     # Pause plus longue après achat
                     time.sleep(random.uniform(5, 10))
                 
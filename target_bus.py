@@ -0,0 +1,161 @@
+"""Local push channel for scanner targets (scanner -> sniper workers).
+
+active_targets.json used to be rewritten in place by the scanner and
+re-read on a timer by the workers (every 10s or every cycle), so a fresh
+opportunity could sit unseen for seconds and readers could catch a
+half-written file. Now:
+
+- publish() writes the file atomically (tmp + os.replace), so it stays the
+  source of truth for late joiners and the gateway
+- it then pushes the same payload as one datagram to every subscriber
+  socket in TARGET_BUS_DIR (one AF_UNIX socket per worker process)
+- TargetSubscriber.wait() blocks on that socket, so a worker wakes up as
+  soon as targets are produced; expired targets are filtered on read
+
+Without AF_UNIX (Windows) the subscriber falls back to mtime polling.
+"""
+
+import errno
+import json
+import os
+import select
+import socket
+import time
+from typing import List, Optional
+
+from records import Target
+
+BUS_DIR = os.environ.get("TARGET_BUS_DIR", ".target_bus")
+MAX_DATAGRAM = 64 * 1024  # Au-delà: simple notification, le worker relit le fichier
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+RELOAD_NOTICE = json.dumps({"reload": True}).encode()
+
+
+def write_atomic(path: str, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def publish(path: str, payload: dict) -> int:
+    """Writes the targets file and pushes it to live subscribers.
+
+    Returns the number of subscribers notified.
+    """
+    write_atomic(path, payload)
+    if not HAS_UNIX_SOCKETS or not os.path.isdir(BUS_DIR):
+        return 0
+
+    message = json.dumps(payload).encode()
+    if len(message) > MAX_DATAGRAM:
+        message = RELOAD_NOTICE
+
+    sent = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        for name in os.listdir(BUS_DIR):
+            if not name.endswith(".sock"):
+                continue
+            address = os.path.join(BUS_DIR, name)
+            try:
+                sock.sendto(message, address)
+                sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker arrêté sans nettoyer son socket
+                try:
+                    os.unlink(address)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                pass  # File du worker pleine: il relira le fichier au prochain message
+            except OSError as e:
+                # Datagramme trop gros pour la plateforme (macOS: 2048 octets par défaut)
+                if e.errno == errno.EMSGSIZE and message is not RELOAD_NOTICE:
+                    try:
+                        sock.sendto(RELOAD_NOTICE, address)
+                        sent += 1
+                    except OSError:
+                        pass
+                # Sinon (socket d'un autre utilisateur...): ignoré, le scan continue
+    return sent
+
+
+class TargetSubscriber:
+    """Worker side: current targets, refreshed by pushes from the scanner."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data: dict = {}
+        self.mtime = None
+        self.sock = None
+        self.address = None
+        if HAS_UNIX_SOCKETS:
+            os.makedirs(BUS_DIR, exist_ok=True)
+            self.address = os.path.join(BUS_DIR, f"sub-{os.getpid()}-{id(self) & 0xffff:x}.sock")
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.bind(self.address)
+            self.sock.setblocking(False)
+        self.reload()
+
+    def reload(self) -> bool:
+        """Re-reads the targets file if it changed (startup and fallback)."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self.mtime:
+            return False
+        try:
+            with open(self.path, "r") as f:
+                self.data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return False
+        self.mtime = mtime
+        return True
+
+    def poll(self) -> bool:
+        """Applies pending pushes without blocking; True if targets changed."""
+        if self.sock is None:
+            return self.reload()
+        latest = None
+        while True:
+            try:
+                latest = self.sock.recv(MAX_DATAGRAM + 1024)
+            except BlockingIOError:
+                break
+        if latest is None:
+            return False
+        message = json.loads(latest)
+        if message.get("reload"):
+            return self.reload()
+        self.data = message
+        return True
+
+    def wait(self, timeout: float) -> bool:
+        """Sleeps up to timeout, returning early when new targets arrive."""
+        if self.sock is None:
+            time.sleep(timeout)
+            return self.poll()
+        readable, _, _ = select.select([self.sock], [], [], max(0.0, timeout))
+        return self.poll() if readable else False
+
+    def targets(self) -> List[Target]:
+        now = time.time()
+        targets = (Target.from_dict(t) for t in self.data.get("targets", []))
+        return [t for t in targets if not t.expired(now)]
+
+    @property
+    def generated_at(self) -> Optional[str]:
+        return self.data.get("generated_at")
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
@@ -0,0 +1,241 @@
+"""Non-blocking batched telemetry for the workers.
+
+smart_worker used to POST every scanned listing to the gateway, blocking up
+to 0.5s per listing right before the buy decision. emit() now only appends
+to an in-memory queue; a background thread ships events in batches (one
+POST to /ingest/batch per BATCH_SIZE events or FLUSH_INTERVAL seconds).
+When the gateway is slow or down the queue is bounded: new events are
+dropped and counted instead of slowing the worker down.
+
+TelemetryAggregator is the receiving side, kept in memory by gateway_c2.py
+and exposed under /stats["live"].
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import requests
+
+BATCH_SIZE = int(os.environ.get("TELEMETRY_BATCH_SIZE", 50))
+FLUSH_INTERVAL = float(os.environ.get("TELEMETRY_FLUSH_MS", 500)) / 1000
+MAX_QUEUE = int(os.environ.get("TELEMETRY_MAX_QUEUE", 5000))
+SEND_TIMEOUT = 2.0
+
+
+class TelemetryShipper:
+    def __init__(self, gateway_url: str, worker_id: str, batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, max_queue: int = MAX_QUEUE):
+        self.url = f"{gateway_url.rstrip('/')}/ingest/batch"
+        self.worker_id = worker_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.queue = deque()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.http = requests.Session()
+        self.sent = 0
+        self.dropped = 0   # File pleine (backpressure)
+        self.failed = 0    # Lots perdus (gateway injoignable)
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def emit(self, kind: str, payload: dict):
+        """Queues one event; never blocks (drops when the queue is full)."""
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        payload["type"] = kind
+        payload["ts"] = time.time()
+        self.queue.append(payload)
+        if len(self.queue) >= self.batch_size:
+            self.wakeup.set()
+
+    def _drain(self) -> list:
+        batch = []
+        try:
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.popleft())
+        except IndexError:
+            pass
+        return batch
+
+    def _send(self, batch: list):
+        body = {"worker_id": self.worker_id, "events": batch,
+                "dropped": self.dropped, "failed": self.failed}
+        try:
+            resp = self.http.post(self.url, json=body, timeout=SEND_TIMEOUT)
+            if resp.status_code >= 400:
+                self.failed += len(batch)
+            else:
+                self.sent += len(batch)
+        except requests.exceptions.RequestException:
+            self.failed += len(batch)
+
+    def _run(self):
+        while not self.stopping:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            while self.queue:
+                self._send(self._drain())
+                if len(self.queue) < self.batch_size:
+                    break  # Reste partiel: attendre le prochain intervalle
+
+    def flush(self, timeout: float = SEND_TIMEOUT):
+        """Ships everything still queued (used at shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self.queue and time.monotonic() < deadline:
+            self._send(self._drain())
+
+    def close(self):
+        self.stopping = True
+        self.wakeup.set()
+        self.thread.join(timeout=SEND_TIMEOUT)
+        self.flush()
+        self.http.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+_shipper: Optional[TelemetryShipper] = None
+
+
+def get_shipper(gateway_url: str, worker_id: str) -> TelemetryShipper:
+    """Process-wide shipper (one background thread per worker process)."""
+    global _shipper
+    if _shipper is None:
+        _shipper = TelemetryShipper(gateway_url, worker_id)
+    return _shipper
+
+
+# ========== AGRÉGATION CÔTÉ GATEWAY ==========
+RATE_WINDOW = 60            # Fenêtre glissante du débit de scans (s)
+LATENCY_SAMPLES = 1000      # Dernières latences d'achat gardées pour les percentiles
+PRICE_SAMPLES = 200         # Derniers prix gardés par joueur
+
+
+def _percentile(sorted_values: list, q: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class TelemetryAggregator:
+    """Rolling in-memory aggregates of the worker events (no disk access).
+
+    ingest() is O(1) per event; the percentiles are computed on snapshot()
+    over bounded sample windows.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.workers: Dict[str, dict] = {}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.outcomes: Dict[str, int] = {}
+        self.prices: Dict[int, deque] = {}
+
+    def _worker(self, worker_id: str) -> dict:
+        worker = self.workers.get(worker_id)
+        if worker is None:
+            worker = self.workers[worker_id] = {
+                "scan_times": deque(), "scans": 0, "trades": 0, "last_latency_ms": None,
+                "dropped": 0, "failed": 0, "last_seen": 0.0,
+            }
+        return worker
+
+    def ingest(self, worker_id: str, events: list, dropped: int = 0, failed: int = 0):
+        now = time.time()
+        with self.lock:
+            worker = self._worker(worker_id)
+            worker["last_seen"] = now
+            # Compteurs cumulés côté worker
+            worker["dropped"] = max(worker["dropped"], dropped)
+            worker["failed"] = max(worker["failed"], failed)
+            for event in events:
+                kind = event.get("type")
+                if kind == "scan":
+                    worker["scans"] += 1
+                    worker["scan_times"].append(event.get("ts") or now)
+                    player_id, price = event.get("player_id"), event.get("price")
+                    if player_id is not None and price:
+                        samples = self.prices.get(player_id)
+                        if samples is None:
+                            samples = self.prices[player_id] = deque(maxlen=PRICE_SAMPLES)
+                        samples.append(price)
+                elif kind == "trade":
+                    worker["trades"] += 1
+                    result = event.get("result") or "UNKNOWN"
+                    self.outcomes[result] = self.outcomes.get(result, 0) + 1
+                    if event.get("latency_ms") is not None:
+                        self.latencies.append(event["latency_ms"])
+                        worker["last_latency_ms"] = event["latency_ms"]
+            # Fenêtre bornée même sans /stats ni client SSE pour la lire
+            self._trim_scans(worker, now)
+
+    @staticmethod
+    def _trim_scans(worker: dict, now: float):
+        scan_times = worker["scan_times"]
+        while scan_times and scan_times[0] < now - RATE_WINDOW:
+            scan_times.popleft()
+
+    def _worker_summary(self, worker: dict, now: float) -> dict:
+        self._trim_scans(worker, now)
+        return {
+            "scans": worker["scans"],
+            "scans_per_min": len(worker["scan_times"]) * 60 / RATE_WINDOW,
+            "trades": worker["trades"],
+            "last_latency_ms": worker["last_latency_ms"],
+            "dropped": worker["dropped"],
+            "failed": worker["failed"],
+            "last_seen": worker["last_seen"],
+        }
+
+    def worker_stats(self, worker_id: str) -> dict:
+        with self.lock:
+            return self._worker_summary(self._worker(worker_id), time.time())
+
+    def outcome_totals(self, results) -> Dict[str, int]:
+        with self.lock:
+            return {result: self.outcomes.get(result, 0) for result in results}
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        with self.lock:
+            workers = {worker_id: self._worker_summary(worker, now)
+                       for worker_id, worker in self.workers.items()}
+            latencies = sorted(self.latencies)
+            prices = {}
+            for player_id, samples in self.prices.items():
+                values = sorted(samples)
+                prices[player_id] = {
+                    "count": len(values),
+                    "min": values[0],
+                    "p25": _percentile(values, 0.25),
+                    "median": _percentile(values, 0.5),
+                    "p75": _percentile(values, 0.75),
+                    "max": values[-1],
+                }
+            outcomes = dict(self.outcomes)
+
+        return {
+            "started": self.started,
+            "workers": workers,
+            "bid_latency_ms": {
+                "samples": len(latencies),
+                "p50": _percentile(latencies, 0.5),
+                "p90": _percentile(latencies, 0.9),
+                "p99": _percentile(latencies, 0.99),
+            },
+            "outcomes": outcomes,
+            "prices": prices,
+        }
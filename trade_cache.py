@@ -0,0 +1,58 @@
+"""TTL cache of trade ids already handled, shared by the workers.
+
+smart_worker used to rebuild its whole dict on every seen() call to drop
+expired ids (O(n) per listing plus an allocation). Entries are now kept in
+insertion order in a deque next to a dict; expired ids are popped from the
+left lazily, so each id is evicted once and a lookup is amortized O(1).
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class TradeCache:
+    def __init__(self, ttl: float = 300, max_size: Optional[int] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.expires: Dict[str, float] = {}
+        self.order: Deque[Tuple[float, str]] = deque()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evict(self, now: float):
+        while self.order and (self.order[0][0] <= now or
+                              (self.max_size and len(self.expires) > self.max_size)):
+            expires_at, trade_id = self.order.popleft()
+            # Entrée périmée si l'id a été ré-ajouté depuis
+            if self.expires.get(trade_id) == expires_at:
+                del self.expires[trade_id]
+                self.evictions += 1
+
+    def seen(self, trade_id: str) -> bool:
+        now = time.monotonic()
+        self._evict(now)
+        if trade_id in self.expires:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, trade_id: str):
+        now = time.monotonic()
+        expires_at = now + self.ttl
+        self.expires[trade_id] = expires_at
+        self.order.append((expires_at, trade_id))
+        self._evict(now)
+
+    def __len__(self) -> int:
+        return len(self.expires)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.expires),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
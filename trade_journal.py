@@ -0,0 +1,137 @@
+"""Shared append-only trade journal (SQLite, WAL mode).
+
+The bots used to keep their purchase/snipe logs as one JSON array and
+re-read + re-serialize the whole history right after every buy. Each
+attempt is now a single INSERT into trade_journal.db; WAL lets the Discord
+bot or the gateway read the journal while workers append to it.
+
+Usage:
+    journal = get_journal()
+    journal.record("auto_worker", player_name="Mbappé", price=15000, trade_id=123)
+    journal.recent(20)
+    journal.daily(7)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+JOURNAL_DB = os.environ.get("TRADE_JOURNAL_DB", "trade_journal.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    bot TEXT NOT NULL,
+    player_id INTEGER,
+    player_name TEXT,
+    rating INTEGER,
+    trade_id TEXT,
+    price INTEGER,
+    expected_sell INTEGER,
+    expected_profit INTEGER,
+    success INTEGER NOT NULL DEFAULT 1,
+    message TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS trades_ts ON trades (ts);
+"""
+
+_COLUMNS = ("player_id", "player_name", "rating", "trade_id", "price",
+            "expected_sell", "expected_profit", "message")
+
+
+class TradeJournal:
+    def __init__(self, path: str = JOURNAL_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        # Autocommit: chaque INSERT est sa propre transaction (ajout O(1))
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def record(self, bot: str, success: bool = True, ts: Optional[float] = None, **fields) -> int:
+        """Appends one attempt; unknown fields are kept as JSON in `extra`."""
+        values = [fields.pop(column, None) for column in _COLUMNS]
+        if values[3] is not None:
+            values[3] = str(values[3])  # trade_id
+        extra = json.dumps(fields) if fields else None
+        with self.lock:
+            cur = self.conn.execute(
+                f"INSERT INTO trades (ts, bot, {', '.join(_COLUMNS)}, success, extra) "
+                f"VALUES (?, ?, {', '.join('?' * len(_COLUMNS))}, ?, ?)",
+                (ts or time.time(), bot, *values, int(bool(success)), extra),
+            )
+        return cur.lastrowid
+
+    def _rows(self, query: str, params=()) -> List[dict]:
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        result = []
+        for row in rows:
+            entry = dict(row)
+            if entry.get("extra"):
+                entry.update(json.loads(entry.pop("extra")))
+            else:
+                entry.pop("extra", None)
+            result.append(entry)
+        return result
+
+    def recent(self, limit: int = 20, bot: Optional[str] = None) -> List[dict]:
+        """Last `limit` attempts, newest first."""
+        if bot:
+            return self._rows("SELECT * FROM trades WHERE bot = ? ORDER BY id DESC LIMIT ?", (bot, limit))
+        return self._rows("SELECT * FROM trades ORDER BY id DESC LIMIT ?", (limit,))
+
+    def daily(self, days: int = 7, bot: Optional[str] = None) -> List[dict]:
+        """Per-day totals (local time) over the last `days` days, newest first."""
+        where, params = "ts >= ?", [time.time() - days * 86400]
+        if bot:
+            where += " AND bot = ?"
+            params.append(bot)
+        return self._rows(
+            "SELECT date(ts, 'unixepoch', 'localtime') AS day, COUNT(*) AS attempts, "
+            "SUM(success) AS buys, "
+            "SUM(CASE WHEN success THEN price ELSE 0 END) AS spent, "
+            "SUM(CASE WHEN success THEN expected_profit ELSE 0 END) AS expected_profit "
+            f"FROM trades WHERE {where} GROUP BY day ORDER BY day DESC",
+            params,
+        )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_journal: Optional[TradeJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal(path: str = JOURNAL_DB) -> TradeJournal:
+    """Process-wide journal connection (opened once)."""
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = TradeJournal(path)
+    return _journal
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Trade journal queries")
+    parser.add_argument("--recent", type=int, default=0, help="Show the last N attempts")
+    parser.add_argument("--days", type=int, default=7, help="Per-day totals over N days")
+    parser.add_argument("--bot", help="Filter on one bot (auto_worker, fodder_sniper, ...)")
+    args = parser.parse_args()
+
+    journal = get_journal()
+    if args.recent:
+        print(json.dumps(journal.recent(args.recent, args.bot), indent=2, ensure_ascii=False))
+    print(json.dumps(journal.daily(args.days, args.bot), indent=2))
@@ -8,30 +8,27 @@ TURBO SNIPER - Mode agressif avec monitoring complet
 - Stats détaillées
 """
 
+import gc
 import json
 import time
-import requests
-from datetime import datetime
 
-# ==================== CONFIG ====================
-BASE_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
+from ea_client import OK, TOKEN_EXPIRED, RATE_LIMIT, ALREADY_SOLD, NETWORK_ERROR, classify, decode_auctions, get_client
+from filter_engine import match_page
+from notifier import ERROR, INFO, get_notifier
+from price_service import get_price_service
+from trade_cache import TradeCache
 
+# ==================== CONFIG ====================
 # Note ciblée (une seule pour max vitesse)
 TARGET_RATING = 83  # Changer ici pour scanner une autre note
 
-# Plages d'achat par note: (min_buy, max_buy, sell_price)
-PRICE_RANGES = {
-    83: {"min": 700, "max": 900, "sell": 1000},     # Profit: 50-250 CR
-    84: {"min": 800, "max": 1100, "sell": 1200},    # Profit: 40-340 CR  
-    85: {"min": 2200, "max": 2800, "sell": 3000},   # Profit: 50-650 CR
-    86: {"min": 4500, "max": 5500, "sell": 6000},   # Profit: 200-1200 CR
-    87: {"min": 7500, "max": 9000, "sell": 10000},  # Profit: 500-2000 CR
-    88: {"min": 11000, "max": 13500, "sell": 15000},# Profit: 250-3250 CR
-}
+# Plages d'achat par note (plages manuelles DEFAULT_RANGES, sinon Futbin): price_service.py
 
 # Timing - safe pour éviter ban EA
 SCAN_DELAY = 2.0      # 2s entre chaque scan
 BALANCE_CHECK_INTERVAL = 50  # Vérifier le solde tous les X scans
+TRADE_CACHE_TTL = 3600       # Ne pas retenter un tradeId déjà tenté (annonce = 1h max)
+TRADE_CACHE_MAX = 5000
 
 # Discord
 DISCORD_WEBHOOK_URL = "https://discordapp.com/api/webhooks/1445904312327995422/-5Ha4PIjw07NYN_kdCT7Tw0jOu_dTuoZyVcokVKYqGO5toS9ZZUsmGodG0elfM7no0RA"
@@ -42,49 +39,31 @@ def load_session():
     with open("active_session.json", "r") as f:
         return json.load(f)
 
-def get_headers(session):
-    return {
-        "X-UT-SID": session["x-ut-sid"],
-        "User-Agent": session.get("user_agent", "Mozilla/5.0"),
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
-
 def get_coins(session):
     """Récupère le solde du compte"""
-    headers = get_headers(session)
-    url = f"{BASE_URL}/user/credits"
-    
-    try:
-        resp = requests.get(url, headers=headers, timeout=5)
-        if resp.status_code == 200:
-            data = resp.json()
-            return data.get("credits", 0)
+    resp = get_client(session).get("user/credits", timeout=5)
+    if classify(resp) != OK:
         return None
-    except:
+    try:
+        return resp.json().get("credits", 0)
+    except ValueError:  # 200 non JSON (page Cloudflare / maintenance)
         return None
 
 def get_tradepile_status(session):
     """Récupère le statut de la pile de transfert"""
-    headers = get_headers(session)
-    url = f"{BASE_URL}/tradepile"
-    
-    try:
-        resp = requests.get(url, headers=headers, timeout=5)
-        if resp.status_code == 200:
-            data = resp.json()
-            items = data.get("auctionInfo", [])
-            selling = sum(1 for i in items if i.get("tradeState") == "active")
-            sold = sum(1 for i in items if i.get("tradeState") == "closed")
-            return {"total": len(items), "selling": selling, "sold": sold}
+    resp = get_client(session).get("tradepile", timeout=5)
+    if classify(resp) != OK:
         return None
-    except:
+    try:
+        items = decode_auctions(resp)
+    except ValueError:
         return None
+    selling = sum(1 for i in items if i.trade_state == "active")
+    sold = sum(1 for i in items if i.trade_state == "closed")
+    return {"total": len(items), "selling": selling, "sold": sold}
 
 def search_market(session, rating, max_price):
     """Recherche sur le marché"""
-    headers = get_headers(session)
-    
     params = {
         "type": "player",
         "rarityIds": "1",
@@ -96,99 +75,60 @@ def search_market(session, rating, max_price):
         "start": 0
     }
     
-    url = f"{BASE_URL}/transfermarket"
+    resp = get_client(session).get("transfermarket", params=params, timeout=5)
+    status = classify(resp)
+    
+    if status in (TOKEN_EXPIRED, RATE_LIMIT, NETWORK_ERROR):
+        return status
+    if status != OK:
+        return "ERROR"
     
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=5)
-        
-        if resp.status_code == 401:
-            return "TOKEN_EXPIRED"
-        if resp.status_code == 429:
-            return "RATE_LIMIT"
-        if resp.status_code != 200:
-            return "ERROR"
-        
-        return resp.json().get("auctionInfo", [])
-    except Exception as e:
-        return "NETWORK_ERROR"
+        return decode_auctions(resp)
+    except ValueError:  # 200 non JSON (page Cloudflare / maintenance)
+        return NETWORK_ERROR
 
 def buy_now(session, trade_id, price):
     """Achat instantané"""
-    headers = get_headers(session)
-    url = f"{BASE_URL}/trade/{trade_id}/bid"
-    
-    try:
-        resp = requests.put(url, headers=headers, json={"bid": price}, timeout=3)
-        if resp.status_code == 200:
-            return "SUCCESS"
-        elif resp.status_code == 461:
-            return "ALREADY_SOLD"
-        elif resp.status_code == 401:
-            return "TOKEN_EXPIRED"
-        else:
-            return f"ERROR_{resp.status_code}"
-    except:
-        return "NETWORK_ERROR"
+    resp = get_client(session).put(f"trade/{trade_id}/bid", data={"bid": price}, timeout=3)
+    status = classify(resp)
+    if status == OK:
+        return "SUCCESS"
+    elif status in (ALREADY_SOLD, TOKEN_EXPIRED, NETWORK_ERROR):
+        return status
+    else:
+        return f"ERROR_{resp.status_code}"
 
 def send_to_pile(session, item_id):
     """Envoie en pile de transfert"""
-    headers = get_headers(session)
-    url = f"{BASE_URL}/item"
-    
-    try:
-        resp = requests.put(url, headers=headers, json={"itemData": [{"id": item_id, "pile": "trade"}]}, timeout=3)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).put("item", data={"itemData": [{"id": item_id, "pile": "trade"}]}, timeout=3)
+    return classify(resp) == OK
 
 def list_for_sale(session, item_id, sell_price):
     """Met en vente"""
-    headers = get_headers(session)
-    url = f"{BASE_URL}/auctionhouse"
-    
     payload = {
         "itemData": {"id": item_id},
         "startingBid": int(sell_price * 0.9),
         "duration": 3600,
         "buyNowPrice": sell_price
     }
-    
-    try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=3)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).post("auctionhouse", data=payload, timeout=3)
+    return classify(resp) == OK
 
 def notify_discord(message, is_error=False):
-    """Envoie une notification Discord"""
+    """Envoie une notification Discord (file + résumé périodique, ne bloque pas le scan)"""
     if DISCORD_ENABLED and DISCORD_WEBHOOK_URL:
-        try:
-            # Ajouter timestamp
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            full_message = f"[{timestamp}] {message}"
-            
-            requests.post(DISCORD_WEBHOOK_URL, json={"content": full_message}, timeout=3)
-        except:
-            pass
+        # Horodatage à l'émission, ajouté par le notifier
+        get_notifier(DISCORD_WEBHOOK_URL, footer="Turbo Sniper").notify(
+            description=message,
+            color=ERROR if is_error else INFO,
+            urgent=is_error,
+        )
 
 def format_coins(amount):
     """Formate les coins avec séparateurs"""
     return f"{amount:,}".replace(",", " ")
 
-def get_player_name(player_data):
-    """Récupère le nom complet du joueur"""
-    first_name = player_data.get("firstName", "")
-    last_name = player_data.get("lastName", "")
-    
-    if first_name and last_name:
-        return f"{first_name} {last_name}"
-    elif last_name:
-        return last_name
-    elif first_name:
-        return first_name
-    else:
-        return "Joueur inconnu"
-
 # ==================== MAIN ====================
 def main():
     print("\n" + "="*60)
@@ -199,26 +139,29 @@ def main():
     rating = TARGET_RATING
     
     # Récupérer la plage pour cette note
-    if rating not in PRICE_RANGES:
-        print(f"❌ Note {rating} non configurée dans PRICE_RANGES")
+    prices = get_price_service()
+    table = prices.current()
+    ref = table.get(rating, manual=True)
+    if ref is None:
+        print(f"❌ Note {rating} sans prix de référence (price_service)")
         return
     
-    price_config = PRICE_RANGES[rating]
-    min_buy = price_config["min"]
-    max_buy = price_config["max"]
-    sell_price = price_config["sell"]
+    prices_version = table.version
+    min_buy = ref.buy_min
+    max_buy = ref.buy_max
+    sell_price = ref.sell_price
     
     # Vérifier le solde initial
     initial_coins = get_coins(session)
     if initial_coins is None:
         print("❌ Impossible de récupérer le solde - Token invalide?")
-        notify_discord("❌ Erreur: Impossible de récupérer le solde initial")
+        notify_discord("❌ Erreur: Impossible de récupérer le solde initial", is_error=True)
         return
     
     print(f"\n💰 Solde initial: {format_coins(initial_coins)} CR")
     print(f"🎯 Cible: Note {rating}")
     print(f"💵 Plage achat: {min_buy} - {max_buy} CR")
-    print(f"📤 Prix vente: {sell_price} CR")
+    print(f"📤 Prix vente: {sell_price} CR ({ref.source})")
     print(f"📊 Profit potentiel: +{int(sell_price * 0.95 - max_buy)} à +{int(sell_price * 0.95 - min_buy)} CR")
     print(f"⚡ Délai: {SCAN_DELAY}s entre scans")
     
@@ -231,6 +174,16 @@ def main():
     errors = 0
     start_time = time.time()
     last_coins = initial_coins
+    attempted = TradeCache(ttl=TRADE_CACHE_TTL, max_size=TRADE_CACHE_MAX)
+    snipe_filter = {
+        "name": f"Note {rating}",
+        "params": {"minr": rating, "maxr": rating, "minb": min_buy, "maxb": max_buy},
+        "expected_min_value": sell_price,
+    }
+    
+    # Déchets du chargement (table de prix, session) ramassés maintenant plutôt
+    # que par un passage du GC au milieu de la première décision d'achat
+    gc.collect(1)
     
     print(f"\n🚀 GO! Scan en cours...")
     print("-"*60)
@@ -239,13 +192,27 @@ def main():
         while True:
             scans += 1
             
+            # Prix rechargés à chaud (nouveaux prix Futbin ou plages modifiées)
+            table = prices.current()
+            if table.version != prices_version:
+                prices_version = table.version
+                ref = table.get(rating, manual=True) or ref
+                min_buy, max_buy, sell_price = ref.buy_min, ref.buy_max, ref.sell_price
+                snipe_filter = {
+                    "name": f"Note {rating}",
+                    "params": {"minr": rating, "maxr": rating, "minb": min_buy, "maxb": max_buy},
+                    "expected_min_value": sell_price,
+                }
+                print(f"\n📊 Nouveaux prix: {min_buy}-{max_buy} CR → vente {sell_price} CR ({ref.source})")
+                gc.collect(1)  # Idem après un rechargement, avant la recherche suivante
+            
             # Recherche avec le MAX de la plage
             auctions = search_market(session, rating, max_buy)
             
             # Gestion des erreurs
             if auctions == "TOKEN_EXPIRED":
                 print("\n❌ Token expiré!")
-                notify_discord("🚨 **ERREUR:** Token EA expiré - Relancer le bot!")
+                notify_discord("🚨 **ERREUR:** Token EA expiré - Relancer le bot!", is_error=True)
                 break
             elif auctions == "RATE_LIMIT":
                 errors += 1
@@ -263,54 +230,47 @@ def main():
                 time.sleep(2)
                 continue
             
-            # Trier par prix croissant pour favoriser les moins chers
-            auctions = sorted(auctions, key=lambda x: x.get("buyNowPrice", 999999))
-            
-            # Traiter les résultats
-            for auction in auctions:
-                buy_price = auction.get("buyNowPrice", 0)
-                player_data = auction.get("itemData", {})
-                actual_rating = player_data.get("rating", 0)
-                
-                # Vérifier la note
-                if actual_rating != rating:
+            # Note exacte + plage de prix, les moins chers d'abord
+            for match in match_page(auctions, snipe_filter):
+                auction = match.auction
+                buy_price = match.price
+                trade_id = auction.trade_id
+                # Même annonce renvoyée par un scan suivant: déjà tentée
+                if attempted.seen(trade_id):
                     continue
+                attempted.add(trade_id)
+                item_id = auction.item_id
+                player_name = auction.name or "Joueur inconnu"
+                
+                # ACHAT INSTANTANÉ
+                result = buy_now(session, trade_id, buy_price)
                 
-                # Vérifier que le prix est dans la plage
-                if buy_price > 0 and buy_price >= min_buy and buy_price <= max_buy:
-                    trade_id = auction["tradeId"]
-                    item_id = player_data["id"]
-                    player_name = get_player_name(player_data)
+                if result == "SUCCESS":
+                    profit = match.profit
+                    total_buys += 1
+                    total_profit += profit
                     
-                    # ACHAT INSTANTANÉ
-                    result = buy_now(session, trade_id, buy_price)
+                    # Indicateur de qualité du snipe
+                    quality = "🔥 MEGA" if buy_price <= min_buy + 50 else "✅"
                     
-                    if result == "SUCCESS":
-                        profit = int(sell_price * 0.95 - buy_price)
-                        total_buys += 1
-                        total_profit += profit
-                        
-                        # Indicateur de qualité du snipe
-                        quality = "🔥 MEGA" if buy_price <= min_buy + 50 else "✅"
-                        
-                        print(f"\n{quality} SNIPE! {player_name} ({rating}) | {buy_price} CR | +{profit} CR")
-                        notify_discord(f"🎯 **SNIPE!** {player_name} ({rating})\n💰 Acheté: {buy_price} CR\n📈 Profit estimé: +{profit} CR\n📊 Total session: {total_buys} achats | +{total_profit} CR")
-                        
-                        # Mettre en vente
-                        time.sleep(0.5)
-                        if send_to_pile(session, item_id):
-                            if list_for_sale(session, item_id, sell_price):
-                                print(f"   📤 En vente: {sell_price} CR")
-                        
-                        # Petite pause après achat
-                        time.sleep(2)
-                        
-                    elif result == "ALREADY_SOLD":
-                        print(f"\r⚡ Raté: {player_name} déjà vendu", end="", flush=True)
-                    elif result == "TOKEN_EXPIRED":
-                        print("\n❌ Token expiré pendant l'achat!")
-                        notify_discord("🚨 **ERREUR:** Token expiré pendant un achat!")
-                        return
+                    print(f"\n{quality} SNIPE! {player_name} ({rating}) | {buy_price} CR | +{profit} CR")
+                    notify_discord(f"🎯 **SNIPE!** {player_name} ({rating})\n💰 Acheté: {buy_price} CR\n📈 Profit estimé: +{profit} CR\n📊 Total session: {total_buys} achats | +{total_profit} CR")
+                    
+                    # Mettre en vente
+                    time.sleep(0.5)
+                    if send_to_pile(session, item_id):
+                        if list_for_sale(session, item_id, sell_price):
+                            print(f"   📤 En vente: {sell_price} CR")
+                    
+                    # Petite pause après achat
+                    time.sleep(2)
+                    
+                elif result == "ALREADY_SOLD":
+                    print(f"\r⚡ Raté: {player_name} déjà vendu", end="", flush=True)
+                elif result == "TOKEN_EXPIRED":
+                    print("\n❌ Token expiré pendant l'achat!")
+                    notify_discord("🚨 **ERREUR:** Token expiré pendant un achat!", is_error=True)
+                    return
             
             # Vérification périodique du solde et stats
             if scans % BALANCE_CHECK_INTERVAL == 0:
@@ -337,6 +297,9 @@ def main():
                     if errors > 0:
                         status += f"\n⚠️ Erreurs: {errors}"
                     
+                    cache = attempted.stats()
+                    status += f"\n🔁 Doublons ignorés: {cache['hits']} ({cache['size']} trades en cache)"
+                    
                     print(status)
                     
                     # Notif Discord toutes les 5 mins environ (150 scans à 2s)
@@ -11,12 +11,12 @@ Cycle optimal FC25:
 import json
 import time
 import random
-import requests
 from datetime import datetime
 
-# ==================== CONFIG ====================
-BASE_URL = "https://utas.mob.v5.prd.futc-ext.gcp.ea.com/ut/game/fc26"
+from ea_client import OK, TOKEN_EXPIRED, RATE_LIMIT, classify, get_client
+from notifier import get_notifier
 
+# ==================== CONFIG ====================
 # Notes à cibler (chargées depuis fodder_targets.json)
 TARGET_RATINGS = [83, 84]  # Notes basses = accessibles avec peu de crédits
 
@@ -58,21 +58,10 @@ def load_targets():
         print(f"❌ Erreur chargement fodder_targets.json: {e}")
         return {}
 
-def get_headers(session):
-    return {
-        "X-UT-SID": session["x-ut-sid"],
-        "User-Agent": session.get("user_agent", "Mozilla/5.0"),
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
-
 def notify(msg):
     print(msg)
     if DISCORD_ENABLED and DISCORD_WEBHOOK:
-        try:
-            requests.post(DISCORD_WEBHOOK, json={"content": msg}, timeout=3)
-        except:
-            pass
+        get_notifier(DISCORD_WEBHOOK, footer="Volume Trader").notify(description=msg)
 
 def is_buy_time():
     """Retourne True si c'est l'heure d'acheter"""
@@ -85,8 +74,6 @@ def is_sell_time():
 # ==================== EA API ====================
 def search_market(session, rating, max_price):
     """Recherche des cartes sur le marché"""
-    headers = get_headers(session)
-    
     params = {
         "type": "player",
         "rarityIds": "1",
@@ -98,84 +85,66 @@ def search_market(session, rating, max_price):
         "start": 0
     }
     
-    try:
-        resp = requests.get(f"{BASE_URL}/transfermarket", headers=headers, params=params, timeout=10)
-        if resp.status_code == 401:
-            return None
-        if resp.status_code == 429:
-            print("⚠️ Rate limit - pause 60s")
-            time.sleep(60)
-            return []
-        if resp.status_code == 200:
-            return resp.json().get("auctionInfo", [])
-        return []
-    except:
+    resp = get_client(session).get("transfermarket", params=params, timeout=10)
+    status = classify(resp)
+    if status == TOKEN_EXPIRED:
+        return None
+    if status == RATE_LIMIT:
+        print("⚠️ Rate limit - pause 60s")
+        time.sleep(60)
         return []
+    if status == OK:
+        try:
+            return resp.json().get("auctionInfo", [])
+        except ValueError:  # 200 non JSON (page Cloudflare / maintenance)
+            return []
+    return []
 
 def buy_card(session, trade_id, price):
     """Achète une carte"""
-    headers = get_headers(session)
-    try:
-        resp = requests.put(f"{BASE_URL}/trade/{trade_id}/bid", headers=headers, json={"bid": price}, timeout=5)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).put(f"trade/{trade_id}/bid", data={"bid": price}, timeout=5)
+    return classify(resp) == OK
 
 def get_tradepile(session):
     """Récupère le contenu de la pile de transfert"""
-    headers = get_headers(session)
-    try:
-        resp = requests.get(f"{BASE_URL}/tradepile", headers=headers, timeout=10)
-        if resp.status_code == 200:
+    resp = get_client(session).get("tradepile", timeout=10)
+    if classify(resp) == OK:
+        try:
             return resp.json().get("auctionInfo", [])
-        return []
-    except:
-        return []
+        except ValueError:
+            return []
+    return []
 
 def get_unassigned(session):
     """Récupère les cartes non assignées (achetées)"""
-    headers = get_headers(session)
-    try:
-        resp = requests.get(f"{BASE_URL}/purchased/items", headers=headers, timeout=10)
-        if resp.status_code == 200:
+    resp = get_client(session).get("purchased/items", timeout=10)
+    if classify(resp) == OK:
+        try:
             return resp.json().get("itemData", [])
-        return []
-    except:
-        return []
+        except ValueError:
+            return []
+    return []
 
 def send_to_tradepile(session, item_id):
     """Envoie une carte dans la pile de transfert"""
-    headers = get_headers(session)
-    try:
-        resp = requests.put(f"{BASE_URL}/item", headers=headers, 
-                           json={"itemData": [{"id": item_id, "pile": "trade"}]}, timeout=5)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).put("item", data={"itemData": [{"id": item_id, "pile": "trade"}]}, timeout=5)
+    return classify(resp) == OK
 
 def list_card(session, item_id, start_price, buy_now):
     """Met une carte en vente"""
-    headers = get_headers(session)
     payload = {
         "itemData": {"id": item_id},
         "startingBid": start_price,
         "duration": 3600,
         "buyNowPrice": buy_now
     }
-    try:
-        resp = requests.post(f"{BASE_URL}/auctionhouse", headers=headers, json=payload, timeout=5)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).post("auctionhouse", data=payload, timeout=5)
+    return classify(resp) == OK
 
 def relist_all(session):
     """Reliste toutes les cartes expirées"""
-    headers = get_headers(session)
-    try:
-        resp = requests.put(f"{BASE_URL}/auctionhouse/relist", headers=headers, timeout=10)
-        return resp.status_code == 200
-    except:
-        return False
+    resp = get_client(session).put("auctionhouse/relist", timeout=10)
+    return classify(resp) == OK
 
 # ==================== TRADING LOGIC ====================
 def buy_phase(session, targets):